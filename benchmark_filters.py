@@ -0,0 +1,234 @@
+"""
+Filter Benchmark
+Offline comparison of the position filters in filters.py.
+Runs every filter preset over recorded gaze/head traces and reports
+jitter (noise left in the output) against lag (delay behind the input).
+
+Usage:
+    python benchmark_filters.py                      # synthetic trace
+    python benchmark_filters.py trace1.csv trace2.csv
+    python benchmark_filters.py --predict --json report.json
+
+Trace files are CSV with a header and columns: timestamp, x, y
+(timestamp in seconds, x/y as produced by EyeTracker.get_eye_position),
+or session recordings (.session) written by session_recorder.py, from
+whose landmarks the raw head (--mode head) or iris (--mode iris) position
+is taken.
+"""
+
+import argparse
+import csv
+import json
+import sys
+
+import numpy as np
+
+from filters import FILTER_PRESETS, create_filter
+from session_recorder import SessionReader
+
+
+def load_trace(path, mode='head'):
+    """
+    Load a recorded trace from CSV or a session recording.
+
+    Session recordings store the landmarks, so the trace is the raw
+    (unfiltered) position the filters see in the app, not the recorded gaze
+    (which already went through the app's filter).
+
+    Args:
+        path: Path to a CSV file with timestamp, x, y columns, or a .session file
+        mode: Position derived from session landmarks: 'head' (nose tip) or
+              'iris' (iris gaze ratios)
+
+    Returns:
+        dict: {'name', 'timestamps', 'values', 'truth'} (truth is None)
+    """
+    if path.endswith('.session'):
+        from eye_tracker import EyeTracker
+
+        reader = SessionReader(path)
+        tracker = EyeTracker(use_head_tracking=(mode == 'head'), use_roi=False, backend='scripted')
+        timestamps, values = [], []
+        try:
+            for timestamp, landmark_frame in reader.iter_landmark_frames():
+                position = tracker.get_raw_position(landmark_frame) if landmark_frame else None
+                if position is None or not np.all(np.isfinite(position)):
+                    continue
+                timestamps.append(timestamp)
+                values.append(position)
+        finally:
+            tracker.release()
+        return {'name': path, 'timestamps': np.array(timestamps),
+                'values': np.array(values, dtype=float).reshape(-1, 2), 'truth': None}
+
+    with open(path, newline='') as f:
+        rows = [row for row in csv.DictReader(f)]
+
+    timestamps = np.array([float(r['timestamp']) for r in rows])
+    values = np.array([(float(r['x']), float(r['y'])) for r in rows])
+    return {'name': path, 'timestamps': timestamps, 'values': values, 'truth': None}
+
+
+def synthetic_trace(duration=20.0, fps=30.0, noise=0.004, seed=0):
+    """
+    Generate a trace of fixations joined by fast movements, plus landmark noise.
+
+    Args:
+        duration: Trace length in seconds
+        fps: Sample rate (Hz)
+        noise: Standard deviation of the measurement noise
+        seed: Random seed (the trace is deterministic)
+
+    Returns:
+        dict: {'name', 'timestamps', 'values', 'truth'}
+    """
+    rng = np.random.default_rng(seed)
+    timestamps = np.arange(0.0, duration, 1.0 / fps)
+    truth = np.empty((len(timestamps), 2))
+
+    position = np.array([0.5, 0.5])
+    target = position.copy()
+    next_move = 0.0
+    for i, t in enumerate(timestamps):
+        if t >= next_move:
+            target = rng.uniform(0.2, 0.8, size=2)
+            next_move = t + rng.uniform(0.8, 2.0)
+        # Move quickly toward the target (settles within ~150 ms at 30 fps)
+        position += (target - position) * 0.5
+        truth[i] = position
+
+    values = truth + rng.normal(0.0, noise, size=truth.shape)
+    return {'name': 'synthetic', 'timestamps': timestamps, 'values': values, 'truth': truth}
+
+
+def run_filter(spec, trace, predict=0.0):
+    """
+    Run a filter over a trace.
+
+    Args:
+        spec: Filter preset or spec for filters.create_filter
+        trace: Trace dict
+        predict: Seconds to predict ahead (0 = no prediction)
+
+    Returns:
+        np.ndarray: Filtered output, same shape as the trace values
+    """
+    chain = create_filter(spec)
+    output = np.empty_like(trace['values'])
+    for i, (t, value) in enumerate(zip(trace['timestamps'], trace['values'])):
+        output[i] = chain.update(value, t)
+        if predict:
+            output[i] = chain.predict(predict)
+    return output
+
+
+def measure_jitter(output):
+    """
+    Jitter as the RMS of the second difference (acceleration noise).
+
+    Args:
+        output: (N, 2) filtered trace
+
+    Returns:
+        float: RMS second difference (in trace units)
+    """
+    if len(output) < 3:
+        return 0.0
+    second_diff = np.diff(output, n=2, axis=0)
+    return float(np.sqrt(np.mean(np.sum(second_diff ** 2, axis=1))))
+
+
+def measure_lag(reference, output, timestamps, max_shift=30):
+    """
+    Lag as the time shift that best aligns the output with the reference.
+
+    Args:
+        reference: (N, 2) input (or ground-truth) trace
+        output: (N, 2) filtered trace
+        timestamps: (N,) sample times
+        max_shift: Largest shift tried, in samples
+
+    Returns:
+        float: Estimated lag in milliseconds (negative = output leads)
+    """
+    n = len(output)
+    best_shift, best_error = 0, np.inf
+    for shift in range(-max_shift, max_shift + 1):
+        if shift >= 0:
+            a, b = output[shift:], reference[:n - shift]
+        else:
+            a, b = output[:n + shift], reference[-shift:]
+        if len(a) < n // 2:
+            continue
+        error = np.mean(np.sum((a - b) ** 2, axis=1))
+        if error < best_error:
+            best_shift, best_error = shift, error
+
+    frame_time = float(np.median(np.diff(timestamps))) if n > 1 else 0.0
+    return best_shift * frame_time * 1000.0
+
+
+def benchmark(traces, presets, predict=0.0):
+    """
+    Run every preset over every trace.
+
+    Args:
+        traces: List of trace dicts
+        presets: List of preset names
+        predict: Seconds to predict ahead
+
+    Returns:
+        list: One result dict per (trace, preset)
+    """
+    results = []
+    for trace in traces:
+        reference = trace['truth'] if trace['truth'] is not None else trace['values']
+        for preset in presets:
+            output = run_filter(preset, trace, predict)
+            result = {
+                'trace': trace['name'],
+                'filter': preset,
+                'jitter': measure_jitter(output),
+                'lag_ms': measure_lag(reference, output, trace['timestamps']),
+            }
+            if trace['truth'] is not None:
+                result['rmse'] = float(np.sqrt(np.mean(np.sum((output - trace['truth']) ** 2, axis=1))))
+            results.append(result)
+    return results
+
+
+def print_results(results):
+    """Print results as a table."""
+    print(f"{'trace':<24} {'filter':<16} {'jitter (x1e3)':>14} {'lag (ms)':>10} {'rmse (x1e3)':>12}")
+    print("-" * 80)
+    for r in results:
+        rmse = f"{r['rmse'] * 1000:12.3f}" if 'rmse' in r else f"{'-':>12}"
+        print(f"{r['trace'][-24:]:<24} {r['filter']:<16} {r['jitter'] * 1000:14.3f} "
+              f"{r['lag_ms']:10.1f} {rmse}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare position filters on recorded traces")
+    parser.add_argument('traces', nargs='*', help="CSV traces (timestamp,x,y); synthetic if omitted")
+    parser.add_argument('--filters', nargs='+', default=sorted(FILTER_PRESETS),
+                        help="Filter presets to compare")
+    parser.add_argument('--predict', type=float, nargs='?', const=0.05, default=0.0,
+                        help="Predict ahead by this many seconds (default when given: 0.05)")
+    parser.add_argument('--mode', choices=('head', 'iris'), default='head',
+                        help="Position taken from .session landmarks (default: head)")
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    traces = [load_trace(p, args.mode) for p in args.traces] or [synthetic_trace()]
+    results = benchmark(traces, args.filters, args.predict)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Hot Path Benchmark
+Camera-free micro-benchmarks of the functions that run once per frame:
+gaze/head position, non-linear scaling, EAR and blink detection, cursor
+mapping and edge-scroll detection. Landmarks are synthetic (a moving face
+that blinks now and then), the cursor goes to a null output, so no camera,
+display or microphone is needed.
+
+Reports the time per call and the memory allocated per call (tracemalloc).
+Compare against a saved report to catch regressions before a release.
+
+Usage:
+    python benchmark_hotpaths.py
+    python benchmark_hotpaths.py --json baseline.json
+    python benchmark_hotpaths.py --baseline baseline.json --max-regression 0.25
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+
+from landmark_backends import ScriptedBackend
+from landmarks import LandmarkFrame, NOSE_TIP, EAR_INDICES
+
+FRAME_SHAPE = (480, 640, 3)
+SCREEN_SIZE = (1920, 1080)
+
+
+def synthetic_landmarks(count=300, fps=30.0, seed=0):
+    """
+    Generate a sequence of plausible face landmark frames.
+
+    Uses the scripted landmark backend: the face sweeps around, the irises
+    follow and both eyes blink every second for a few frames.
+
+    Args:
+        count: Number of frames
+        fps: Frame rate used for timestamps
+        seed: Random seed of the face template and jitter
+
+    Returns:
+        list: LandmarkFrame objects (478 landmarks, with iris)
+    """
+    duration = count / fps
+    backend = ScriptedBackend(blinks=np.arange(0.5, duration, 1.0), blink_duration=0.1,
+                              noise=0.0005, seed=seed)
+    frames = []
+    for i in range(count):
+        landmark_frame = backend.process(None, i / fps)
+        landmark_frame.frame_shape = FRAME_SHAPE
+        frames.append(landmark_frame)
+    return frames
+
+
+def as_landmark_list(landmark_frame):
+    """
+    Wrap a LandmarkFrame as a MediaPipe-like NormalizedLandmarkList.
+
+    Args:
+        landmark_frame: LandmarkFrame to wrap
+
+    Returns:
+        SimpleNamespace: Object with a .landmark list of x/y/z objects
+    """
+    return SimpleNamespace(landmark=[
+        SimpleNamespace(x=float(x), y=float(y), z=float(z)) for x, y, z in landmark_frame.points
+    ])
+
+
+def measure(fn, inputs, iterations=2000, alloc_iterations=200, period=None):
+    """
+    Time a function and measure its allocations.
+
+    Args:
+        fn: Called as fn(input) for inputs taken round-robin
+        inputs: Sequence of inputs
+        iterations: Timed calls
+        alloc_iterations: Calls traced with tracemalloc (slower, run separately)
+        period: For timestamped inputs (LandmarkFrame), the duration of one
+                pass over them; each wrap adds it to the timestamps so time
+                keeps moving forward for the filters and the blink detector
+
+    Returns:
+        dict: us_per_call, alloc_bytes_per_call (peak), retained_bytes
+    """
+    n = len(inputs)
+    timestamps = [x.timestamp for x in inputs] if period is not None else None
+
+    def pick(k):
+        x = inputs[k % n]
+        if timestamps is not None:
+            x.timestamp = timestamps[k % n] + (k // n) * period
+        return x
+
+    # One call counter over all phases, so timestamps never jump backwards
+    calls = 0
+    try:
+        # Warm up (caches, lazy imports, filter state)
+        for _ in range(min(n, 50)):
+            fn(pick(calls))
+            calls += 1
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn(pick(calls))
+            calls += 1
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        try:
+            baseline, _ = tracemalloc.get_traced_memory()
+            peak_total = 0
+            for _ in range(alloc_iterations):
+                x = pick(calls)
+                calls += 1
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+                fn(x)
+                _, peak = tracemalloc.get_traced_memory()
+                peak_total += peak - before
+            retained, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    finally:
+        # The inputs are shared with other cases
+        if timestamps is not None:
+            for x, timestamp in zip(inputs, timestamps):
+                x.timestamp = timestamp
+
+    return {
+        'us_per_call': elapsed / iterations * 1e6,
+        'alloc_bytes_per_call': peak_total / alloc_iterations,
+        'retained_bytes': retained - baseline,
+    }
+
+
+def build_cases(frames):
+    """
+    Create the benchmarked callables.
+
+    Args:
+        frames: Synthetic LandmarkFrame sequence
+
+    Returns:
+        tuple: (cases, cleanup) - a list of (name, fn, inputs, period) tuples
+               (period: see measure) and the release functions to call afterwards
+    """
+    from blink_detector import BlinkDetector
+    from eye_tracker import EyeTracker
+    from gesture_detector import GestureDetector
+    from mouse_controller import MouseController
+
+    cases = []
+    # Duration of one pass over the frames (timestamps are evenly spaced)
+    period = len(frames) * (frames[1].timestamp - frames[0].timestamp)
+
+    # Only the position math is benchmarked - no model needed
+    head_tracker = EyeTracker(use_head_tracking=True, use_roi=False, backend='scripted')
+    iris_tracker = EyeTracker(use_head_tracking=False, use_roi=False, backend='scripted')
+    landmark_lists = [as_landmark_list(f) for f in frames[:60]]
+
+    cases.append(('LandmarkFrame.from_landmark_list',
+                  lambda l: LandmarkFrame.from_landmark_list(l, None, FRAME_SHAPE),
+                  landmark_lists, None))
+    cases.append(('get_eye_position[head]',
+                  lambda f: head_tracker.get_eye_position(f, FRAME_SHAPE), frames, period))
+    cases.append(('get_eye_position[iris]',
+                  lambda f: iris_tracker.get_eye_position(f, FRAME_SHAPE), frames, period))
+    cases.append(('_apply_nonlinear_scale',
+                  iris_tracker._apply_nonlinear_scale, list(np.linspace(-0.1, 1.1, 97)), None))
+
+    blink_detector = BlinkDetector()
+    eyes = [f.pixel_points(EAR_INDICES, FRAME_SHAPE)[0] for f in frames]
+    cases.append(('calculate_ear', blink_detector.calculate_ear, eyes, None))
+    eye_pairs = [f.pixel_points(EAR_INDICES, FRAME_SHAPE) for f in frames]
+    cases.append(('calculate_ear_batch[both eyes]', blink_detector.calculate_ear_batch, eye_pairs,
+                  None))
+    cases.append(('detect_blink',
+                  lambda f: blink_detector.detect_blink(f, FRAME_SHAPE), frames, period))
+
+    mouse_controller = MouseController(screen_size=SCREEN_SIZE, backend='null')
+    mouse_controller.load_calibration({
+        'calibrated': True, 'min_x': 0.40, 'max_x': 0.60, 'min_y': 0.45, 'max_y': 0.65,
+    })
+    gaze = [(float(f.points[NOSE_TIP, 0]), float(f.points[NOSE_TIP, 1])) for f in frames]
+    cases.append(('move_cursor', mouse_controller.move_cursor, gaze, None))
+
+    gesture_detector = GestureDetector(*SCREEN_SIZE)
+    cursor_positions = [(int(x * SCREEN_SIZE[0]), int(y * SCREEN_SIZE[1]))
+                        for x, y in np.stack([np.linspace(0, 1, 101), np.linspace(1, 0, 101)], axis=1)]
+    cases.append(('detect_edge_scroll',
+                  lambda p: gesture_detector.detect_edge_scroll(*p), cursor_positions, None))
+
+    cleanup = [head_tracker.release, iris_tracker.release, mouse_controller.shutdown]
+    return cases, cleanup
+
+
+def run_benchmarks(iterations=2000, alloc_iterations=200, only=None):
+    """
+    Run all hot path benchmarks.
+
+    Args:
+        iterations: Timed calls per function
+        alloc_iterations: Traced calls per function
+        only: Optional list of case names to run
+
+    Returns:
+        list: Result dicts with 'name' plus the measure() fields
+    """
+    frames = synthetic_landmarks()
+    results = []
+
+    # The detectors print on blinks/scrolls; keep that out of the report and timings
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        cases, cleanup = build_cases(frames)
+        try:
+            for name, fn, inputs, period in cases:
+                if only and name not in only:
+                    continue
+                result = measure(fn, inputs, iterations, alloc_iterations, period)
+                result['name'] = name
+                results.append(result)
+        finally:
+            for release in cleanup:
+                release()
+
+    return results
+
+
+def compare(results, baseline, max_regression):
+    """
+    Compare results against a baseline report.
+
+    Args:
+        results: Results of run_benchmarks()
+        baseline: Results loaded from an earlier --json report
+        max_regression: Allowed slowdown as a fraction (0.25 = 25% slower)
+
+    Returns:
+        list: (name, old_us, new_us) for every function over the limit
+    """
+    previous = {r['name']: r for r in baseline}
+    regressions = []
+    for r in results:
+        old = previous.get(r['name'])
+        if old and r['us_per_call'] > old['us_per_call'] * (1.0 + max_regression):
+            regressions.append((r['name'], old['us_per_call'], r['us_per_call']))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    """Print results as a table (with the change against a baseline, if given)."""
+    previous = {r['name']: r for r in baseline or []}
+    print(f"{'function':<34} {'us/call':>10} {'alloc B/call':>13} {'retained B':>11} {'change':>8}")
+    print("-" * 80)
+    for r in results:
+        old = previous.get(r['name'])
+        change = f"{(r['us_per_call'] / old['us_per_call'] - 1) * 100:+7.1f}%" if old else f"{'-':>8}"
+        print(f"{r['name']:<34} {r['us_per_call']:10.2f} {r['alloc_bytes_per_call']:13.0f} "
+              f"{r['retained_bytes']:11d} {change}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmark the per-frame hot paths")
+    parser.add_argument('--iterations', type=int, default=2000, help="Timed calls per function")
+    parser.add_argument('--alloc-iterations', type=int, default=200,
+                        help="Calls per function traced for allocations")
+    parser.add_argument('--only', nargs='+', help="Only run these functions")
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against an earlier --json report")
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help="Fail if a function is this much slower than the baseline (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.iterations, args.alloc_iterations, args.only)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.max_regression)
+        for name, old, new in regressions:
+            print(f"REGRESSION: {name} {old:.2f} -> {new:.2f} us/call")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,289 @@
+"""
+Pipeline Benchmark
+End-to-end latency benchmark of the full EyeMouseApp tracking pipeline on a
+recorded face video (or image directory). Cursor moves and clicks go to the
+null (recording) cursor backend, HighGUI calls are stubbed out and the Tk GUI
+and voice assistant are not created, so it runs without a display.
+
+For each configuration (tracking mode x preview on/off x filter) it reports
+the frame-in to cursor-command latency distribution (from the frame's
+arrival on the capture thread to each move command the cursor output thread
+sends, so queueing and gliding are included; arrival rather than media time,
+so --fast replays measure real latency too), sustained FPS, dropped frames and the per-stage timings of
+pipeline_profiler.py. Recorded-speed replays drop frames the pipeline can't
+keep up with, like a live camera; --fast replays process every frame.
+
+Usage:
+    python benchmark_pipeline.py face.mp4
+    python benchmark_pipeline.py face.mp4 --modes head iris --preview off on
+    python benchmark_pipeline.py face.mp4 --filters one_euro kalman --json report.json
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import time
+from collections import Counter
+
+import cv2
+import numpy as np
+
+from main import EyeMouseApp
+from cursor_backends import RecordingBackend
+from frame_source import ImageDirectorySource, open_frame_source
+from mouse_controller import MouseController
+from pipeline_profiler import PipelineProfiler
+
+SCREEN_SIZE = (1920, 1080)
+
+# Calibration covering the usual head/iris ratio ranges
+CALIBRATION = {'calibrated': True, 'min_x': 0.35, 'max_x': 0.65, 'min_y': 0.35, 'max_y': 0.65}
+
+# Latency histogram bin edges (ms); larger values are counted as overflow
+HISTOGRAM_EDGES = [0, 5, 10, 15, 20, 30, 40, 50, 75, 100, 150, 250, 500]
+
+
+class NullGUI:
+    """Stand-in for EyeMouseGUI that only remembers the last status."""
+
+    def __init__(self, start_callback, pause_callback, exit_callback, calibrate_callback,
+                 voice_toggle_callback=None, voice_listen_callback=None):
+        self.status = None
+
+    def update_status(self, status_text, color="blue"):
+        self.status = status_text
+
+    def update_calibration_status(self, is_calibrated):
+        pass
+
+    def update_voice_status(self, status_text, color='green'):
+        pass
+
+    def update_performance_status(self, status_text, color='gray'):
+        pass
+
+    def run(self):
+        pass
+
+    def destroy(self):
+        pass
+
+
+class NullMouseController(MouseController):
+    """MouseController on a recording backend: moves and clicks are only counted."""
+
+    def __init__(self, output_rate=180):
+        self.recorder = RecordingBackend(screen_size=SCREEN_SIZE, record_moves=False)
+        super().__init__(output_rate=output_rate, screen_size=SCREEN_SIZE, backend=self.recorder)
+        self.click_cooldown = 0.0  # Count every action the pipeline triggers
+
+    @property
+    def moves(self):
+        return self.recorder.counts['move']
+
+    @property
+    def actions(self):
+        """Counter of MouseController actions, derived from the recorded commands."""
+        actions = Counter()
+        for _, command, args in self.recorder.get_commands():
+            if command == 'click':
+                button, clicks = args
+                actions['double_click' if clicks == 2 else f'{button}_click'] += 1
+            elif command == 'scroll':
+                actions['scroll_up' if args[0] > 0 else 'scroll_down'] += 1
+            elif command == 'mouse_down':
+                actions['start_drag'] += 1
+            elif command == 'mouse_up':
+                actions['end_drag'] += 1
+        return actions
+
+
+@contextlib.contextmanager
+def stub_highgui():
+    """Replace the OpenCV window functions with no-ops while benchmarking."""
+    names = ('imshow', 'waitKey', 'namedWindow', 'destroyWindow', 'destroyAllWindows')
+    originals = {name: getattr(cv2, name) for name in names}
+    cv2.imshow = lambda *args: None
+    cv2.waitKey = lambda *args: -1
+    cv2.namedWindow = lambda *args: None
+    cv2.destroyWindow = lambda *args: None
+    cv2.destroyAllWindows = lambda *args: None
+    try:
+        yield
+    finally:
+        for name, fn in originals.items():
+            setattr(cv2, name, fn)
+
+
+def source_length(source):
+    """
+    Get the length of a recording.
+
+    Args:
+        source: Video file or image directory
+
+    Returns:
+        tuple: (frames, duration_s), (0, 0.0) if it can't be opened
+    """
+    frame_source = open_frame_source(source, realtime=False)
+    if not frame_source.open():
+        return 0, 0.0
+    try:
+        if isinstance(frame_source, ImageDirectorySource):
+            frames = len(frame_source.files)
+            return frames, frames / frame_source.fps
+        frames = int(frame_source.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return frames, frames / (frame_source.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+    finally:
+        frame_source.release()
+
+
+def summarize_latency(samples):
+    """
+    Summarize a latency distribution.
+
+    Args:
+        samples: Latencies in milliseconds
+
+    Returns:
+        dict: count, mean/p50/p95/p99/max (ms) and a histogram
+    """
+    if len(samples) == 0:
+        return {'count': 0}
+
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    counts, _ = np.histogram(samples, bins=HISTOGRAM_EDGES)
+    return {
+        'count': int(len(samples)),
+        'mean_ms': float(np.mean(samples)),
+        'p50_ms': float(p50),
+        'p95_ms': float(p95),
+        'p99_ms': float(p99),
+        'max_ms': float(np.max(samples)),
+        'histogram': {
+            'edges_ms': HISTOGRAM_EDGES,
+            'counts': counts.tolist(),
+            'overflow': int(np.sum(samples >= HISTOGRAM_EDGES[-1])),
+        },
+    }
+
+
+def run_config(source, mode='head', preview=False, filter_spec=None, realtime=True, timeout=600.0):
+    """
+    Replay a recording through the full pipeline with one configuration.
+
+    Args:
+        source: Video file or image directory
+        mode: 'head' or 'iris' tracking
+        preview: If True, run the preview thread (with stubbed HighGUI)
+        filter_spec: Filter preset/spec for the mode (None = app default)
+        realtime: Replay at recorded speed (False = as fast as possible)
+        timeout: Give up after this many seconds
+
+    Returns:
+        dict: Configuration, latency distribution, FPS and stage statistics
+    """
+    mouse_controller = NullMouseController()
+    mouse_controller.load_calibration(CALIBRATION)
+
+    # Keep every sample: one per frame per stage, frame_to_cursor up to one
+    # per cursor output tick
+    frames, duration = source_length(source)
+    window = max(1024, frames, int(duration * mouse_controller.output_worker.output_rate)) + 1024
+    profiler = PipelineProfiler(enabled=True, window=window)
+
+    app = EyeMouseApp(headless=not preview, source=source, realtime=realtime,
+                      profiler=profiler, mouse_controller=mouse_controller,
+                      gui_factory=NullGUI, enable_voice=False, drop_frames=realtime)
+    app.eye_tracker.set_tracking_mode(mode == 'head')
+    if filter_spec:
+        app.eye_tracker.set_filter(mode, filter_spec)
+
+    start = time.monotonic()
+    app.start_tracking()
+    if not app.is_tracking:
+        app.exit_app()
+        raise RuntimeError(f"Could not start tracking: {app.gui.status}")
+
+    app.tracking_thread.join(timeout)
+    elapsed = time.monotonic() - start
+    timed_out = app.tracking_thread.is_alive()
+
+    stats = profiler.get_stats()
+    latency = profiler.get_samples('frame_to_cursor')
+    capture_stats = app.capture.get_stats() if app.capture else {}
+    app.exit_app()
+
+    return {
+        'config': {
+            'mode': mode,
+            'preview': preview,
+            'filter': filter_spec or app.eye_tracker.filter_specs[mode],
+            'realtime': realtime,
+        },
+        'frames': stats['frames'],
+        'elapsed_s': elapsed,
+        'sustained_fps': stats['frames'] / elapsed if elapsed > 0 else 0.0,
+        'dropped_frames': stats['dropped_frames'],
+        'timed_out': timed_out,
+        'frame_to_cursor': summarize_latency(latency),
+        'stages': stats['stages'],
+        'capture': capture_stats,
+        'cursor_moves': mouse_controller.moves,
+        'actions': dict(mouse_controller.actions),
+    }
+
+
+def print_results(results):
+    """Print results as a table."""
+    print(f"{'mode':<6} {'preview':<8} {'filter':<16} {'frames':>7} {'fps':>7} {'dropped':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print("-" * 86)
+    for r in results:
+        c = r['config']
+        latency = r['frame_to_cursor']
+        if latency['count']:
+            percentiles = f"{latency['p50_ms']:8.1f} {latency['p95_ms']:8.1f} {latency['p99_ms']:8.1f}"
+        else:
+            percentiles = f"{'-':>8} {'-':>8} {'-':>8}"
+        print(f"{c['mode']:<6} {'on' if c['preview'] else 'off':<8} {str(c['filter'])[:16]:<16} "
+              f"{r['frames']:7d} {r['sustained_fps']:7.1f} {r['dropped_frames']:8d} {percentiles}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end latency benchmark on a replayed recording")
+    parser.add_argument('source', help="Face video file or image directory")
+    parser.add_argument('--modes', nargs='+', choices=['head', 'iris'], default=['head'],
+                        help="Tracking modes to compare")
+    parser.add_argument('--preview', nargs='+', choices=['off', 'on'], default=['off'],
+                        help="Run with the preview off and/or on")
+    parser.add_argument('--filters', nargs='+', default=[None],
+                        help="Filter presets to compare (default: the app's default per mode)")
+    parser.add_argument('--fast', action='store_true',
+                        help="Replay as fast as possible (throughput) instead of at recorded speed")
+    parser.add_argument('--timeout', type=float, default=600.0, help="Seconds per configuration")
+    parser.add_argument('--json', help="Write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    results = []
+    with stub_highgui():
+        for mode in args.modes:
+            for preview in args.preview:
+                for filter_spec in args.filters:
+                    print(f"\n=== mode={mode} preview={preview} filter={filter_spec or 'default'} ===")
+                    results.append(run_config(args.source, mode, preview == 'on', filter_spec,
+                                              realtime=not args.fast, timeout=args.timeout))
+
+    print()
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
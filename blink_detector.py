@@ -6,39 +6,78 @@ Triggers mouse clicks based on left/right eye blinks.
 
 import numpy as np
 import time
+from landmarks import as_landmark_frame, EAR_INDICES
+from blink_patterns import BlinkPatternDecoder, BLINK, LONG_BLINK
+from ear_threshold import AdaptiveEarThreshold
+
+# EAR point pairs: (p2, p6), (p3, p5) vertical and (p1, p4) horizontal
+_EAR_FROM = [1, 2, 0]
+_EAR_TO = [5, 4, 3]
+
+
+def eye_aspect_ratios(eyes):
+    """
+    Vectorized Eye Aspect Ratio for any number of eyes.
+    
+    EAR = (||p2-p6|| + ||p3-p5||) / (2 * ||p1-p4||)
+    
+    Args:
+        eyes: Array of shape (..., 6, 2) with the p1-p6 points of each eye
+    
+    Returns:
+        np.ndarray: EAR with shape eyes.shape[:-2]; 1.0 for zero-width eyes,
+                    NaN for NaN input (e.g. frames without a face)
+    """
+    eyes = np.asarray(eyes)
+    diff = eyes[..., _EAR_FROM, :] - eyes[..., _EAR_TO, :]
+    dist = np.hypot(diff[..., 0], diff[..., 1])
+    horizontal = dist[..., 2]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ear = (dist[..., 0] + dist[..., 1]) / (2.0 * horizontal)
+    return np.where(horizontal == 0, 1.0, ear)
+
 
 class BlinkDetector:
     """Detects eye blinks using Eye Aspect Ratio (EAR) algorithm."""
     
-    # MediaPipe landmark indices for eye points
+    # MediaPipe landmark indices for eye points (see landmarks.EAR_INDICES)
     # Left eye: [33, 160, 158, 133, 153, 144]
     # Right eye: [362, 385, 387, 263, 373, 380]
     
-    def __init__(self):
-        """Initialize blink detector with thresholds and state tracking."""
-        # EAR threshold (lower = more sensitive to blinks)
-        self.ear_threshold = 0.20
+    def __init__(self, patterns=None):
+        """
+        Initialize blink detector with thresholds and state tracking.
         
-        # Minimum consecutive frames for valid blink
-        self.min_blink_frames = 2
+        Args:
+            patterns: Blink pattern -> action table (see blink_patterns.DEFAULT_PATTERNS)
+        """
+        # EAR threshold (lower = more sensitive to blinks), adapted online to
+        # the user's open/closed-eye EAR unless set manually
+        self.ear_threshold = 0.20
+        self.adaptive_threshold = AdaptiveEarThreshold(self.ear_threshold)
+        self.use_adaptive_threshold = True
         
-        # State tracking for BOTH EYES blink detection
-        self.both_eyes_blink_counter = 0
+        # All timing uses frame capture timestamps, so detection doesn't
+        # depend on the frame rate or on processing delays.
+        # Minimum eyes-closed time for a valid blink
+        self.min_blink_ms = 60
         
-        # Blink sequence tracking for double/triple/quadruple blinks
-        self.blink_sequence = []
-        self.last_blink_time = 0
-        self.blink_sequence_timeout = 1.5  # Time window for detecting multiple blinks (increased for 4-5 blinks)
-        self.between_blink_min = 0.1  # Minimum time between blinks in a sequence
-        self.between_blink_max = 0.7  # Maximum time between blinks in a sequence
+        # Blink sequences are decoded by a prefix tree over the pattern table
+        self.pattern_decoder = BlinkPatternDecoder(patterns)
+        self.last_blink_time = float('-inf')
+        self.between_blink_min_ms = 100  # Minimum time between blinks in a sequence
+        self.long_blink_ms = 400  # Blinks this long are LONG_BLINK (if any pattern uses them)
         
         # Debouncing
-        self.last_action_time = 0
-        self.action_cooldown = 1.0  # Cooldown after any action (click/scroll/drag)
+        self.last_action_time = float('-inf')
+        self.action_cooldown_ms = 300  # Blinks right after an action are ignored
         
         # State for detecting blink completion
         self.in_blink = False
         self.blink_start_time = 0
+        
+        # Most recent (left, right) EAR, e.g. for session recording
+        self.last_ear = None
     
     def calculate_ear(self, eye_landmarks):
         """
@@ -56,23 +95,22 @@ class BlinkDetector:
         if len(eye_landmarks) < 6:
             return 1.0
         
-        # Vertical distances
-        v1 = np.linalg.norm(eye_landmarks[1] - eye_landmarks[5])
-        v2 = np.linalg.norm(eye_landmarks[2] - eye_landmarks[4])
-        
-        # Horizontal distance
-        h = np.linalg.norm(eye_landmarks[0] - eye_landmarks[3])
-        
-        # Avoid division by zero
-        if h == 0:
-            return 1.0
+        return float(eye_aspect_ratios(eye_landmarks))
+    
+    def calculate_ear_batch(self, eye_stack):
+        """
+        Calculate the EAR of a stack of eyes in one vectorized call.
         
-        # Calculate EAR
-        ear = (v1 + v2) / (2.0 * h)
+        Args:
+            eye_stack: Array of shape (N, 6, 2), e.g. one eye per recorded frame
+                       or (N, 2, 6, 2) for both eyes
         
-        return ear
+        Returns:
+            np.ndarray: EAR per eye, shape eye_stack.shape[:-2]
+        """
+        return eye_aspect_ratios(eye_stack)
     
-    def detect_blink(self, face_landmarks, frame_shape):
+    def detect_blink(self, face_landmarks, frame_shape, timestamp=None):
         """
         Detect blinks from face landmarks and return actions.
         
@@ -83,8 +121,10 @@ class BlinkDetector:
         - 5 blinks = MIDDLE CLICK
         
         Args:
-            face_landmarks: MediaPipe face landmarks
+            face_landmarks: LandmarkFrame (or MediaPipe face landmarks)
             frame_shape: Shape of the frame (height, width, channels)
+            timestamp: Capture time of the frame (seconds); defaults to the
+                       LandmarkFrame's timestamp, then to the current time
         
         Returns:
             dict: {'left_click': bool, 'right_click': bool, 'scroll_up': bool, 
@@ -99,135 +139,98 @@ class BlinkDetector:
         if not face_landmarks:
             return default_result
         
-        h, w = frame_shape[:2]
-        
-        # Extract eye landmarks
-        left_eye_indices = [33, 160, 158, 133, 153, 144]
-        right_eye_indices = [362, 385, 387, 263, 373, 380]
-        
-        left_eye = np.array([(face_landmarks.landmark[i].x * w,
-                              face_landmarks.landmark[i].y * h)
-                             for i in left_eye_indices])
+        landmark_frame = as_landmark_frame(face_landmarks, frame_shape)
         
-        right_eye = np.array([(face_landmarks.landmark[i].x * w,
-                               face_landmarks.landmark[i].y * h)
-                              for i in right_eye_indices])
+        # Extract both eyes in one lookup: shape (2, 6, 2) in pixels
+        eyes = landmark_frame.pixel_points(EAR_INDICES, frame_shape)
         
-        # Calculate EAR for both eyes
-        left_ear = self.calculate_ear(left_eye)
-        right_ear = self.calculate_ear(right_eye)
+        # Calculate EAR for both eyes in one operation
+        left_ear, right_ear = eye_aspect_ratios(eyes).tolist()
+        self.last_ear = (left_ear, right_ear)
         
         # Average EAR (both eyes must be closed for blink)
         avg_ear = (left_ear + right_ear) / 2
         
-        current_time = time.time()
+        if timestamp is None:
+            timestamp = landmark_frame.timestamp
+        current_time = time.monotonic() if timestamp is None else timestamp
+        
+        if self.use_adaptive_threshold:
+            self.ear_threshold = self.adaptive_threshold.update(avg_ear, current_time)
         
         # Detect when BOTH eyes are closed
         if avg_ear < self.ear_threshold:
             if not self.in_blink:
-                # Start of a new blink
+                # Start of a new blink (first frame captured with closed eyes)
                 self.in_blink = True
                 self.blink_start_time = current_time
-            self.both_eyes_blink_counter += 1
-        else:
-            # Eyes are open
-            if self.in_blink and self.both_eyes_blink_counter >= self.min_blink_frames:
+        elif self.in_blink:
+            # Eyes open again - closed from blink_start_time until this frame
+            self.in_blink = False
+            duration_ms = (current_time - self.blink_start_time) * 1000.0
+            if duration_ms >= self.min_blink_ms:
                 # Valid blink completed
-                self.in_blink = False
-                self.both_eyes_blink_counter = 0
-                
-                # Add blink to sequence
-                self._add_blink_to_sequence(current_time)
-            else:
-                self.in_blink = False
-                self.both_eyes_blink_counter = 0
+                self._add_blink_to_sequence(current_time, duration_ms)
         
         # Check for blink patterns (2, 3, 4, or 5 blinks)
         result = self._check_blink_sequence(current_time)
         
         return result
     
-    def _add_blink_to_sequence(self, current_time):
+    @property
+    def blink_sequence(self):
+        """deque: Times of the blinks in the current (undecided) sequence."""
+        return self.pattern_decoder.blinks
+    
+    def set_patterns(self, patterns):
+        """
+        Replace the blink pattern -> action table.
+        
+        Args:
+            patterns: Dict of pattern -> action or (action, max_gap_ms), e.g.
+                      {'..': 'right_click', '.-': ('scroll_down', 600)}
+        """
+        self.pattern_decoder.set_patterns(patterns)
+        print(f"Blink patterns updated: {len(patterns)} patterns")
+    
+    def _add_blink_to_sequence(self, current_time, duration_ms=0.0):
         """Add a completed blink to the sequence."""
-        # Clean old blinks outside the time window
-        self.blink_sequence = [t for t in self.blink_sequence 
-                               if current_time - t < self.blink_sequence_timeout]
+        # Trailing blinks of the pattern that just fired
+        if (current_time - self.last_action_time) * 1000.0 < self.action_cooldown_ms:
+            return
         
         # Check if enough time has passed since last blink
-        if len(self.blink_sequence) == 0 or \
-           (current_time - self.blink_sequence[-1]) >= self.between_blink_min:
-            self.blink_sequence.append(current_time)
-            print(f"Blink detected! Sequence count: {len(self.blink_sequence)}")
+        if (current_time - self.last_blink_time) * 1000.0 < self.between_blink_min_ms:
+            return
+        self.last_blink_time = current_time
+        
+        decoder = self.pattern_decoder
+        long_blink = decoder.uses_long_blinks and duration_ms >= self.long_blink_ms
+        decoder.add_blink(current_time, LONG_BLINK if long_blink else BLINK)
+        print(f"Blink detected! Sequence count: {len(self.blink_sequence)}")
     
     def _check_blink_sequence(self, current_time):
         """
-        Check if the blink sequence matches a pattern.
+        Check if the blink sequence completed a pattern.
+        
+        Unambiguous patterns fire at their last blink; a pattern that is the
+        prefix of a longer one fires once the longer one can no longer match.
         
         Returns:
             dict: {'left_click': bool, 'right_click': bool, 'scroll_up': bool, 
                    'scroll_down': bool, 'drag_toggle': bool, 'middle_click': bool}
         """
-        # Clean old blinks
-        self.blink_sequence = [t for t in self.blink_sequence 
-                               if current_time - t < self.blink_sequence_timeout]
-        
-        # Check cooldown
-        if current_time - self.last_action_time < self.action_cooldown:
-            return {
-                'left_click': False, 'right_click': False, 
-                'scroll_up': False, 'scroll_down': False,
-                'drag_toggle': False, 'middle_click': False
-            }
-        
         result = {
             'left_click': False, 'right_click': False,
             'scroll_up': False, 'scroll_down': False,
             'drag_toggle': False, 'middle_click': False
         }
         
-        # Check for 5 blinks (MIDDLE CLICK)
-        if len(self.blink_sequence) >= 5:
-            time_span = self.blink_sequence[-1] - self.blink_sequence[-5]
-            if time_span <= self.blink_sequence_timeout:
-                result['middle_click'] = True
-                self.blink_sequence = []
-                self.last_action_time = current_time
-                print("✓ 5 BLINKS DETECTED -> MIDDLE CLICK")
-                return result
-        
-        # Check for 4 blinks (DRAG TOGGLE - start/stop drag)
-        if len(self.blink_sequence) >= 4:
-            time_span = self.blink_sequence[-1] - self.blink_sequence[-4]
-            if time_span <= self.blink_sequence_timeout:
-                result['drag_toggle'] = True
-                self.blink_sequence = []
-                self.last_action_time = current_time
-                print("✓ 4 BLINKS DETECTED -> DRAG TOGGLE")
-                return result
-        
-        # Check for triple blink (LEFT CLICK)
-        if len(self.blink_sequence) >= 3:
-            time_span = self.blink_sequence[-1] - self.blink_sequence[-3]
-            if time_span <= self.blink_sequence_timeout:
-                # Wait to see if it's actually 4 or 5 blinks
-                if current_time - self.blink_sequence[-1] > 0.5:
-                    result['left_click'] = True
-                    self.blink_sequence = []
-                    self.last_action_time = current_time
-                    print("✓ 3 BLINKS DETECTED -> LEFT CLICK")
-                    return result
-        
-        # Check for double blink (RIGHT CLICK)
-        elif len(self.blink_sequence) >= 2:
-            time_between = self.blink_sequence[-1] - self.blink_sequence[-2]
-            if self.between_blink_min <= time_between <= self.between_blink_max:
-                # Wait to see if it's actually a triple blink
-                if current_time - self.blink_sequence[-1] > 0.5:
-                    result['right_click'] = True
-                    self.blink_sequence = []
-                    self.last_action_time = current_time
-                    print("✓ 2 BLINKS DETECTED -> RIGHT CLICK")
-                    return result
+        action = self.pattern_decoder.update(current_time)
+        if action:
+            result[action] = True
+            self.last_action_time = current_time
+            print(f"✓ BLINK PATTERN DETECTED -> {action.replace('_', ' ').upper()}")
         
         return result
     
@@ -246,8 +249,58 @@ class BlinkDetector:
             threshold: EAR threshold value (typically 0.15-0.25)
         """
         self.ear_threshold = threshold
+        self.use_adaptive_threshold = False  # A manual threshold stays fixed
         print(f"Blink threshold updated: {threshold}")
     
+    def set_adaptive_threshold(self, enabled):
+        """
+        Enable or disable the per-user adaptive EAR threshold.
+        
+        Args:
+            enabled: True to adapt the threshold to the user's EAR distribution
+        """
+        self.use_adaptive_threshold = enabled
+        if enabled:
+            self.ear_threshold = self.adaptive_threshold.threshold
+        print(f"Adaptive blink threshold: {'enabled' if enabled else 'disabled'}")
+    
+    def get_threshold_estimate(self):
+        """
+        Get the live threshold estimate.
+        
+        Returns:
+            dict: threshold in use, adaptive flag and the estimator's open/closed-eye
+                  EAR levels (see AdaptiveEarThreshold.get_estimate)
+        """
+        estimate = self.adaptive_threshold.get_estimate()
+        estimate['threshold'] = self.ear_threshold
+        estimate['adaptive'] = self.use_adaptive_threshold
+        return estimate
+    
+    def get_threshold_state(self):
+        """
+        Get the blink threshold state for the user's profile.
+        
+        Returns:
+            dict: JSON-serializable state
+        """
+        state = self.adaptive_threshold.get_state()
+        state['adaptive'] = self.use_adaptive_threshold
+        state['ear_threshold'] = self.ear_threshold
+        return state
+    
+    def load_threshold_state(self, state):
+        """
+        Restore a state saved by get_threshold_state().
+        
+        Args:
+            state: Dict from get_threshold_state()
+        """
+        self.adaptive_threshold.load_state(state)
+        self.use_adaptive_threshold = state.get('adaptive', True)
+        self.ear_threshold = state.get('ear_threshold', self.adaptive_threshold.threshold)
+        print(f"Blink threshold restored: {self.ear_threshold:.3f}")
+    
     def enable_double_blink_detection(self, enable=True):
         """
         Enable or disable double blink detection.
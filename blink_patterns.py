@@ -0,0 +1,165 @@
+"""
+Blink Patterns Module
+Decodes blink sequences into actions with a prefix tree.
+A pattern is a string of blink symbols ('.' = blink, '-' = long blink)
+mapped to an action. Each blink moves one level down the tree; an action
+fires as soon as no longer pattern can still match - immediately at a leaf,
+or once the wait for the next blink of a longer pattern has run out.
+"""
+
+from collections import deque
+
+BLINK = '.'
+LONG_BLINK = '-'
+
+# Pattern -> (action, max milliseconds between consecutive blinks)
+DEFAULT_PATTERNS = {
+    '..': ('right_click', 500),
+    '...': ('left_click', 500),
+    '....': ('drag_toggle', 500),
+    '.....': ('middle_click', 500),
+}
+
+
+class _Node:
+    """Prefix tree node: the patterns that start with the blinks so far."""
+
+    __slots__ = ('children', 'action', 'gap', 'wait')
+
+    def __init__(self):
+        self.children = {}
+        self.action = None  # Action of the pattern ending here
+        self.gap = 0.0      # That pattern's max seconds between consecutive blinks
+        self.wait = 0.0     # Seconds to wait for the next blink of a longer pattern
+
+
+class BlinkPatternDecoder:
+    """State machine over a compiled pattern-to-action table."""
+
+    def __init__(self, patterns=None, default_gap_ms=500):
+        """
+        Initialize the decoder.
+
+        Args:
+            patterns: Dict of pattern -> action or (action, max_gap_ms), see
+                      DEFAULT_PATTERNS
+            default_gap_ms: max_gap_ms for patterns given without one
+        """
+        self.default_gap_ms = default_gap_ms
+        self.set_patterns(patterns or DEFAULT_PATTERNS)
+
+    def set_patterns(self, patterns):
+        """
+        Compile a pattern table into the prefix tree.
+
+        Args:
+            patterns: Dict of pattern -> action or (action, max_gap_ms)
+
+        Raises:
+            ValueError: Empty pattern, unknown symbol or duplicate pattern
+        """
+        root = _Node()
+        for pattern, spec in patterns.items():
+            action, max_gap_ms = spec if isinstance(spec, tuple) else (spec, self.default_gap_ms)
+            if not pattern or set(pattern) - {BLINK, LONG_BLINK}:
+                raise ValueError(f"Invalid blink pattern: {pattern!r}")
+
+            node = root
+            for i, symbol in enumerate(pattern):
+                if i > 0:
+                    # Wait long enough here for this pattern's next blink
+                    node.wait = max(node.wait, max_gap_ms / 1000.0)
+                node = node.children.setdefault(symbol, _Node())
+            if node.action is not None:
+                raise ValueError(f"Duplicate blink pattern: {pattern!r}")
+            node.action = action
+            node.gap = max_gap_ms / 1000.0
+
+        self.patterns = dict(patterns)
+        self.uses_long_blinks = any(LONG_BLINK in p for p in patterns)
+        self._root = root
+        self.blinks = deque(maxlen=max(len(p) for p in patterns))
+        self._queued = None
+        self.reset()
+
+    def reset(self):
+        """Forget the blinks of the current sequence."""
+        self._node = self._root
+        self.blinks.clear()
+
+    def add_blink(self, timestamp, symbol=BLINK):
+        """
+        Advance the state machine by one completed blink.
+
+        Args:
+            timestamp: Time of the blink (seconds)
+            symbol: BLINK or LONG_BLINK
+        """
+        node = self._node
+        if node is not self._root and timestamp - self.blinks[-1] > node.wait:
+            # Too late for a longer pattern - the current one completes first
+            self._queued = self._complete(node)
+            self.reset()
+            node = self._root
+
+        child = node.children.get(symbol)
+        if child is None and node is not self._root:
+            # No pattern continues this way - the current one completes and
+            # the blink starts a new sequence
+            self._queued = self._complete(node)
+            self.reset()
+            child = self._root.children.get(symbol)
+        if child is None:
+            return
+
+        self._node = child
+        self.blinks.append(timestamp)
+
+    def update(self, timestamp):
+        """
+        Check for a completed pattern; call once per frame.
+
+        Args:
+            timestamp: Current time (seconds)
+
+        Returns:
+            str: Action name, or None
+        """
+        if self._queued is not None:
+            action, self._queued = self._queued, None
+            return action
+
+        node = self._node
+        if node is self._root:
+            return None
+
+        if not node.children:
+            # Leaf - nothing longer can match, fire right away
+            action = self._complete(node)
+            self.reset()
+            return action
+
+        if timestamp - self.blinks[-1] > node.wait:
+            action = self._complete(node)
+            self.reset()
+            return action
+        return None
+
+    def _complete(self, node):
+        """
+        Get the action of the pattern the blinks so far spell out.
+
+        Args:
+            node: Node reached by the current blinks
+
+        Returns:
+            str: The action, or None if the blinks were only a prefix or a
+                 gap exceeded the pattern's own max_gap_ms
+        """
+        if node.action is None:
+            return None
+        blinks = self.blinks
+        for i in range(1, len(blinks)):
+            if blinks[i] - blinks[i - 1] > node.gap:
+                return None
+        return node.action
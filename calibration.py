@@ -50,12 +50,12 @@ class GazeCalibrator:
         
         self.is_calibrated = False
     
-    def start_calibration(self, cap, eye_tracker):
+    def start_calibration(self, capture, eye_tracker):
         """
         Start the calibration process.
         
         Args:
-            cap: OpenCV video capture object
+            capture: ThreadedCapture frame source
             eye_tracker: EyeTracker instance
         
         Returns:
@@ -77,7 +77,7 @@ class GazeCalibrator:
             print(f"Calibration Point {point_idx + 1}/5: {label}")
             
             # Collect gaze data for this point
-            gaze_ratio = self._capture_calibration_point(cap, eye_tracker, screen_pos, label)
+            gaze_ratio = self._capture_calibration_point(capture, eye_tracker, screen_pos, label)
             
             if gaze_ratio is None:
                 print("Calibration failed or cancelled.")
@@ -104,12 +104,12 @@ class GazeCalibrator:
         
         return True
     
-    def _capture_calibration_point(self, cap, eye_tracker, screen_pos, label):
+    def _capture_calibration_point(self, capture, eye_tracker, screen_pos, label):
         """
         Capture gaze data for a single calibration point.
         
         Args:
-            cap: Video capture object
+            capture: ThreadedCapture frame source
             eye_tracker: EyeTracker instance
             screen_pos: (x, y) normalized screen position
             label: String label for the point
@@ -126,15 +126,22 @@ class GazeCalibrator:
         start_time = time.time()
         timeout = 15  # 15 seconds timeout per point
         
+        # Don't use frames captured while the previous point was shown
+        capture.drop_stale()
+        last_sequence = None
+        
         while not blink_detected and (time.time() - start_time) < timeout:
-            ret, frame = cap.read()
-            if not ret:
+            captured = capture.read(after_sequence=last_sequence, timeout=0.5)
+            if captured is None:
+                if not capture.isOpened():
+                    break
                 continue
+            last_sequence = captured.sequence
             
-            frame = cv2.flip(frame, 1)
+            frame = cv2.flip(captured.frame, 1)
             
             # Process frame for eye tracking
-            frame, landmarks = eye_tracker.process_frame(frame)
+            frame, landmarks = eye_tracker.process_frame(frame, captured.timestamp)
             
             if landmarks:
                 # Get current gaze position
@@ -258,7 +265,8 @@ class GazeCalibrator:
             'max_x': self.max_x_ratio,
             'min_y': self.min_y_ratio,
             'max_y': self.max_y_ratio,
-            'calibrated': True
+            'calibrated': True,
+            'blink_threshold': self.blink_detector.get_threshold_state()
         }
     
     def load_calibration(self, calibration_data):
@@ -274,6 +282,8 @@ class GazeCalibrator:
             self.min_y_ratio = calibration_data['min_y']
             self.max_y_ratio = calibration_data['max_y']
             self.is_calibrated = True
+            if calibration_data.get('blink_threshold'):
+                self.blink_detector.load_threshold_state(calibration_data['blink_threshold'])
             print("Calibration data loaded successfully.")
         else:
             print("No valid calibration data to load.")
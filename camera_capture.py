@@ -0,0 +1,277 @@
+"""
+Camera Capture Module
+Runs a frame source (camera or replay) on a producer thread.
+Keeps only the newest frames (with capture timestamp and sequence number)
+so consumers never work on frames queued up inside the camera driver.
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+from frame_source import open_frame_source
+
+# A captured frame with its capture time, its sequence number and the time it
+# reached the capture thread (all time.monotonic). Replays stamp frames with
+# their media time, so latencies are measured from 'arrival'; for live
+# cameras both times are the same.
+CapturedFrame = namedtuple('CapturedFrame', ['frame', 'timestamp', 'sequence', 'arrival'])
+
+
+class ThreadedCapture:
+    """Owns the frame source and continuously grabs the latest frame."""
+
+    def __init__(self, source=0, buffer_size=2, realtime=True, drop_frames=None):
+        """
+        Initialize the threaded capture.
+
+        Args:
+            source: Camera index, video file, image directory or FrameSource
+                    (see frame_source.open_frame_source)
+            buffer_size: Number of recent frames kept in the ring buffer
+            realtime: Replay recorded sources at their original speed
+            drop_frames: If True, overwrite frames consumers haven't read yet.
+                         Defaults to True for live cameras and False for replays,
+                         which then deliver every frame exactly once, in order.
+        """
+        self.source = source
+        self.buffer_size = max(1, buffer_size)
+        self.realtime = realtime
+        self.drop_frames = drop_frames
+
+        self.frame_source = None
+        self._pending_resolution = None  # Applied by the capture thread
+        self._last_read_sequence = -1
+        self._buffer = [None] * self.buffer_size
+        self._next_sequence = 0
+        self._condition = threading.Condition()
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_skipped = 0  # Frames consumers never read (newer one was available)
+        self.read_failures = 0
+        self.max_read_failures = 30  # Consecutive failures before giving up
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """
+        Open the camera and start the producer thread.
+
+        Returns:
+            bool: True if the camera is open and capturing, False otherwise
+        """
+        if self._running:
+            return True
+
+        self.frame_source = open_frame_source(self.source, realtime=self.realtime)
+        if not self.frame_source.open():
+            self.frame_source.release()
+            self.frame_source = None
+            return False
+
+        if self.drop_frames is None:
+            self.drop_frames = self.frame_source.is_live
+
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        return True
+
+    def isOpened(self):
+        """
+        Check if the capture is running.
+
+        Returns:
+            bool: True if frames are being captured, False otherwise
+        """
+        return self._running
+
+    def is_finished(self):
+        """
+        Check if a replayed source reached its end.
+
+        Returns:
+            bool: True at the end of a video file / image directory
+        """
+        return self.frame_source is not None and self.frame_source.is_finished
+
+    def release(self):
+        """Stop the producer thread and release the camera."""
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+        if self.frame_source:
+            self.frame_source.release()
+            self.frame_source = None
+
+        self.drop_stale()
+
+    def read(self, after_sequence=None, timeout=1.0):
+        """
+        Get the newest frame, waiting for one newer than after_sequence.
+
+        Without frame dropping (replays) the oldest unread frame is returned
+        instead, so every frame is delivered in order.
+
+        Args:
+            after_sequence: Sequence number of the last frame the caller used
+                            (None = accept any buffered frame)
+            timeout: Maximum seconds to wait for a new frame
+
+        Returns:
+            CapturedFrame: Newest frame or None on timeout / closed capture
+        """
+        deadline = time.monotonic() + timeout
+
+        with self._condition:
+            while True:
+                if self.drop_frames:
+                    captured = self._latest()
+                else:
+                    captured = self._oldest_after(after_sequence)
+                if captured is not None and (after_sequence is None or captured.sequence > after_sequence):
+                    if after_sequence is not None:
+                        self.frames_skipped += captured.sequence - after_sequence - 1
+                    self._last_read_sequence = max(self._last_read_sequence, captured.sequence)
+                    self._condition.notify_all()
+                    return captured
+
+                remaining = deadline - time.monotonic()
+                if not self._running or remaining <= 0:
+                    return None
+                self._condition.wait(remaining)
+
+    def set_resolution(self, size):
+        """
+        Request a new capture resolution.
+
+        The capture thread applies it before its next read, so the camera is
+        never reconfigured while a frame is being grabbed.
+
+        Args:
+            size: (width, height), or None for the camera's original resolution
+
+        Returns:
+            bool: True if the source supports resolution changes (live cameras)
+        """
+        if self.frame_source is None or not self.frame_source.is_live:
+            return False
+        self._pending_resolution = (size,)
+        return True
+
+    def get_recent(self):
+        """
+        Get all buffered frames, oldest first.
+
+        Returns:
+            list: CapturedFrame entries currently in the ring buffer
+        """
+        with self._condition:
+            frames = [f for f in self._buffer if f is not None]
+        return sorted(frames, key=lambda f: f.sequence)
+
+    def drop_stale(self, max_age=None):
+        """
+        Explicitly discard buffered frames.
+
+        Args:
+            max_age: Drop only frames older than this many seconds
+                     (None = drop everything)
+        """
+        now = time.monotonic()
+        with self._condition:
+            for i, captured in enumerate(self._buffer):
+                if captured is None:
+                    continue
+                if max_age is None or now - captured.arrival > max_age:
+                    self._buffer[i] = None
+                    # Dropped frames count as read so a replay can continue
+                    self._last_read_sequence = max(self._last_read_sequence, captured.sequence)
+            self._condition.notify_all()
+
+    def get_stats(self):
+        """
+        Get capture statistics.
+
+        Returns:
+            dict: Captured, skipped and failed frame counts
+        """
+        return {
+            'frames_captured': self.frames_captured,
+            'frames_skipped': self.frames_skipped,
+            'read_failures': self.read_failures,
+        }
+
+    def _latest(self):
+        """Return the newest buffered frame (caller holds the lock)."""
+        latest = None
+        for captured in self._buffer:
+            if captured is not None and (latest is None or captured.sequence > latest.sequence):
+                latest = captured
+        return latest
+
+    def _oldest_after(self, after_sequence):
+        """Return the oldest buffered frame newer than after_sequence (caller holds the lock)."""
+        oldest = None
+        for captured in self._buffer:
+            if captured is None:
+                continue
+            if after_sequence is not None and captured.sequence <= after_sequence:
+                continue
+            if oldest is None or captured.sequence < oldest.sequence:
+                oldest = captured
+        return oldest
+
+    def _capture_loop(self):
+        """Producer loop: grab frames as fast as the source delivers them."""
+        consecutive_failures = 0
+
+        while self._running:
+            # Without frame dropping, wait until there is room for an unread frame
+            if not self.drop_frames:
+                with self._condition:
+                    while (self._running and
+                           self._next_sequence - self._last_read_sequence > self.buffer_size):
+                        self._condition.wait(0.1)
+                if not self._running:
+                    break
+
+            if self._pending_resolution is not None:
+                (size,) = self._pending_resolution
+                self._pending_resolution = None
+                self.frame_source.set_resolution(size)
+
+            ret, frame, timestamp = self.frame_source.read()
+
+            if not ret:
+                if self.frame_source.is_finished:
+                    print("Frame source: end of stream")
+                    break
+                self.read_failures += 1
+                consecutive_failures += 1
+                if consecutive_failures >= self.max_read_failures:
+                    print("Camera capture: too many read failures, stopping")
+                    break
+                time.sleep(0.01)
+                continue
+            consecutive_failures = 0
+            arrival = timestamp if self.frame_source.is_live else time.monotonic()
+
+            with self._condition:
+                sequence = self._next_sequence
+                self._next_sequence += 1
+                self._buffer[sequence % self.buffer_size] = CapturedFrame(frame, timestamp, sequence,
+                                                                          arrival)
+                self.frames_captured += 1
+                self._condition.notify_all()
+
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
@@ -0,0 +1,380 @@
+"""
+Cursor Backends Module
+Interface between MouseController and the OS pointer. Every cursor motion,
+click, drag and scroll goes through a backend:
+
+    'pyautogui' - PyAutoGUI, portable (default)
+    'xtest'     - X11 XTest extension via python-xlib, no per-call checks
+    'uinput'    - Linux uinput virtual absolute pointer via python-evdev
+                  (works under X11 and Wayland, needs write access to /dev/uinput)
+    'null'      - records timestamped commands in memory (benchmarks, tests)
+"""
+
+import threading
+import time
+from collections import Counter, deque
+
+
+class CursorBackend:
+    """Base class for cursor backends. Coordinates are screen pixels."""
+
+    def move_to(self, x, y):
+        """
+        Place the cursor (called from the cursor output thread).
+
+        Args:
+            x: X position in pixels
+            y: Y position in pixels
+        """
+        raise NotImplementedError
+
+    def click(self, button='left', clicks=1):
+        """
+        Click a mouse button.
+
+        Args:
+            button: 'left', 'middle' or 'right'
+            clicks: Number of clicks (2 = double click)
+        """
+        for _ in range(clicks):
+            self.mouse_down(button)
+            self.mouse_up(button)
+
+    def mouse_down(self, button='left'):
+        """Press and hold a mouse button."""
+        raise NotImplementedError
+
+    def mouse_up(self, button='left'):
+        """Release a mouse button."""
+        raise NotImplementedError
+
+    def scroll(self, amount):
+        """
+        Scroll the wheel.
+
+        Args:
+            amount: Scroll units, positive = up, negative = down
+        """
+        raise NotImplementedError
+
+    def position(self):
+        """
+        Get the cursor position.
+
+        Returns:
+            tuple: (x, y) in pixels, or None if unknown
+        """
+        return None
+
+    def screen_size(self):
+        """
+        Get the screen size as seen by the backend.
+
+        Returns:
+            tuple: (width, height) in pixels, or None if unknown
+        """
+        return None
+
+    def close(self):
+        """Release the backend's resources."""
+
+
+class PyAutoGUIBackend(CursorBackend):
+    """PyAutoGUI (fail-safe: move the mouse to a screen corner to abort)."""
+
+    def __init__(self, failsafe=True, pause=0.01):
+        """
+        Initialize PyAutoGUI.
+
+        Args:
+            failsafe: Enable PyAutoGUI's corner fail-safe
+            pause: Pause after clicks/scrolls (cursor moves skip it)
+
+        Raises:
+            RuntimeError: PyAutoGUI is not available (e.g. no display)
+        """
+        try:
+            import pyautogui
+        except Exception as e:
+            raise RuntimeError(f"pyautogui is not available: {e}")
+
+        self.pyautogui = pyautogui
+        pyautogui.FAILSAFE = failsafe
+        pyautogui.PAUSE = pause
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, _pause=False)
+
+    def click(self, button='left', clicks=1):
+        self.pyautogui.click(button=button, clicks=clicks)
+
+    def mouse_down(self, button='left'):
+        self.pyautogui.mouseDown(button=button)
+
+    def mouse_up(self, button='left'):
+        self.pyautogui.mouseUp(button=button)
+
+    def scroll(self, amount):
+        self.pyautogui.scroll(amount)
+
+    def position(self):
+        return tuple(self.pyautogui.position())
+
+    def screen_size(self):
+        return tuple(self.pyautogui.size())
+
+
+class XTestBackend(CursorBackend):
+    """Fake input events through the X11 XTest extension (python-xlib)."""
+
+    # X11 button numbers; 4/5 are wheel up/down
+    BUTTON_CODES = {'left': 1, 'middle': 2, 'right': 3}
+    WHEEL_UP = 4
+    WHEEL_DOWN = 5
+
+    def __init__(self, display_name=None):
+        """
+        Connect to the X server.
+
+        Args:
+            display_name: X display (default: $DISPLAY)
+
+        Raises:
+            RuntimeError: python-xlib missing or no X display / XTest
+        """
+        try:
+            from Xlib import X, display
+            from Xlib.ext import xtest
+            self.display = display.Display(display_name)
+        except Exception as e:
+            raise RuntimeError(f"XTest is not available: {e}")
+
+        if not self.display.has_extension('XTEST'):
+            self.display.close()
+            raise RuntimeError("XTest is not available: X server has no XTEST extension")
+
+        self.X = X
+        self.xtest = xtest
+        self.root = self.display.screen().root
+        # One display connection is shared by the output and tracking threads
+        self._lock = threading.Lock()
+
+    def move_to(self, x, y):
+        with self._lock:
+            self.xtest.fake_input(self.display, self.X.MotionNotify, x=int(x), y=int(y))
+            self.display.flush()
+
+    def mouse_down(self, button='left'):
+        self._button(self.X.ButtonPress, self.BUTTON_CODES[button])
+
+    def mouse_up(self, button='left'):
+        self._button(self.X.ButtonRelease, self.BUTTON_CODES[button])
+
+    def scroll(self, amount):
+        code = self.WHEEL_UP if amount > 0 else self.WHEEL_DOWN
+        for _ in range(abs(int(amount))):
+            self._button(self.X.ButtonPress, code)
+            self._button(self.X.ButtonRelease, code)
+
+    def position(self):
+        with self._lock:
+            pointer = self.root.query_pointer()
+        return pointer.root_x, pointer.root_y
+
+    def screen_size(self):
+        screen = self.display.screen()
+        return screen.width_in_pixels, screen.height_in_pixels
+
+    def close(self):
+        with self._lock:
+            self.display.close()
+
+    def _button(self, event_type, code):
+        with self._lock:
+            self.xtest.fake_input(self.display, event_type, code)
+            self.display.flush()
+
+
+class UInputBackend(CursorBackend):
+    """Virtual absolute pointer device through Linux uinput (python-evdev)."""
+
+    def __init__(self, screen_size, name='eye-mouse-pointer'):
+        """
+        Create the virtual device.
+
+        Args:
+            screen_size: (width, height) in pixels; the absolute axes span the screen
+            name: Device name shown to the system
+
+        Raises:
+            RuntimeError: python-evdev missing or /dev/uinput not writable
+        """
+        if screen_size is None:
+            raise RuntimeError("uinput needs the screen size")
+        try:
+            from evdev import UInput, AbsInfo, ecodes
+        except Exception as e:
+            raise RuntimeError(f"uinput is not available: {e}")
+
+        width, height = screen_size
+        self.ecodes = ecodes
+        self.button_codes = {'left': ecodes.BTN_LEFT, 'middle': ecodes.BTN_MIDDLE,
+                             'right': ecodes.BTN_RIGHT}
+        capabilities = {
+            ecodes.EV_KEY: list(self.button_codes.values()),
+            ecodes.EV_ABS: [
+                (ecodes.ABS_X, AbsInfo(value=0, min=0, max=width - 1, fuzz=0, flat=0, resolution=0)),
+                (ecodes.ABS_Y, AbsInfo(value=0, min=0, max=height - 1, fuzz=0, flat=0, resolution=0)),
+            ],
+            ecodes.EV_REL: [ecodes.REL_WHEEL],
+        }
+        try:
+            self.device = UInput(capabilities, name=name)
+        except Exception as e:
+            raise RuntimeError(f"uinput is not available: {e}")
+
+        self._size = (width, height)
+        self._position = None
+        self._lock = threading.Lock()
+
+    def move_to(self, x, y):
+        e = self.ecodes
+        with self._lock:
+            self.device.write(e.EV_ABS, e.ABS_X, int(x))
+            self.device.write(e.EV_ABS, e.ABS_Y, int(y))
+            self.device.syn()
+            self._position = (int(x), int(y))
+
+    def mouse_down(self, button='left'):
+        self._key(self.button_codes[button], 1)
+
+    def mouse_up(self, button='left'):
+        self._key(self.button_codes[button], 0)
+
+    def scroll(self, amount):
+        e = self.ecodes
+        with self._lock:
+            self.device.write(e.EV_REL, e.REL_WHEEL, int(amount))
+            self.device.syn()
+
+    def position(self):
+        # uinput is write-only - report the last position sent
+        return self._position
+
+    def screen_size(self):
+        return self._size
+
+    def close(self):
+        with self._lock:
+            self.device.close()
+
+    def _key(self, code, value):
+        with self._lock:
+            self.device.write(self.ecodes.EV_KEY, code, value)
+            self.device.syn()
+
+
+class RecordingBackend(CursorBackend):
+    """Null output that logs timestamped commands in memory."""
+
+    def __init__(self, max_commands=100000, screen_size=None, record_moves=True):
+        """
+        Initialize the recorder.
+
+        Args:
+            max_commands: Most recent commands kept (None = unbounded)
+            screen_size: (width, height) reported by screen_size()
+            record_moves: If False, cursor moves are only counted, not logged
+        """
+        self.record_moves = record_moves
+        self.commands = deque(maxlen=max_commands)  # (time.monotonic, command, args)
+        self.counts = Counter()  # Per-command totals, never truncated
+        self._size = screen_size
+        self._position = None
+        self._lock = threading.Lock()
+
+    def move_to(self, x, y):
+        self._position = (x, y)
+        if self.record_moves:
+            self._log('move', x, y)
+        else:
+            with self._lock:
+                self.counts['move'] += 1
+
+    def click(self, button='left', clicks=1):
+        self._log('click', button, clicks)
+
+    def mouse_down(self, button='left'):
+        self._log('mouse_down', button)
+
+    def mouse_up(self, button='left'):
+        self._log('mouse_up', button)
+
+    def scroll(self, amount):
+        self._log('scroll', amount)
+
+    def position(self):
+        return self._position
+
+    def screen_size(self):
+        return self._size
+
+    def get_commands(self, command=None):
+        """
+        Get the recorded commands.
+
+        Args:
+            command: Only this command (e.g. 'click'), or None for all
+
+        Returns:
+            list: (timestamp, command, args) tuples, oldest first
+        """
+        with self._lock:
+            commands = list(self.commands)
+        if command is None:
+            return commands
+        return [c for c in commands if c[1] == command]
+
+    def clear(self):
+        """Forget all recorded commands."""
+        with self._lock:
+            self.commands.clear()
+            self.counts.clear()
+
+    def _log(self, command, *args):
+        with self._lock:
+            self.commands.append((time.monotonic(), command, args))
+            self.counts[command] += 1
+
+
+BACKENDS = {
+    'pyautogui': PyAutoGUIBackend,
+    'xtest': XTestBackend,
+    'uinput': UInputBackend,
+    'null': RecordingBackend,
+}
+
+
+def create_cursor_backend(spec, screen_size=None, **options):
+    """
+    Create a cursor backend.
+
+    Args:
+        spec: Backend name (see BACKENDS) or a CursorBackend instance
+        screen_size: (width, height), needed by 'uinput'
+        **options: Backend-specific keyword arguments
+
+    Returns:
+        CursorBackend: The backend
+
+    Raises:
+        ValueError: Unknown backend name
+        RuntimeError: Backend not available on this system
+    """
+    if isinstance(spec, CursorBackend):
+        return spec
+    if spec not in BACKENDS:
+        raise ValueError(f"Unknown cursor backend: {spec}")
+    if spec in ('uinput', 'null'):
+        options['screen_size'] = screen_size
+    return BACKENDS[spec](**options)
@@ -0,0 +1,189 @@
+"""
+Cursor Output Module
+Runs OS cursor motion on a dedicated worker thread.
+Decouples frame processing from slow cursor API calls by accepting the
+latest target without blocking and gliding toward it at a fixed rate.
+"""
+
+import threading
+import time
+
+
+class CursorOutputWorker:
+    """Moves the cursor toward the most recent target at a fixed output rate."""
+
+    def __init__(self, move_fn, output_rate=180, glide_time=0.05, latency_fn=None):
+        """
+        Initialize the cursor output worker.
+
+        Args:
+            move_fn: Callable (x, y) that places the OS cursor at pixel coordinates
+            output_rate: Cursor updates per second (Hz), typically 120-240
+            glide_time: Seconds taken to glide from the current position to a
+                        new target (0 = jump immediately)
+            latency_fn: Called with the seconds from the frame time of the
+                        target being glided to until each move command is
+                        sent (targets without a timestamp are skipped)
+        """
+        self.move_fn = move_fn
+        self.output_rate = output_rate
+        self.glide_time = glide_time
+        self.latency_fn = latency_fn
+
+        # Latest target (coalesced - only the newest one is ever used)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._target = None
+        self._target_timestamp = None
+        self._target_version = 0
+        self._consumed_version = 0
+
+        # Current output position (float pixel coordinates)
+        self._position = None
+
+        # Statistics
+        self.targets_received = 0
+        self.targets_coalesced = 0  # Targets replaced before the worker saw them
+        self.moves_sent = 0
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the output thread (no-op if already running)."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._output_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the output thread and wait for it to exit."""
+        self._running = False
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def is_running(self):
+        """
+        Check if the output thread is running.
+
+        Returns:
+            bool: True if running, False otherwise
+        """
+        return self._running
+
+    def set_target(self, x, y, timestamp=None):
+        """
+        Submit a new cursor target. Never blocks on cursor output.
+
+        Args:
+            x: Target X position in pixels
+            y: Target Y position in pixels
+            timestamp: Arrival time (time.monotonic) of the frame the
+                       target was computed from, for latency_fn
+        """
+        with self._lock:
+            if self._target_version != self._consumed_version:
+                self.targets_coalesced += 1
+            self._target = (float(x), float(y))
+            self._target_timestamp = timestamp
+            self._target_version += 1
+            self.targets_received += 1
+        self._wake.set()
+
+    def set_output_rate(self, output_rate):
+        """
+        Set the cursor update rate.
+
+        Args:
+            output_rate: Cursor updates per second (Hz)
+        """
+        self.output_rate = max(1, output_rate)
+
+    def get_position(self):
+        """
+        Get the last position sent to the cursor.
+
+        Returns:
+            tuple: (x, y) in pixels or None if nothing was sent yet
+        """
+        position = self._position
+        if position is None:
+            return None
+        return (int(round(position[0])), int(round(position[1])))
+
+    def get_stats(self):
+        """
+        Get output statistics.
+
+        Returns:
+            dict: Counts of received targets, coalesced targets and moves sent
+        """
+        return {
+            'targets_received': self.targets_received,
+            'targets_coalesced': self.targets_coalesced,
+            'moves_sent': self.moves_sent,
+        }
+
+    def _output_loop(self):
+        """Worker loop: interpolate toward the latest target at output_rate."""
+        glide_from = None
+        glide_to = None
+        glide_start = 0.0
+        glide_timestamp = None
+        last_sent = None
+
+        while self._running:
+            # Pick up the newest target (older ones are simply dropped)
+            self._wake.clear()
+            with self._lock:
+                target = self._target
+                timestamp = self._target_timestamp
+                version = self._target_version
+                is_new = version != self._consumed_version
+                self._consumed_version = version
+
+            now = time.monotonic()
+
+            if is_new and target is not None:
+                glide_from = self._position if self._position is not None else target
+                glide_to = target
+                glide_start = now
+                glide_timestamp = timestamp
+
+            if glide_to is None or self._position == glide_to:
+                # Nothing to do - sleep until a new target arrives
+                self._wake.wait(timeout=0.1)
+                continue
+
+            # Linear glide toward the target
+            if self.glide_time > 0:
+                progress = min(1.0, (now - glide_start) / self.glide_time)
+            else:
+                progress = 1.0
+
+            if progress >= 1.0:
+                x, y = glide_to
+            else:
+                x = glide_from[0] + (glide_to[0] - glide_from[0]) * progress
+                y = glide_from[1] + (glide_to[1] - glide_from[1]) * progress
+            self._position = (x, y)
+
+            pixel = (int(round(x)), int(round(y)))
+            if pixel != last_sent:
+                try:
+                    self.move_fn(pixel[0], pixel[1])
+                    self.moves_sent += 1
+                    if self.latency_fn and glide_timestamp is not None:
+                        self.latency_fn(time.monotonic() - glide_timestamp)
+                except Exception as e:
+                    print(f"Error moving cursor: {e}")
+                last_sent = pixel
+
+            # Wait one output period (a new target wakes us up early)
+            delay = now + 1.0 / self.output_rate - time.monotonic()
+            if delay > 0:
+                self._wake.wait(timeout=delay)
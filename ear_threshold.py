@@ -0,0 +1,176 @@
+"""
+EAR Threshold Module
+Per-user blink threshold learned online from the EAR stream.
+Every frame's EAR goes into a fixed-size histogram whose weights decay with
+time, so memory and per-frame cost are constant and old lighting conditions
+fade out. The histogram is periodically split into a closed-eye and an
+open-eye class (Otsu's method); the blink threshold sits between the two
+class means. Without enough closed-eye samples the threshold falls back to
+a fraction of the open-eye level.
+"""
+
+import numpy as np
+
+
+class AdaptiveEarThreshold:
+    """Decayed EAR histogram with an open/closed-eye split."""
+
+    def __init__(self, initial_threshold=0.20, bins=64, ear_range=(0.0, 0.5), half_life=120.0,
+                 warmup=90.0, update_interval=15, min_threshold=0.10, max_threshold=0.35):
+        """
+        Initialize the estimator.
+
+        Args:
+            initial_threshold: Threshold used until enough samples were seen
+            bins: Number of histogram bins over ear_range
+            ear_range: (low, high) EAR range covered by the histogram
+            half_life: Seconds after which a sample's weight has halved
+            warmup: Total sample weight needed before adapting
+            update_interval: Recompute the split every N samples
+            min_threshold: Lowest threshold ever returned
+            max_threshold: Highest threshold ever returned
+        """
+        self.bins = bins
+        self.ear_range = ear_range
+        self.half_life = half_life
+        self.warmup = warmup
+        self.update_interval = update_interval
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+
+        self.closed_fraction_range = (0.005, 0.4)  # Plausible share of closed-eye samples
+        self.separation = 0.75  # Closed-eye mean must be below this fraction of the open-eye mean
+        self.open_ratio = 0.65  # Fallback threshold as a fraction of the open-eye level
+        self.split_ratio = 0.5  # Position of the threshold between closed and open means
+
+        edges = np.linspace(ear_range[0], ear_range[1], bins + 1)
+        self._centers = (edges[:-1] + edges[1:]) / 2
+        self._scale = bins / (ear_range[1] - ear_range[0])
+        self.initial_threshold = initial_threshold
+        self.reset()
+
+    def reset(self):
+        """Forget all samples and return to the initial threshold."""
+        self.histogram = np.zeros(self.bins)
+        self.threshold = self.initial_threshold
+        self.open_ear = None
+        self.closed_ear = None
+        self._last_timestamp = None
+        self._since_update = 0
+
+    @property
+    def weight(self):
+        """float: Total (decayed) sample weight in the histogram."""
+        return float(self.histogram.sum())
+
+    def update(self, ear, timestamp):
+        """
+        Add one frame's EAR.
+
+        Args:
+            ear: Average EAR of both eyes
+            timestamp: Capture time of the frame (seconds)
+
+        Returns:
+            float: Current blink threshold
+        """
+        if not np.isfinite(ear):
+            return self.threshold
+
+        if self._last_timestamp is not None and timestamp > self._last_timestamp:
+            self.histogram *= 0.5 ** ((timestamp - self._last_timestamp) / self.half_life)
+        self._last_timestamp = timestamp
+
+        index = int((ear - self.ear_range[0]) * self._scale)
+        self.histogram[min(max(index, 0), self.bins - 1)] += 1.0
+
+        self._since_update += 1
+        if self._since_update >= self.update_interval:
+            self._since_update = 0
+            self._recompute()
+        return self.threshold
+
+    def _recompute(self):
+        """Split the histogram into closed/open classes and place the threshold."""
+        hist = self.histogram
+        total = hist.sum()
+        if total < self.warmup:
+            return
+
+        centers = self._centers
+        cum_weight = np.cumsum(hist)[:-1]
+        cum_mass = np.cumsum(hist * centers)[:-1]
+        total_mass = float(np.dot(hist, centers))
+
+        # Otsu: split maximizing the between-class variance
+        with np.errstate(divide='ignore', invalid='ignore'):
+            closed_mean = cum_mass / cum_weight
+            open_mean = (total_mass - cum_mass) / (total - cum_weight)
+            between = cum_weight * (total - cum_weight) * (open_mean - closed_mean) ** 2
+        between = np.nan_to_num(between)
+        split = int(np.argmax(between))
+
+        closed_fraction = cum_weight[split] / total
+        low, high = self.closed_fraction_range
+        if (between[split] > 0 and low <= closed_fraction <= high
+                and closed_mean[split] < self.separation * open_mean[split]):
+            self.closed_ear = float(closed_mean[split])
+            self.open_ear = float(open_mean[split])
+            threshold = self.closed_ear + self.split_ratio * (self.open_ear - self.closed_ear)
+        else:
+            # No distinct closed-eye class (yet) - scale from the open-eye level
+            self.closed_ear = None
+            self.open_ear = total_mass / total
+            threshold = self.open_ratio * self.open_ear
+
+        self.threshold = float(min(max(threshold, self.min_threshold), self.max_threshold))
+
+    def get_estimate(self):
+        """
+        Get the live estimate.
+
+        Returns:
+            dict: threshold, open_ear, closed_ear (None if not separated),
+                  weight and adapting (False during warm-up)
+        """
+        return {
+            'threshold': self.threshold,
+            'open_ear': self.open_ear,
+            'closed_ear': self.closed_ear,
+            'weight': self.weight,
+            'adapting': self.weight >= self.warmup,
+        }
+
+    def get_state(self):
+        """
+        Get the learned state for saving with the user's profile.
+
+        Returns:
+            dict: JSON-serializable histogram, range and estimate
+        """
+        return {
+            'histogram': self.histogram.tolist(),
+            'ear_range': list(self.ear_range),
+            'threshold': self.threshold,
+            'open_ear': self.open_ear,
+            'closed_ear': self.closed_ear,
+        }
+
+    def load_state(self, state):
+        """
+        Restore a state saved by get_state().
+
+        Args:
+            state: Dict from get_state()
+        """
+        histogram = np.asarray(state.get('histogram', ()), dtype=float)
+        if histogram.shape != (self.bins,) or tuple(state.get('ear_range', ())) != tuple(self.ear_range):
+            print("Saved blink threshold state doesn't match the histogram layout - ignored")
+            return
+        self.histogram = histogram
+        self.threshold = state.get('threshold', self.initial_threshold)
+        self.open_ear = state.get('open_ear')
+        self.closed_ear = state.get('closed_ear')
+        # Decay restarts with the next frame
+        self._last_timestamp = None
+        self._since_update = 0
@@ -4,112 +4,507 @@ Uses MediaPipe FaceMesh to detect eyes and facial landmarks.
 Tracks eye position and returns coordinates for mouse control.
 """
 
+import time
 import cv2
-import mediapipe as mp
 import numpy as np
+from filters import MovingAverage, ExponentialSmoother, OneEuroFilter, create_filter
+from landmarks import (
+    LandmarkFrame, as_landmark_frame, NUM_FACE_LANDMARKS, NOSE_TIP, EAR_INDICES, IRIS_INDICES,
+    EYE_INNER_CORNER, EYE_OUTER_CORNER, UPPER_LID_INDICES, LOWER_LID_INDICES
+)
+from landmark_backends import SolutionBackend, create_backend
+from pipeline_profiler import PipelineProfiler
 
 class EyeTracker:
     """Handles eye detection and tracking using MediaPipe FaceMesh."""
     
     # MediaPipe landmark indices for eyes
-    LEFT_EYE_INDICES = [33, 160, 158, 133, 153, 144]
-    RIGHT_EYE_INDICES = [362, 385, 387, 263, 373, 380]
-    LEFT_IRIS_INDICES = [468, 469, 470, 471, 472]
-    RIGHT_IRIS_INDICES = [473, 474, 475, 476, 477]
+    LEFT_EYE_INDICES = EAR_INDICES[0]
+    RIGHT_EYE_INDICES = EAR_INDICES[1]
+    LEFT_IRIS_INDICES = IRIS_INDICES[0]
+    RIGHT_IRIS_INDICES = IRIS_INDICES[1]
     
     # Nose tip landmark for head tracking
     NOSE_TIP = 1
     
-    def __init__(self, use_head_tracking=True):
+    # Face crops are rounded up to a multiple of this many pixels
+    ROI_QUANTUM = 32
+    
+    # Motion gate: watches the eye/nose region, downscaled to GATE_SIZE
+    # (width, height); motion is the largest mean change over GATE_BLOCKS blocks
+    GATE_INDICES = np.concatenate([EAR_INDICES.ravel(), [NOSE_TIP]])
+    GATE_SIZE = (48, 24)
+    GATE_BLOCKS = (6, 3)
+    
+    # Landmarks propagated by optical flow between inference runs: the ones
+    # gaze, head and blink code actually read
+    FLOW_INDICES = np.unique(np.concatenate([
+        [NOSE_TIP], EAR_INDICES.ravel(), UPPER_LID_INDICES.ravel(),
+        LOWER_LID_INDICES.ravel(), IRIS_INDICES.ravel()
+    ]))
+    FLOW_WINDOW = (15, 15)
+    FLOW_LEVELS = 2
+    
+    # FaceMesh configurations, cheapest that serves each mode.
+    # Head tracking and blinks only need the 468 face landmarks (nose tip,
+    # EAR points); the iris model is only worth running for gaze tracking.
+    MODEL_PROFILES = {
+        'head': {
+            'refine_landmarks': False,
+            'min_detection_confidence': 0.7,
+            'min_tracking_confidence': 0.7,
+        },
+        'iris': {
+            'refine_landmarks': True,  # Enable iris landmarks
+            'min_detection_confidence': 0.7,  # Increased for better stability
+            'min_tracking_confidence': 0.7,   # Increased for better stability
+        },
+    }
+    
+    def __init__(self, use_head_tracking=True, head_filter='one_euro', iris_filter='one_euro_iris',
+                 model_profile=None, use_roi=True, profiler=None, isolate_inference=False,
+                 backend='solution', task_model_path=None, motion_gate=False, flow_interval=1):
         """
         Initialize MediaPipe FaceMesh with optimized settings.
         
         Args:
             use_head_tracking: If True, use nose position (head tracking).
                              If False, use iris position (gaze tracking).
+            head_filter: Filter preset/spec for head tracking (see filters.create_filter)
+            iris_filter: Filter preset/spec for iris gaze tracking
+            model_profile: FaceMesh profile name (see MODEL_PROFILES); by default
+                           the cheapest profile for the tracking mode is used
+            use_roi: If True, run FaceMesh on a crop around the last face position
+            profiler: PipelineProfiler timing the conversion/inference stages
+                      (a disabled one by default)
+            isolate_inference: Shorthand for backend='process' (FaceMesh in a
+                               worker process fed through shared memory)
+            backend: Landmark backend name or LandmarkBackend instance
+                     (see landmark_backends: 'solution', 'process', 'tasks', 'scripted')
+            task_model_path: face_landmarker.task model for the 'tasks' backend
+            motion_gate: If True, reuse the previous landmarks instead of running
+                         inference while the eye/nose region doesn't change
+            flow_interval: Run inference every N frames and track the landmarks
+                           with optical flow in between (1 = every frame)
         """
         self.use_head_tracking = use_head_tracking
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,  # Enable iris landmarks
-            min_detection_confidence=0.7,  # Increased for better stability
-            min_tracking_confidence=0.7    # Increased for better stability
-        )
-        self.mp_drawing = mp.solutions.drawing_utils
-        self.drawing_spec = self.mp_drawing.DrawingSpec(thickness=1, circle_radius=1)
-        
-        # For smoothing eye position with multiple frames
-        self.prev_eye_position = None
-        self.smoothing_factor = 0.3  # Lower for more responsive gaze
-        
-        # Multi-frame averaging for stability
-        self.gaze_history = []
-        self.history_size = 5  # Average last 5 frames
-    
-    def process_frame(self, frame):
+        self.profiler = profiler or PipelineProfiler()
+        
+        # Landmark inference is delegated to a backend
+        if isolate_inference and backend == 'solution':
+            backend = 'process'
+        options = {'model_path': task_model_path} if backend == 'tasks' else {}
+        self.model_profile = model_profile or self._profile_for_mode()
+        settings = self.MODEL_PROFILES[self.model_profile]
+        self.backend = create_backend(backend, settings, self.profiler, **options)
+        if not self.backend.start():
+            print(f"Landmark backend {type(self.backend).__name__} unavailable, using FaceMesh")
+            self.backend = SolutionBackend(settings, self.profiler)
+            self.backend.start()
+        print(f"Landmark backend: {type(self.backend).__name__}, profile: {self.model_profile}")
+        
+        # Face ROI cropping (crop derived from the previous frame's landmarks)
+        self.use_roi = use_roi
+        self.roi_padding = 0.25  # Padding on each side, as a fraction of face size
+        self._roi = None
+        self.roi_hits = 0    # Frames processed on a crop
+        self.roi_misses = 0  # Crops that lost the face (full-frame fallback)
+        
+        # Motion gate (frame difference on a tiny grayscale crop)
+        self.motion_gate = motion_gate
+        self.motion_threshold = 2.0  # Largest per-block mean gray-level change counted as static
+        self.max_reused_frames = 2   # Force inference after this many reused frames in a row
+        self.last_motion = 0.0
+        self._gate_roi = None
+        self._gate_shape = None
+        self._gate_reference = None  # Gate image of the last inferred frame
+        self._last_landmarks = None
+        self._reused_in_row = 0
+        self.frames_inferred = 0
+        self.frames_reused = 0
+        
+        # Optical-flow propagation between inference runs
+        self.flow_interval = max(1, int(flow_interval))
+        self.flow_max_error = 1.5  # Median forward-backward error (px) before resyncing
+        self.flow_min_tracked = 0.8  # Fraction of points that must be tracked
+        self._flow_base = None  # Landmarks of the previous frame
+        self._flow_indices = None
+        self._flow_points = None  # (N, 1, 2) pixel positions in the previous frame
+        self._flow_gray = None
+        self._frames_since_inference = 0
+        self.frames_propagated = 0
+        self.flow_resyncs = 0
+        
+        # Face mesh edges for drawing, loaded on first use (see mesh_edges)
+        self._mesh_edges = None
+        self.face_indices = np.arange(NUM_FACE_LANDMARKS)
+        
+        # Position filtering - the ONLY smoothing stage in the pipeline,
+        # with a separate filter chain per tracking mode
+        self.filter_specs = {'head': head_filter, 'iris': iris_filter}
+        self.filters = {mode: create_filter(spec) for mode, spec in self.filter_specs.items()}
+        
+        # Predict ahead by the measured capture-to-output latency
+        self.predict_latency = False
+        self.extra_latency = 0.0  # Seconds added for output-side delay (cursor thread, OS)
+        self.measured_latency = 0.0  # Smoothed capture -> filter latency (seconds)
+    
+    def process_frame(self, frame, timestamp=None, draw=True):
         """
         Process a video frame to detect facial landmarks.
         
+        Once a face was found, only a padded crop around it is converted and
+        passed to FaceMesh; landmarks are mapped back to full-frame coordinates.
+        If the face is lost from the crop, the full frame is searched again.
+        
         Args:
             frame: OpenCV frame (BGR format)
+            timestamp: Capture timestamp of the frame (seconds)
+            draw: If True, draw the face mesh and eye landmarks on the frame
         
         Returns:
-            tuple: (annotated_frame, landmarks) where landmarks is None if no face detected
-        """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Process frame
-        results = self.face_mesh.process(rgb_frame)
-        
-        # Draw landmarks on frame
-        if results.multi_face_landmarks:
-            for face_landmarks in results.multi_face_landmarks:
-                # Draw the full face mesh
-                self.mp_drawing.draw_landmarks(
-                    image=frame,
-                    landmark_list=face_landmarks,
-                    connections=self.mp_face_mesh.FACEMESH_TESSELATION,
-                    landmark_drawing_spec=None,
-                    connection_drawing_spec=self.mp_drawing.DrawingSpec(
-                        color=(80, 110, 10), thickness=1, circle_radius=1
-                    )
-                )
-                
-                # Draw eye contours
-                self._draw_eye_landmarks(frame, face_landmarks)
-                
-                return frame, face_landmarks
-        
-        return frame, None
-    
-    def _draw_eye_landmarks(self, frame, face_landmarks):
-        """Draw eye and iris landmarks on the frame."""
+            tuple: (annotated_frame, landmarks) where landmarks is a LandmarkFrame,
+                   or None if no face detected
+        """
+        if self.motion_gate:
+            static = self._is_static(frame)
+            self.profiler.lap('motion_gate')
+            if static:
+                return self._reuse_landmarks(frame, timestamp, draw)
+        
+        if self._flow_due():
+            landmark_frame = self._propagate_landmarks(frame, timestamp)
+            self.profiler.lap('optical_flow')
+            if landmark_frame is not None:
+                if self.use_roi and self.backend.supports_roi:
+                    self._roi = self._update_roi(landmark_frame, frame.shape)
+                if draw:
+                    self.draw_overlay(frame, landmark_frame)
+                    self.profiler.lap('draw')
+                return frame, landmark_frame
+            # Flow lost track - fall through to a full inference
+        
+        roi = self._roi if self.use_roi and self.backend.supports_roi else None
+        landmark_frame = self._run_backend(frame, roi, timestamp)
+        
+        if landmark_frame is None and roi is not None:
+            # Face left the crop - fall back to a full-frame search
+            self.roi_misses += 1
+            roi = None
+            landmark_frame = self._run_backend(frame, None, timestamp)
+        
+        self.frames_inferred += 1
+        if landmark_frame is None:
+            self._roi = None
+            self._flow_base = None
+            if self.motion_gate:
+                self._update_motion_gate(frame, None)
+            return frame, None
+        
+        # Asynchronous backends stamp results with their own source frame's time
+        if landmark_frame.timestamp is None:
+            landmark_frame.timestamp = timestamp
+        landmark_frame.frame_shape = frame.shape
+        
+        if roi is not None:
+            self.roi_hits += 1
+            self._map_roi_to_frame(landmark_frame, roi, frame.shape)
+        
+        if self.use_roi and self.backend.supports_roi:
+            self._roi = self._update_roi(landmark_frame, frame.shape)
+        if self.motion_gate:
+            self._update_motion_gate(frame, landmark_frame)
+        if self.flow_interval > 1:
+            self._start_flow(frame, landmark_frame)
+        self.profiler.lap('landmarks')
+        
+        # Draw the full face mesh and eye contours
+        if draw:
+            self.draw_overlay(frame, landmark_frame)
+            self.profiler.lap('draw')
+        
+        return frame, landmark_frame
+    
+    def _reuse_landmarks(self, frame, timestamp=None, draw=True):
+        """Return the last inferred landmarks for a static frame."""
+        self.frames_reused += 1
+        self._reused_in_row += 1
+        
+        last = self._last_landmarks
+        landmark_frame = LandmarkFrame(last.points, last.count, timestamp, frame.shape)
+        if draw:
+            self.draw_overlay(frame, landmark_frame)
+            self.profiler.lap('draw')
+        return frame, landmark_frame
+    
+    def _gate_image(self, frame, roi):
+        """Downscaled grayscale copy of the gate region."""
+        x0, y0, x1, y1 = roi
+        small = cv2.resize(frame[y0:y1, x0:x1], self.GATE_SIZE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    
+    def _is_static(self, frame):
+        """
+        Check whether the eye/nose region is unchanged since the last inference.
+        
+        Returns:
+            bool: True if the previous landmarks can be reused for this frame
+        """
+        if (self._gate_reference is None or self._reused_in_row >= self.max_reused_frames
+                or frame.shape != self._gate_shape):
+            return False
+        
+        diff = cv2.absdiff(self._gate_image(frame, self._gate_roi), self._gate_reference)
+        blocks = cv2.resize(diff, self.GATE_BLOCKS, interpolation=cv2.INTER_AREA)
+        self.last_motion = float(blocks.max())
+        return self.last_motion < self.motion_threshold
+    
+    def _update_motion_gate(self, frame, landmark_frame):
+        """Take the gate reference from a freshly inferred frame."""
+        self._reused_in_row = 0
+        self._last_landmarks = landmark_frame
+        self._gate_reference = None
+        if landmark_frame is None:
+            return
+        
+        # Eye and nose points, padded by half their extent
         h, w = frame.shape[:2]
+        points = landmark_frame.pixel_points(self.GATE_INDICES, frame.shape)
+        (x_min, y_min), (x_max, y_max) = points.min(axis=0), points.max(axis=0)
+        pad = 0.5 * max(x_max - x_min, y_max - y_min)
+        x0, y0 = int(max(0, x_min - pad)), int(max(0, y_min - pad))
+        x1, y1 = int(min(w, x_max + pad)), int(min(h, y_max + pad))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return
+        
+        self._gate_roi = (x0, y0, x1, y1)
+        self._gate_shape = frame.shape
+        self._gate_reference = self._gate_image(frame, self._gate_roi)
+    
+    def _flow_due(self):
+        """Check whether this frame should be tracked by optical flow."""
+        return (self.flow_interval > 1 and self._flow_base is not None and
+                self._frames_since_inference < self.flow_interval - 1)
+    
+    def _start_flow(self, frame, landmark_frame):
+        """Start tracking from freshly inferred landmarks."""
+        indices = self.FLOW_INDICES[self.FLOW_INDICES < landmark_frame.count]
+        self._flow_base = landmark_frame
+        self._flow_indices = indices
+        self._flow_points = landmark_frame.pixel_points(indices, frame.shape).reshape(-1, 1, 2)
+        self._flow_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self._frames_since_inference = 0
+    
+    def _propagate_landmarks(self, frame, timestamp=None):
+        """
+        Move the previous frame's landmarks to this frame with optical flow.
         
-        # Draw left eye
-        for idx in self.LEFT_EYE_INDICES:
-            landmark = face_landmarks.landmark[idx]
-            x, y = int(landmark.x * w), int(landmark.y * h)
-            cv2.circle(frame, (x, y), 2, (0, 255, 0), -1)
+        The tracked subset (FLOW_INDICES) follows its own flow; all other
+        landmarks are shifted by the median motion so the mesh overlay and
+        ROI stay in place.
+        
+        Returns:
+            LandmarkFrame: Propagated landmarks, or None if tracking was lost
+                           (too many failed points or forward-backward error)
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        lk_params = {'winSize': self.FLOW_WINDOW, 'maxLevel': self.FLOW_LEVELS}
+        previous = self._flow_points
+        
+        points, status, _ = cv2.calcOpticalFlowPyrLK(self._flow_gray, gray, previous, None, **lk_params)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._flow_gray, points, None, **lk_params)
+        
+        tracked = (status.ravel() == 1) & (back_status.ravel() == 1)
+        error = np.linalg.norm((previous - back).reshape(-1, 2), axis=1)
+        if tracked.mean() < self.flow_min_tracked or np.median(error[tracked]) > self.flow_max_error:
+            self.flow_resyncs += 1
+            self._flow_base = None
+            return None
+        
+        h, w = frame.shape[:2]
+        scale = np.array([w, h], dtype=np.float32)
+        previous = previous.reshape(-1, 2)
+        moved = points.reshape(-1, 2)
+        shift = np.median(moved[tracked] - previous[tracked], axis=0)
+        # Lost points follow the face
+        moved[~tracked] = previous[~tracked] + shift
+        
+        base = self._flow_base
+        new_points = base.points.copy()
+        new_points[:, :2] += shift / scale
+        new_points[self._flow_indices, :2] = moved / scale
+        
+        landmark_frame = LandmarkFrame(new_points, base.count, timestamp, frame.shape)
+        self._flow_base = landmark_frame
+        self._flow_points = moved.reshape(-1, 1, 2)
+        self._flow_gray = gray
+        self._frames_since_inference += 1
+        self.frames_propagated += 1
+        return landmark_frame
+    
+    def set_flow_interval(self, flow_interval):
+        """
+        Set how often inference runs when optical flow fills the gaps.
+        
+        Args:
+            flow_interval: Run inference every N frames (1 = every frame, no flow)
+        """
+        self.flow_interval = max(1, int(flow_interval))
+        self._flow_base = None
+        print(f"Inference interval: every {self.flow_interval} frame(s)")
+    
+    def reset_tracking_state(self):
+        """Forget the last face position (ROI, motion gate, optical flow), e.g. after a frame size change."""
+        self._roi = None
+        self._gate_reference = None
+        self._last_landmarks = None
+        self._reused_in_row = 0
+        self._flow_base = None
+    
+    def get_inference_stats(self):
+        """
+        Get counters of inferred vs reused frames.
+        
+        Returns:
+            dict: frames_inferred, frames_reused (motion gate), frames_propagated
+                  (optical flow), flow_resyncs, reuse_ratio, last_motion,
+                  roi_hits and roi_misses
+        """
+        total = self.frames_inferred + self.frames_reused + self.frames_propagated
+        return {
+            'frames_inferred': self.frames_inferred,
+            'frames_reused': self.frames_reused,
+            'frames_propagated': self.frames_propagated,
+            'flow_resyncs': self.flow_resyncs,
+            'reuse_ratio': self.frames_reused / total if total else 0.0,
+            'last_motion': self.last_motion,
+            'roi_hits': self.roi_hits,
+            'roi_misses': self.roi_misses,
+        }
+    
+    def set_motion_gate(self, enabled, threshold=None, max_reused_frames=None):
+        """
+        Configure the motion gate.
+        
+        Args:
+            enabled: True to reuse landmarks on static frames
+            threshold: Largest per-block mean gray-level change counted as static
+            max_reused_frames: Force inference after this many reused frames
+        """
+        self.motion_gate = enabled
+        if threshold is not None:
+            self.motion_threshold = threshold
+        if max_reused_frames is not None:
+            self.max_reused_frames = max(0, int(max_reused_frames))
+        self._gate_reference = None
+        print(f"Motion gate: {'enabled' if enabled else 'disabled'} "
+              f"(threshold {self.motion_threshold}, max reused {self.max_reused_frames})")
+    
+    def _run_backend(self, frame, roi=None, timestamp=None):
+        """
+        Run the landmark backend on the frame or a crop of it.
         
-        # Draw right eye
-        for idx in self.RIGHT_EYE_INDICES:
-            landmark = face_landmarks.landmark[idx]
-            x, y = int(landmark.x * w), int(landmark.y * h)
+        Args:
+            frame: OpenCV frame (BGR format)
+            roi: (x0, y0, x1, y1) crop in pixels, or None for the full frame
+            timestamp: Capture timestamp of the frame (seconds)
+        
+        Returns:
+            LandmarkFrame: Landmarks (relative to the crop) or None
+        """
+        if roi is not None:
+            x0, y0, x1, y1 = roi
+            frame = frame[y0:y1, x0:x1]
+        
+        landmark_frame = self.backend.process(frame, timestamp)
+        self.profiler.lap('face_mesh')
+        return landmark_frame
+    
+    def _map_roi_to_frame(self, landmark_frame, roi, frame_shape):
+        """Convert crop-normalized landmarks to full-frame normalized coordinates (in place)."""
+        h, w = frame_shape[:2]
+        x0, y0, x1, y1 = roi
+        points = landmark_frame.points
+        points[:, 0] = points[:, 0] * ((x1 - x0) / w) + x0 / w
+        points[:, 1] = points[:, 1] * ((y1 - y0) / h) + y0 / h
+        # z uses the same scale as x (image width)
+        points[:, 2] *= (x1 - x0) / w
+    
+    def _update_roi(self, landmark_frame, frame_shape):
+        """
+        Compute the crop for the next frame from the current landmarks.
+        
+        The crop is a square, padded around the face and rounded to
+        ROI_QUANTUM pixels. The current crop is kept while the face stays well
+        inside it, so FaceMesh sees a stable input size.
+        
+        Returns:
+            tuple: (x0, y0, x1, y1) in pixels, or None to use the full frame
+        """
+        h, w = frame_shape[:2]
+        face = landmark_frame.pixel_points(self.face_indices, frame_shape)
+        x_min, y_min = face.min(axis=0)
+        x_max, y_max = face.max(axis=0)
+        face_size = max(x_max - x_min, y_max - y_min)
+        
+        # Keep the current crop while the face (plus half the padding) fits
+        if self._roi is not None:
+            x0, y0, x1, y1 = self._roi
+            margin = face_size * self.roi_padding / 2
+            side = x1 - x0
+            fits = (x_min - margin >= x0 and y_min - margin >= y0 and
+                    x_max + margin <= x1 and y_max + margin <= y1)
+            if fits and face_size * (1 + 2 * self.roi_padding) > 0.6 * side:
+                return self._roi
+        
+        side = face_size * (1 + 2 * self.roi_padding)
+        side = int(np.ceil(side / self.ROI_QUANTUM) * self.ROI_QUANTUM)
+        if side >= 0.9 * min(w, h):
+            return None  # Face fills the frame - cropping saves nothing
+        
+        cx = (x_min + x_max) / 2
+        cy = (y_min + y_max) / 2
+        x0 = int(np.clip(cx - side / 2, 0, w - side))
+        y0 = int(np.clip(cy - side / 2, 0, h - side))
+        return (x0, y0, x0 + side, y0 + side)
+    
+    @property
+    def mesh_edges(self):
+        """np.ndarray: (E, 2) face mesh edge indices for vectorized drawing."""
+        if self._mesh_edges is None:
+            # Only drawing needs MediaPipe here - the backends import their own
+            import mediapipe as mp
+            tessellation = mp.solutions.face_mesh.FACEMESH_TESSELATION
+            self._mesh_edges = np.array(sorted(tessellation), dtype=np.int32)
+        return self._mesh_edges
+    
+    def draw_overlay(self, frame, landmark_frame):
+        """
+        Draw the face mesh and eye/iris landmarks on the frame.
+        
+        Args:
+            frame: OpenCV frame (BGR format) to draw on
+            landmark_frame: LandmarkFrame for this frame
+        """
+        pixels = np.rint(landmark_frame.pixel_points(self.face_indices, frame.shape)).astype(np.int32)
+        
+        # All mesh edges in a single polylines call
+        cv2.polylines(frame, pixels[self.mesh_edges], False, (80, 110, 10), 1)
+        
+        # Draw eye contours
+        self._draw_eye_landmarks(frame, landmark_frame)
+    
+    def _draw_eye_landmarks(self, frame, landmark_frame):
+        """Draw eye and iris landmarks on the frame."""
+        eye_points = np.rint(landmark_frame.pixel_points(EAR_INDICES, frame.shape)).astype(int)
+        for x, y in eye_points.reshape(-1, 2):
             cv2.circle(frame, (x, y), 2, (0, 255, 0), -1)
         
-        # Draw left iris
-        for idx in self.LEFT_IRIS_INDICES:
-            landmark = face_landmarks.landmark[idx]
-            x, y = int(landmark.x * w), int(landmark.y * h)
-            cv2.circle(frame, (x, y), 2, (255, 0, 0), -1)
+        if not landmark_frame.has_iris:
+            return
         
-        # Draw right iris
-        for idx in self.RIGHT_IRIS_INDICES:
-            landmark = face_landmarks.landmark[idx]
-            x, y = int(landmark.x * w), int(landmark.y * h)
+        iris_points = np.rint(landmark_frame.pixel_points(IRIS_INDICES, frame.shape)).astype(int)
+        for x, y in iris_points.reshape(-1, 2):
             cv2.circle(frame, (x, y), 2, (255, 0, 0), -1)
     
     def get_eye_position(self, face_landmarks, frame_shape):
@@ -118,7 +513,7 @@ class EyeTracker:
         Can use either head tracking (nose) or gaze tracking (iris).
         
         Args:
-            face_landmarks: MediaPipe face landmarks
+            face_landmarks: LandmarkFrame (or MediaPipe face landmarks)
             frame_shape: Shape of the frame (height, width, channels)
         
         Returns:
@@ -130,43 +525,30 @@ class EyeTracker:
         if not face_landmarks:
             return None
         
+        landmark_frame = as_landmark_frame(face_landmarks, frame_shape)
+        
         # Use head tracking or gaze tracking based on mode
         if self.use_head_tracking:
-            return self._get_head_position(face_landmarks)
+            return self._get_head_position(landmark_frame)
         else:
-            return self._get_iris_gaze(face_landmarks)
+            return self._get_iris_gaze(landmark_frame)
     
-    def _get_head_position(self, face_landmarks):
+    def _get_head_position(self, landmark_frame):
         """
         Track head position using nose tip.
         Simple and reliable - move head to control cursor.
         
         Args:
-            face_landmarks: MediaPipe face landmarks
+            landmark_frame: LandmarkFrame for the current frame
             
         Returns:
             tuple: (x_ratio, y_ratio) based on nose position
         """
         # Get nose tip position (normalized 0-1)
-        nose_x = face_landmarks.landmark[self.NOSE_TIP].x
-        nose_y = face_landmarks.landmark[self.NOSE_TIP].y
+        nose = self.get_raw_position(landmark_frame)
         
-        # Add to history for smoothing
-        self.gaze_history.append((nose_x, nose_y))
-        if len(self.gaze_history) > self.history_size:
-            self.gaze_history.pop(0)
-        
-        # Calculate average from history
-        if len(self.gaze_history) > 0:
-            nose_x = np.mean([g[0] for g in self.gaze_history])
-            nose_y = np.mean([g[1] for g in self.gaze_history])
-        
-        # Apply exponential smoothing
-        if self.prev_eye_position is not None:
-            nose_x = self.smoothing_factor * self.prev_eye_position[0] + (1 - self.smoothing_factor) * nose_x
-            nose_y = self.smoothing_factor * self.prev_eye_position[1] + (1 - self.smoothing_factor) * nose_y
-        
-        self.prev_eye_position = (nose_x, nose_y)
+        # Filter (and optionally predict) the position
+        nose_x, nose_y = self._smooth(nose, landmark_frame.timestamp)
         
         # Clamp to valid range
         nose_x = np.clip(nose_x, 0.0, 1.0)
@@ -174,15 +556,14 @@ class EyeTracker:
         
         return (nose_x, nose_y)
     
-    def _get_iris_gaze(self, face_landmarks):
+    def _get_iris_gaze(self, landmark_frame):
         """
         Track iris position for precise gaze control (IMPROVED ACCURACY).
         
         Uses enhanced algorithm with better landmark selection and multi-frame averaging.
         
         Args:
-            face_landmarks: MediaPipe face landmarks
-            frame_shape: Shape of the frame (height, width, channels)
+            landmark_frame: LandmarkFrame for the current frame
         
         Returns:
             tuple: (gaze_x_ratio, gaze_y_ratio) where:
@@ -190,9 +571,37 @@ class EyeTracker:
                    - gaze_y_ratio: 0.0 (looking up) to 1.0 (looking down)
                    Returns None if no face detected
         """
+        gaze = self.get_raw_position(landmark_frame)
+        if gaze is None:
+            return None
+        
+        # Filter (and optionally predict) the position
+        avg_gaze_x, avg_gaze_y = self._smooth(gaze, landmark_frame.timestamp)
+        
+        return (avg_gaze_x, avg_gaze_y)
+    
+    def get_raw_position(self, landmark_frame):
+        """
+        Get the unfiltered position of the current tracking mode - the input
+        of the filter chain.
+        
+        Args:
+            landmark_frame: LandmarkFrame for the current frame
+        
+        Returns:
+            tuple: (x, y) nose tip (head tracking) or averaged iris gaze ratios
+                   (gaze tracking), or None without iris landmarks
+        """
+        if self.use_head_tracking:
+            return landmark_frame.points[self.NOSE_TIP, :2]
+        
+        # Iris landmarks are only present with refine_landmarks=True
+        if not landmark_frame.has_iris:
+            return None
+        
         # Calculate gaze ratios for both eyes and average them
-        left_gaze = self._calculate_single_eye_gaze(face_landmarks, is_left_eye=True)
-        right_gaze = self._calculate_single_eye_gaze(face_landmarks, is_left_eye=False)
+        left_gaze = self._calculate_single_eye_gaze(landmark_frame, is_left_eye=True)
+        right_gaze = self._calculate_single_eye_gaze(landmark_frame, is_left_eye=False)
         
         if left_gaze is None or right_gaze is None:
             return None
@@ -200,78 +609,161 @@ class EyeTracker:
         # Average both eyes for more stable gaze tracking
         avg_gaze_x = (left_gaze[0] + right_gaze[0]) / 2
         avg_gaze_y = (left_gaze[1] + right_gaze[1]) / 2
+        return (avg_gaze_x, avg_gaze_y)
+    
+    def _smooth(self, position, timestamp=None):
+        """
+        Filter a raw (x, y) position with the active mode's filter chain.
         
-        # Add to history for multi-frame averaging
-        self.gaze_history.append((avg_gaze_x, avg_gaze_y))
-        if len(self.gaze_history) > self.history_size:
-            self.gaze_history.pop(0)
+        Args:
+            position: Raw (x, y) position for the current frame
+            timestamp: Capture timestamp (time.monotonic) of the frame
         
-        # Calculate average from history
-        if len(self.gaze_history) > 0:
-            avg_gaze_x = np.mean([g[0] for g in self.gaze_history])
-            avg_gaze_y = np.mean([g[1] for g in self.gaze_history])
+        Returns:
+            tuple: Filtered (x, y), extrapolated by the pipeline latency
+                   when latency prediction is enabled
+        """
+        now = time.monotonic()
+        if timestamp is None:
+            timestamp = now
         
-        # Apply exponential smoothing
-        if self.prev_eye_position is not None:
-            avg_gaze_x = self.smoothing_factor * self.prev_eye_position[0] + (1 - self.smoothing_factor) * avg_gaze_x
-            avg_gaze_y = self.smoothing_factor * self.prev_eye_position[1] + (1 - self.smoothing_factor) * avg_gaze_y
+        chain = self.get_active_filter()
+        smoothed = chain.update(position, timestamp)
         
-        self.prev_eye_position = (avg_gaze_x, avg_gaze_y)
+        if self.predict_latency:
+            latency = max(0.0, now - timestamp)
+            self.measured_latency = 0.9 * self.measured_latency + 0.1 * latency
+            smoothed = chain.predict(self.measured_latency + self.extra_latency)
         
-        return (avg_gaze_x, avg_gaze_y)
+        return (float(smoothed[0]), float(smoothed[1]))
+    
+    def get_active_filter(self):
+        """
+        Get the filter chain used by the current tracking mode.
+        
+        Returns:
+            FilterChain: Filter chain for head or iris tracking
+        """
+        return self.filters['head' if self.use_head_tracking else 'iris']
+    
+    def set_filter(self, mode, spec):
+        """
+        Replace the filter chain for a tracking mode.
+        
+        Args:
+            mode: 'head' or 'iris'
+            spec: Filter preset name or spec (see filters.create_filter)
+        """
+        if mode not in self.filters:
+            raise ValueError(f"Unknown tracking mode: {mode}")
+        self.filters[mode] = create_filter(spec)
+        self.filter_specs[mode] = spec
+        print(f"{mode.capitalize()} filter updated: {spec}")
+    
+    def set_latency_prediction(self, enabled, extra_latency=None):
+        """
+        Enable or disable predicting ahead by the pipeline latency.
+        
+        Args:
+            enabled: True to extrapolate the filtered position
+            extra_latency: Seconds of output-side latency to add (optional)
+        """
+        self.predict_latency = enabled
+        if extra_latency is not None:
+            self.extra_latency = max(0.0, extra_latency)
+        print(f"Latency prediction: {'enabled' if enabled else 'disabled'}")
+    
+    def set_history_size(self, history_size):
+        """
+        Set how many frames moving-average filters cover (takes effect immediately).
+        
+        Args:
+            history_size: Number of frames to average (1 = no averaging)
+        """
+        history_size = max(1, int(history_size))
+        averages = [f for chain in self.filters.values() for f in chain.find(MovingAverage)]
+        for f in averages:
+            f.resize(history_size)
+        if not averages:
+            print("Note: active filters have no moving average (see set_filter_params)")
+        print(f"Gaze history size updated: {history_size}")
     
-    def _calculate_single_eye_gaze(self, face_landmarks, is_left_eye=True):
+    def set_filter_params(self, mode, min_cutoff=None, beta=None):
+        """
+        Tune the One Euro stages of one tracking mode's filter chain
+        (takes effect immediately; set_filter() starts from the preset again).
+        
+        Args:
+            mode: 'head' or 'iris'
+            min_cutoff: Cutoff frequency (Hz) at rest (lower = less jitter)
+            beta: Cutoff increase with speed (higher = less lag)
+        """
+        if mode not in self.filters:
+            raise ValueError(f"Unknown tracking mode: {mode}")
+        params = {}
+        if min_cutoff is not None:
+            params['min_cutoff'] = max(1e-3, float(min_cutoff))
+        if beta is not None:
+            params['beta'] = max(0.0, float(beta))
+        
+        if not self.filters[mode].set_params(OneEuroFilter, **params):
+            print(f"Note: the {mode} filter has no One Euro stage")
+            return
+        print(f"{mode.capitalize()} One Euro filter updated: "
+              + ", ".join(f"{name}={value:g}" for name, value in params.items()))
+    
+    def set_smoothing_factor(self, smoothing_factor):
+        """
+        Set the factor of exponential-smoothing filters (takes effect immediately).
+        
+        Args:
+            smoothing_factor: Weight of the previous position (0-1, higher = smoother)
+        """
+        smoothing_factor = float(np.clip(smoothing_factor, 0.0, 1.0))
+        smoothers = [f for chain in self.filters.values() for f in chain.find(ExponentialSmoother)]
+        for f in smoothers:
+            f.smoothing_factor = smoothing_factor
+        if not smoothers:
+            print("Note: active filters have no exponential smoother (see set_filter_params)")
+        print(f"Gaze smoothing updated: {smoothing_factor}")
+    
+    def reset_smoothing(self):
+        """Clear the filter state (e.g. after the face was lost)."""
+        for chain in self.filters.values():
+            chain.reset()
+    
+    def _calculate_single_eye_gaze(self, landmark_frame, is_left_eye=True):
         """
         Calculate the relative gaze position for a single eye (IMPROVED ACCURACY).
         
         Uses enhanced landmark selection with weighted center calculation.
         
         Args:
-            face_landmarks: MediaPipe face landmarks
+            landmark_frame: LandmarkFrame for the current frame
             is_left_eye: True for left eye, False for right eye
         
         Returns:
             tuple: (gaze_x_ratio, gaze_y_ratio) or None
         """
-        if is_left_eye:
-            # Left eye landmarks (more precise selection)
-            iris_indices = self.LEFT_IRIS_INDICES
-            inner_corner = 133  # Inner corner (closest to nose)
-            outer_corner = 33   # Outer corner (away from nose)
-            top_lid = 159       # Top eyelid center
-            bottom_lid = 145    # Bottom eyelid center
-            # Additional landmarks for better boundary detection
-            upper_points = [159, 160, 161]
-            lower_points = [145, 144, 153]
-        else:
-            # Right eye landmarks
-            iris_indices = self.RIGHT_IRIS_INDICES
-            inner_corner = 362  # Inner corner (closest to nose)
-            outer_corner = 263  # Outer corner (away from nose)
-            top_lid = 386       # Top eyelid center
-            bottom_lid = 374    # Bottom eyelid center
-            upper_points = [386, 385, 387]
-            lower_points = [374, 373, 380]
+        # Row 0 of the index tables is the left eye, row 1 the right eye
+        eye = 0 if is_left_eye else 1
+        points = landmark_frame.points
         
         # Get iris center position (weighted average for better accuracy)
-        iris_x = np.mean([face_landmarks.landmark[i].x for i in iris_indices])
-        iris_y = np.mean([face_landmarks.landmark[i].y for i in iris_indices])
+        iris_x, iris_y = points[IRIS_INDICES[eye], :2].mean(axis=0)
         
-        # Get eye boundary positions with averaging
-        inner_x = face_landmarks.landmark[inner_corner].x
-        outer_x = face_landmarks.landmark[outer_corner].x
+        # Get eye boundary positions (inner corner is closest to nose)
+        inner_x = points[EYE_INNER_CORNER[eye], 0]
+        outer_x = points[EYE_OUTER_CORNER[eye], 0]
         
         # Average top and bottom points for more stable boundaries
-        top_y = np.mean([face_landmarks.landmark[i].y for i in upper_points])
-        bottom_y = np.mean([face_landmarks.landmark[i].y for i in lower_points])
+        top_y = points[UPPER_LID_INDICES[eye], 1].mean()
+        bottom_y = points[LOWER_LID_INDICES[eye], 1].mean()
         
         # Calculate horizontal gaze ratio with improved scaling
         eye_width = abs(outer_x - inner_x)
         if eye_width > 0:
-            if is_left_eye:
-                gaze_x_ratio = (iris_x - inner_x) / eye_width
-            else:
-                gaze_x_ratio = (iris_x - inner_x) / eye_width
+            gaze_x_ratio = (iris_x - inner_x) / eye_width
             
             # Apply non-linear scaling for better edge detection
             # This helps cursor reach screen edges more easily
@@ -332,7 +824,7 @@ class EyeTracker:
         Get eye landmark coordinates for blink detection.
         
         Args:
-            face_landmarks: MediaPipe face landmarks
+            face_landmarks: LandmarkFrame (or MediaPipe face landmarks)
             frame_shape: Shape of the frame (height, width, channels)
         
         Returns:
@@ -341,23 +833,52 @@ class EyeTracker:
         if not face_landmarks:
             return None
         
-        h, w = frame_shape[:2]
+        landmark_frame = as_landmark_frame(face_landmarks, frame_shape)
         
-        # Extract left eye landmarks
-        left_eye = np.array([(face_landmarks.landmark[i].x * w, 
-                              face_landmarks.landmark[i].y * h) 
-                             for i in self.LEFT_EYE_INDICES])
-        
-        # Extract right eye landmarks
-        right_eye = np.array([(face_landmarks.landmark[i].x * w, 
-                               face_landmarks.landmark[i].y * h) 
-                              for i in self.RIGHT_EYE_INDICES])
+        # Both eyes in one fancy-indexing lookup: shape (2, 6, 2)
+        eyes = landmark_frame.pixel_points(EAR_INDICES, frame_shape)
         
         return {
-            'left_eye': left_eye,
-            'right_eye': right_eye
+            'left_eye': eyes[0],
+            'right_eye': eyes[1]
         }
     
+    def set_model_profile(self, profile):
+        """
+        Switch the FaceMesh configuration without touching the camera.
+        
+        The backend builds the new model before swapping out the old one, so
+        a running tracking loop only waits for the swap itself.
+        
+        Args:
+            profile: Profile name from MODEL_PROFILES ('head', 'iris')
+        """
+        if profile not in self.MODEL_PROFILES:
+            raise ValueError(f"Unknown model profile: {profile}")
+        if profile == self.model_profile:
+            return
+        
+        self.backend.configure(self.MODEL_PROFILES[profile])
+        self.model_profile = profile
+        print(f"FaceMesh profile: {profile}")
+    
+    def set_tracking_mode(self, use_head_tracking):
+        """
+        Switch between head tracking and iris gaze tracking.
+        
+        Also switches to the cheapest FaceMesh profile for the new mode.
+        
+        Args:
+            use_head_tracking: True for head tracking, False for iris gaze tracking
+        """
+        self.use_head_tracking = use_head_tracking
+        self.get_active_filter().reset()
+        self.set_model_profile(self._profile_for_mode())
+    
+    def _profile_for_mode(self):
+        """Return the cheapest model profile for the current tracking mode."""
+        return 'head' if self.use_head_tracking else 'iris'
+    
     def release(self):
         """Release MediaPipe resources."""
-        self.face_mesh.close()
+        self.backend.close()
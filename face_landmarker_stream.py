@@ -0,0 +1,188 @@
+"""
+Face Landmarker Stream Module
+Alternative inference backend on the MediaPipe Tasks FaceLandmarker API in
+LIVE_STREAM mode. Frames are submitted with their timestamps and results
+arrive through a callback on MediaPipe's own thread, so inference of frame N
+overlaps the capture (and processing) of frame N+1. Results are delivered as
+LandmarkFrame objects, like the FaceMesh path.
+
+Needs the FaceLandmarker model bundle, downloadable from
+https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/latest/face_landmarker.task
+"""
+
+import threading
+import time
+
+import cv2
+import mediapipe as mp
+
+from landmarks import LandmarkFrame
+
+DEFAULT_MODEL_PATH = 'face_landmarker.task'
+
+# Returned by take_result() while no result arrived since the last call
+NO_RESULT = object()
+
+
+def landmarker_options(settings):
+    """
+    Translate FaceMesh settings (EyeTracker.MODEL_PROFILES) to FaceLandmarker options.
+
+    The Tasks model always outputs the 478 landmarks including the iris, so
+    refine_landmarks has no equivalent.
+
+    Args:
+        settings: Dict with min_detection_confidence / min_tracking_confidence
+
+    Returns:
+        dict: FaceLandmarkerOptions keyword arguments
+    """
+    return {
+        'num_faces': 1,
+        'min_face_detection_confidence': settings.get('min_detection_confidence', 0.5),
+        'min_face_presence_confidence': settings.get('min_detection_confidence', 0.5),
+        'min_tracking_confidence': settings.get('min_tracking_confidence', 0.5),
+    }
+
+
+class FaceLandmarkerStream:
+    """Asynchronous FaceLandmarker: submit frames, collect the newest result."""
+
+    def __init__(self, settings, model_path=DEFAULT_MODEL_PATH):
+        """
+        Initialize the stream (the model is loaded by start()).
+
+        Args:
+            settings: FaceMesh-style settings (see landmarker_options)
+            model_path: Path to the face_landmarker.task model bundle
+        """
+        self.settings = dict(settings)
+        self.model_path = model_path
+
+        self._lock = threading.Lock()
+        self._landmarker = None
+        self._last_timestamp_ms = -1
+        self._pending = {}   # timestamp_ms -> capture timestamp of submitted frames
+        self._result = NO_RESULT  # Newest result not yet taken (LandmarkFrame or None)
+        self._result_timestamp_ms = -1
+
+        # Statistics
+        self.frames_submitted = 0
+        self.results_received = 0
+        self.results_skipped = 0  # Replaced by a newer result before being taken
+
+    def start(self):
+        """
+        Load the model and create the live-stream landmarker.
+
+        Returns:
+            bool: True if ready, False otherwise (e.g. model file missing)
+        """
+        try:
+            landmarker = self._create(self.settings)
+        except Exception as e:
+            print(f"FaceLandmarker: could not load {self.model_path} ({e})")
+            return False
+
+        with self._lock:
+            self._landmarker = landmarker
+        return True
+
+    def configure(self, settings):
+        """
+        Rebuild the landmarker with new confidence settings.
+
+        Args:
+            settings: FaceMesh-style settings
+        """
+        landmarker = self._create(settings)
+        with self._lock:
+            old_landmarker = self._landmarker
+            self._landmarker = landmarker
+            self.settings = dict(settings)
+            # The new graph starts a fresh timestamp sequence
+            self._last_timestamp_ms = -1
+            self._result_timestamp_ms = -1
+            self._pending.clear()
+        if old_landmarker is not None:
+            old_landmarker.close()
+
+    def submit(self, frame, timestamp=None):
+        """
+        Queue a frame for inference. Returns without waiting for the result.
+
+        Args:
+            frame: OpenCV frame (BGR format)
+            timestamp: Capture timestamp (seconds, time.monotonic)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+
+        with self._lock:
+            landmarker = self._landmarker
+            if landmarker is None:
+                return
+            # Live-stream timestamps must increase strictly (in ms)
+            timestamp_ms = max(int(timestamp * 1000), self._last_timestamp_ms + 1)
+            self._last_timestamp_ms = timestamp_ms
+            self._pending[timestamp_ms] = timestamp
+            self.frames_submitted += 1
+
+        # Outside the lock - the result callback takes it
+        landmarker.detect_async(image, timestamp_ms)
+
+    def take_result(self):
+        """
+        Get the newest result that wasn't taken yet.
+
+        Returns:
+            LandmarkFrame: Landmarks (timestamped with their source frame's
+                           capture time), None if the landmarker found no
+                           face, or NO_RESULT if nothing new arrived
+        """
+        with self._lock:
+            result = self._result
+            self._result = NO_RESULT
+        return result
+
+    def close(self):
+        """Close the landmarker."""
+        with self._lock:
+            landmarker = self._landmarker
+            self._landmarker = None
+        if landmarker is not None:
+            landmarker.close()
+
+    def _create(self, settings):
+        """Create a FaceLandmarker in LIVE_STREAM mode."""
+        vision = mp.tasks.vision
+        options = vision.FaceLandmarkerOptions(
+            base_options=mp.tasks.BaseOptions(model_asset_path=self.model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            result_callback=self._on_result,
+            **landmarker_options(settings)
+        )
+        return vision.FaceLandmarker.create_from_options(options)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        """Result callback (MediaPipe thread): keep only the newest result."""
+        with self._lock:
+            timestamp = self._pending.pop(timestamp_ms, timestamp_ms / 1000.0)
+            # Frames the graph dropped never get a callback - forget them
+            for stale in [t for t in self._pending if t < timestamp_ms]:
+                del self._pending[stale]
+
+            if timestamp_ms <= self._result_timestamp_ms:
+                return
+            self._result_timestamp_ms = timestamp_ms
+            self.results_received += 1
+
+            if self._result is not NO_RESULT:
+                self.results_skipped += 1
+
+            if result.face_landmarks:
+                self._result = LandmarkFrame.from_landmark_list(result.face_landmarks[0], timestamp)
+            else:
+                self._result = None
@@ -0,0 +1,275 @@
+"""
+FaceMesh Process Module
+Runs MediaPipe FaceMesh in a separate worker process.
+Frames are handed over through a shared memory buffer (no pickling of
+images) and the worker writes the 478x3 landmark array into a second shared
+buffer; only tiny control messages go through the pipe. Inference then no
+longer competes for the GIL with the Tk GUI, the voice assistant and the
+cursor thread, and vice versa.
+"""
+
+import multiprocessing
+import threading
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from landmarks import NUM_LANDMARKS
+
+RESULT_SHAPE = (NUM_LANDMARKS, 3)
+RESULT_BYTES = NUM_LANDMARKS * 3 * 4  # float32
+
+
+def _attach(name):
+    """Attach to a shared memory block created by the other process."""
+    try:
+        # The creating process owns (and unlinks) the block
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track argument
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(conn, settings):
+    """
+    Worker process: run FaceMesh on frames from shared memory.
+
+    Messages (tuples) from the parent:
+        ('attach', frame_name, result_name) - use these shared buffers
+        ('process', shape)                   - run on the frame in the buffer
+        ('configure', settings)              - rebuild FaceMesh with new settings
+        ('close',)                           - exit
+    Replies: 'ready' once, True for attach/configure, the number of landmarks
+    written (0 = no face) for process.
+    """
+    import mediapipe as mp
+
+    face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, **settings)
+    frame_shm = None
+    result_shm = None
+    result = None
+    conn.send('ready')
+
+    try:
+        while True:
+            message = conn.recv()
+            command = message[0]
+
+            if command == 'process':
+                frame = np.ndarray(message[1], dtype=np.uint8, buffer=frame_shm.buf)
+                results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                if not results.multi_face_landmarks:
+                    conn.send(0)
+                    continue
+                landmark_list = results.multi_face_landmarks[0].landmark
+                count = min(len(landmark_list), NUM_LANDMARKS)
+                result[:count] = np.fromiter(
+                    (v for lm in landmark_list[:count] for v in (lm.x, lm.y, lm.z)),
+                    dtype=np.float32, count=count * 3
+                ).reshape(count, 3)
+                conn.send(count)
+
+            elif command == 'attach':
+                result = None
+                for shm in (frame_shm, result_shm):
+                    if shm is not None:
+                        shm.close()
+                frame_shm = _attach(message[1])
+                result_shm = _attach(message[2])
+                result = np.ndarray(RESULT_SHAPE, dtype=np.float32, buffer=result_shm.buf)
+                conn.send(True)
+
+            elif command == 'configure':
+                new_face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, **message[1])
+                face_mesh.close()
+                face_mesh = new_face_mesh
+                conn.send(True)
+
+            elif command == 'close':
+                break
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        face_mesh.close()
+        result = None
+        for shm in (frame_shm, result_shm):
+            if shm is not None:
+                shm.close()
+
+
+class FaceMeshProcess:
+    """FaceMesh running in a worker process, fed through shared memory."""
+
+    def __init__(self, settings, timeout=2.0, startup_timeout=60.0):
+        """
+        Initialize the worker (started by start()).
+
+        Args:
+            settings: FaceMesh keyword arguments (see EyeTracker.MODEL_PROFILES)
+            timeout: Seconds to wait for one frame before treating the worker as hung
+            startup_timeout: Seconds to wait for the worker to load the model
+        """
+        self.settings = dict(settings)
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._process = None
+        self._frame_shm = None
+        self._result_shm = None
+        self._result = None
+        self._closed = False
+
+        # Statistics
+        self.frames_processed = 0
+        self.restarts = 0
+
+    def start(self):
+        """
+        Start the worker process and wait until its model is loaded.
+
+        Returns:
+            bool: True if the worker is ready, False otherwise
+        """
+        with self._lock:
+            self._closed = False
+            return self._start()
+
+    def is_alive(self):
+        """
+        Check if the worker process is running.
+
+        Returns:
+            bool: True if running, False otherwise
+        """
+        return self._process is not None and self._process.is_alive()
+
+    def process(self, frame):
+        """
+        Run FaceMesh on a BGR frame (or crop) in the worker.
+
+        Args:
+            frame: OpenCV frame (BGR, uint8); may be a non-contiguous crop view
+
+        Returns:
+            tuple: (points, count) with a (478, 3) float32 array (NaN-padded)
+                   relative to the frame, or None if no face / worker failure
+        """
+        with self._lock:
+            if self._closed:
+                return None
+            if not self.is_alive():
+                # Worker died or hung earlier - bring it back
+                self.restarts += 1
+                print("FaceMesh process: restarting worker")
+                self._stop()
+                if not self._start():
+                    return None
+
+            if self._frame_shm is None or self._frame_shm.size < frame.nbytes:
+                if not self._allocate_frame_buffer(frame.nbytes):
+                    return None
+
+            # Single copy of the image into shared memory
+            np.copyto(np.ndarray(frame.shape, dtype=np.uint8, buffer=self._frame_shm.buf), frame)
+            self._conn.send(('process', frame.shape))
+            count = self._receive()
+            if not count:
+                return None
+
+            self.frames_processed += 1
+            points = np.full(RESULT_SHAPE, np.nan, dtype=np.float32)
+            points[:count] = self._result[:count]
+            return points, count
+
+    def configure(self, settings):
+        """
+        Rebuild the worker's FaceMesh with new settings.
+
+        Args:
+            settings: FaceMesh keyword arguments
+        """
+        with self._lock:
+            self.settings = dict(settings)
+            if not self.is_alive():
+                return  # Applied on the next (re)start
+            self._conn.send(('configure', self.settings))
+            self._receive(self.startup_timeout)
+
+    def close(self):
+        """Stop the worker and free the shared buffers."""
+        with self._lock:
+            self._closed = True
+            self._stop()
+
+    def _start(self):
+        """Start the worker (caller holds the lock)."""
+        # 'spawn' - forking a process that runs threads and MediaPipe is unsafe
+        context = multiprocessing.get_context('spawn')
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(target=_worker_main, args=(child_conn, self.settings),
+                                        daemon=True)
+        self._process.start()
+        child_conn.close()
+
+        if self._receive(self.startup_timeout) != 'ready':
+            print("FaceMesh process: worker failed to start")
+            self._stop()
+            return False
+
+        self._result_shm = shared_memory.SharedMemory(create=True, size=RESULT_BYTES)
+        self._result = np.ndarray(RESULT_SHAPE, dtype=np.float32, buffer=self._result_shm.buf)
+        return True
+
+    def _allocate_frame_buffer(self, nbytes):
+        """Replace the frame buffer with one of at least nbytes (caller holds the lock)."""
+        old_shm = self._frame_shm
+        self._frame_shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._conn.send(('attach', self._frame_shm.name, self._result_shm.name))
+        ok = self._receive() is True
+
+        if old_shm is not None:
+            old_shm.close()
+            old_shm.unlink()
+        return ok
+
+    def _receive(self, timeout=None):
+        """Wait for the worker's reply; a silent worker is terminated (caller holds the lock)."""
+        try:
+            if self._conn.poll(self.timeout if timeout is None else timeout):
+                return self._conn.recv()
+        except (EOFError, OSError):
+            pass
+
+        print("FaceMesh process: worker not responding")
+        if self._process is not None:
+            self._process.terminate()
+        return None
+
+    def _stop(self):
+        """Stop the worker and release the buffers (caller holds the lock)."""
+        if self._process is not None:
+            if self._process.is_alive():
+                try:
+                    self._conn.send(('close',))
+                except (OSError, ValueError):
+                    pass
+                self._process.join(timeout=2.0)
+                if self._process.is_alive():
+                    self._process.terminate()
+                    self._process.join(timeout=1.0)
+            self._process = None
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+        self._result = None
+        for shm in (self._frame_shm, self._result_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._frame_shm = None
+        self._result_shm = None
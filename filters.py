@@ -0,0 +1,453 @@
+"""
+Filters Module
+Signal filters for smoothing the gaze / head position.
+Filters share one interface - update(value, timestamp) returns the filtered
+value - so they can be swapped or chained and applied at a single stage.
+Filters keep their state in preallocated NumPy buffers.
+"""
+
+import math
+import time
+
+import numpy as np
+
+
+class MovingAverage:
+    """Moving average over the last N samples using a ring buffer and running sum."""
+
+    def __init__(self, size=5, dims=2):
+        """
+        Initialize the moving average.
+
+        Args:
+            size: Number of samples to average (history size)
+            dims: Number of values per sample (2 for x/y)
+        """
+        self.dims = dims
+        self._mean = np.zeros(dims)
+        self._allocate(size)
+
+    def _allocate(self, size):
+        """Allocate an empty ring buffer of the given size."""
+        self.size = max(1, int(size))
+        self._buffer = np.zeros((self.size, self.dims))
+        self._sum = np.zeros(self.dims)
+        self._index = 0
+        self._count = 0
+
+    def update(self, value, timestamp=None):
+        """
+        Add a sample and return the current average.
+
+        Args:
+            value: Sample with dims values (e.g. (x, y))
+            timestamp: Sample time in seconds (unused)
+
+        Returns:
+            np.ndarray: Average of the buffered samples. The array is reused
+                        on the next update - copy it if you need to keep it.
+        """
+        slot = self._buffer[self._index]
+        if self._count == self.size:
+            self._sum -= slot
+        else:
+            self._count += 1
+
+        slot[:] = value
+        self._sum += slot
+
+        self._index += 1
+        if self._index == self.size:
+            self._index = 0
+            # Re-sum once per wrap so floating-point drift can't accumulate
+            if self._count == self.size:
+                np.sum(self._buffer, axis=0, out=self._sum)
+
+        np.divide(self._sum, self._count, out=self._mean)
+        return self._mean
+
+    def resize(self, size):
+        """
+        Change the history size, keeping the most recent samples.
+
+        Args:
+            size: New number of samples to average
+        """
+        recent = self.get_samples()[-max(1, int(size)):]
+        self._allocate(size)
+        for sample in recent:
+            self.update(sample)
+
+    def get_samples(self):
+        """
+        Get the buffered samples, oldest first.
+
+        Returns:
+            np.ndarray: Array of shape (count, dims)
+        """
+        if self._count < self.size:
+            return self._buffer[:self._count].copy()
+        return np.roll(self._buffer, -self._index, axis=0)
+
+    def reset(self):
+        """Clear all buffered samples."""
+        self._buffer[:] = 0.0
+        self._sum[:] = 0.0
+        self._index = 0
+        self._count = 0
+
+
+class ExponentialSmoother:
+    """Exponential moving average: state = f * state + (1 - f) * value."""
+
+    def __init__(self, smoothing_factor=0.3, dims=2):
+        """
+        Initialize the smoother.
+
+        Args:
+            smoothing_factor: Weight of the previous state (0-1, higher = smoother)
+            dims: Number of values per sample
+        """
+        self.smoothing_factor = smoothing_factor
+        self._state = np.zeros(dims)
+        self._delta = np.zeros(dims)
+        self._initialized = False
+
+    def update(self, value, timestamp=None):
+        """
+        Add a sample and return the smoothed value.
+
+        Args:
+            value: Sample with dims values
+            timestamp: Sample time in seconds (unused)
+
+        Returns:
+            np.ndarray: Smoothed value (reused on the next update)
+        """
+        if not self._initialized:
+            self._state[:] = value
+            self._initialized = True
+            return self._state
+
+        # state += (1 - f) * (value - state), computed in place
+        np.subtract(value, self._state, out=self._delta)
+        self._delta *= 1.0 - self.smoothing_factor
+        self._state += self._delta
+        return self._state
+
+    def reset(self):
+        """Forget the smoothed state."""
+        self._initialized = False
+
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al., 2012).
+
+    A low-pass filter whose cutoff frequency rises with speed: heavy smoothing
+    while the head/eyes are still, little lag during fast movements.
+    """
+
+    def __init__(self, min_cutoff=1.0, beta=5.0, d_cutoff=1.0, dims=2):
+        """
+        Initialize the One Euro filter.
+
+        Args:
+            min_cutoff: Cutoff frequency (Hz) at zero speed (lower = less jitter)
+            beta: Cutoff increase per unit/s of speed (higher = less lag)
+            d_cutoff: Cutoff frequency (Hz) for the speed estimate
+            dims: Number of values per sample
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+        self._value = np.zeros(dims)
+        self.velocity = np.zeros(dims)  # Filtered derivative (units per second)
+        self._last_time = None
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        """Smoothing factor for a first-order low-pass at the given cutoff."""
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def update(self, value, timestamp=None):
+        """
+        Add a sample and return the filtered value.
+
+        Args:
+            value: Sample with dims values
+            timestamp: Sample time in seconds (defaults to now)
+
+        Returns:
+            np.ndarray: Filtered value (reused on the next update)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        if self._last_time is None:
+            self._value[:] = value
+            self.velocity[:] = 0.0
+            self._last_time = timestamp
+            return self._value
+
+        dt = timestamp - self._last_time
+        if dt <= 0:
+            return self._value
+        self._last_time = timestamp
+
+        value = np.asarray(value, dtype=float)
+
+        # Low-pass the derivative, then adapt the cutoff to the speed
+        a_d = self._alpha(self.d_cutoff, dt)
+        self.velocity += a_d * ((value - self._value) / dt - self.velocity)
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.velocity)
+        self._value += self._alpha(cutoff, dt) * (value - self._value)
+        return self._value
+
+    def reset(self):
+        """Forget the filter state."""
+        self._last_time = None
+        self.velocity[:] = 0.0
+
+
+class KalmanFilter:
+    """
+    Constant-velocity Kalman filter, run independently on each axis.
+
+    State per axis is (position, velocity); the process noise models random
+    acceleration, the measurement noise the landmark jitter.
+    """
+
+    def __init__(self, process_noise=10.0, measurement_noise=2.5e-5, dims=2):
+        """
+        Initialize the Kalman filter.
+
+        Args:
+            process_noise: Acceleration variance ((units/s^2)^2), higher = less lag
+            measurement_noise: Measurement variance (units^2), higher = smoother
+            dims: Number of values per sample
+        """
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+
+        self._position = np.zeros(dims)
+        self.velocity = np.zeros(dims)
+        # Covariance entries per axis: [[p00, p01], [p01, p11]]
+        self._p00 = np.ones(dims)
+        self._p01 = np.zeros(dims)
+        self._p11 = np.ones(dims)
+        self._last_time = None
+
+    def update(self, value, timestamp=None):
+        """
+        Add a measurement and return the filtered position.
+
+        Args:
+            value: Measurement with dims values
+            timestamp: Measurement time in seconds (defaults to now)
+
+        Returns:
+            np.ndarray: Filtered position (reused on the next update)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        if self._last_time is None:
+            self._position[:] = value
+            self.velocity[:] = 0.0
+            self._p00[:] = self.measurement_noise
+            self._p01[:] = 0.0
+            self._p11[:] = 1.0
+            self._last_time = timestamp
+            return self._position
+
+        dt = timestamp - self._last_time
+        if dt <= 0:
+            return self._position
+        self._last_time = timestamp
+
+        # Predict: x = F x, P = F P F^T + Q
+        q = self.process_noise
+        self._position += self.velocity * dt
+        self._p00 += dt * (2.0 * self._p01 + dt * self._p11) + q * dt ** 4 / 4.0
+        self._p01 += dt * self._p11 + q * dt ** 3 / 2.0
+        self._p11 += q * dt ** 2
+
+        # Update with the measured position
+        s = self._p00 + self.measurement_noise
+        k0 = self._p00 / s
+        k1 = self._p01 / s
+        innovation = np.asarray(value, dtype=float) - self._position
+        self._position += k0 * innovation
+        self.velocity += k1 * innovation
+        self._p11 -= k1 * self._p01
+        self._p01 *= 1.0 - k0
+        self._p00 *= 1.0 - k0
+        return self._position
+
+    def reset(self):
+        """Forget the filter state."""
+        self._last_time = None
+        self.velocity[:] = 0.0
+
+
+class FilterChain:
+    """
+    Applies a sequence of filters and optionally predicts ahead.
+
+    Prediction extrapolates the output by velocity * lead time. Filters that
+    estimate velocity (One Euro, Kalman) provide it directly; otherwise it is
+    estimated from successive outputs.
+    """
+
+    def __init__(self, filters, dims=2):
+        """
+        Initialize the filter chain.
+
+        Args:
+            filters: List of filter instances, applied in order
+            dims: Number of values per sample
+        """
+        self.filters = list(filters)
+        self._output = np.zeros(dims)
+        self._velocity = np.zeros(dims)
+        self._last_time = None
+
+    def update(self, value, timestamp=None):
+        """
+        Run a sample through every filter in the chain.
+
+        Args:
+            value: Sample with dims values
+            timestamp: Sample time in seconds (defaults to now)
+
+        Returns:
+            np.ndarray: Filtered value (reused on the next update)
+        """
+        if timestamp is None:
+            timestamp = time.monotonic()
+
+        output = value
+        for f in self.filters:
+            output = f.update(output, timestamp)
+
+        # Finite-difference velocity for filters that don't estimate it
+        if self._last_time is not None and timestamp > self._last_time:
+            np.subtract(output, self._output, out=self._velocity)
+            self._velocity /= timestamp - self._last_time
+        self._last_time = timestamp
+
+        self._output[:] = output
+        return self._output
+
+    @property
+    def velocity(self):
+        """np.ndarray: Velocity estimate of the output (units per second)."""
+        if self.filters and hasattr(self.filters[-1], 'velocity'):
+            return self.filters[-1].velocity
+        return self._velocity
+
+    def predict(self, lead_time):
+        """
+        Extrapolate the last output forward in time.
+
+        Args:
+            lead_time: Seconds to predict ahead (e.g. measured pipeline latency)
+
+        Returns:
+            np.ndarray: Predicted value (new array)
+        """
+        return self._output + self.velocity * lead_time
+
+    def find(self, filter_type):
+        """
+        Get the filters of a given type in this chain.
+
+        Args:
+            filter_type: Filter class to look for
+
+        Returns:
+            list: Matching filter instances
+        """
+        return [f for f in self.filters if isinstance(f, filter_type)]
+
+    def set_params(self, filter_type, **params):
+        """
+        Set parameters of the filters of a given type (take effect on the next update).
+
+        Args:
+            filter_type: Filter class to configure
+            **params: Attribute values, e.g. min_cutoff=0.8, beta=3.0
+
+        Returns:
+            list: The filters changed
+        """
+        matches = self.find(filter_type)
+        for f in matches:
+            for name, value in params.items():
+                if not hasattr(f, name):
+                    raise ValueError(f"{filter_type.__name__} has no parameter {name!r}")
+                setattr(f, name, value)
+        return matches
+
+    def reset(self):
+        """Reset every filter in the chain."""
+        for f in self.filters:
+            f.reset()
+        self._velocity[:] = 0.0
+        self._last_time = None
+
+
+# Named filter configurations (a list means a chain)
+FILTER_PRESETS = {
+    'none': [],
+    'moving_average': [{'type': 'moving_average', 'size': 5}],
+    'ema': [{'type': 'ema', 'smoothing_factor': 0.5}],
+    'legacy': [
+        {'type': 'moving_average', 'size': 5},
+        {'type': 'ema', 'smoothing_factor': 0.3},
+    ],
+    'one_euro': [{'type': 'one_euro', 'min_cutoff': 1.0, 'beta': 5.0}],
+    'one_euro_iris': [{'type': 'one_euro', 'min_cutoff': 0.5, 'beta': 2.0}],
+    'kalman': [{'type': 'kalman', 'process_noise': 10.0, 'measurement_noise': 2.5e-5}],
+}
+
+FILTER_TYPES = {
+    'moving_average': MovingAverage,
+    'ema': ExponentialSmoother,
+    'one_euro': OneEuroFilter,
+    'kalman': KalmanFilter,
+}
+
+
+def create_filter(spec, dims=2):
+    """
+    Build a FilterChain from a preset name or filter description.
+
+    Args:
+        spec: Preset name (see FILTER_PRESETS), a dict like
+              {'type': 'one_euro', 'beta': 3.0}, or a list of those
+        dims: Number of values per sample
+
+    Returns:
+        FilterChain: The configured filter chain
+    """
+    if isinstance(spec, str):
+        if spec not in FILTER_PRESETS:
+            raise ValueError(f"Unknown filter preset: {spec}")
+        spec = FILTER_PRESETS[spec]
+    if isinstance(spec, dict):
+        spec = [spec]
+
+    filters = []
+    for item in spec:
+        params = dict(item)
+        filter_type = params.pop('type')
+        if filter_type not in FILTER_TYPES:
+            raise ValueError(f"Unknown filter type: {filter_type}")
+        filters.append(FILTER_TYPES[filter_type](dims=dims, **params))
+
+    return FilterChain(filters, dims=dims)
@@ -0,0 +1,308 @@
+"""
+Frame Source Module
+Common interface for where frames come from: a live camera or a recorded
+session (video file or image directory) replayed with its original timing.
+Replay makes tracking, blink detection and calibration runnable without a
+webcam, e.g. for benchmarks and reproducing issues on CI.
+"""
+
+import os
+import time
+
+import cv2
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+class FrameSource:
+    """
+    Base class for frame sources.
+
+    read() returns (ok, frame, timestamp) with timestamps on the
+    time.monotonic() clock (replayed sources keep the recorded spacing).
+    """
+
+    # Live sources drop frames when consumers fall behind; replays don't
+    is_live = False
+
+    def __init__(self):
+        """Initialize the frame source."""
+        self.is_finished = False  # True once a replay reached its end
+
+    def open(self):
+        """
+        Open the source.
+
+        Returns:
+            bool: True if frames can be read, False otherwise
+        """
+        raise NotImplementedError
+
+    def read(self):
+        """
+        Read the next frame.
+
+        Returns:
+            tuple: (ok, frame, timestamp)
+        """
+        raise NotImplementedError
+
+    def isOpened(self):
+        """
+        Check if the source is open.
+
+        Returns:
+            bool: True if open, False otherwise
+        """
+        raise NotImplementedError
+
+    def set_resolution(self, size):
+        """
+        Change the capture resolution (only live cameras support this).
+
+        Args:
+            size: (width, height), or None for the resolution the source opened with
+
+        Returns:
+            bool: True if the resolution was applied, False otherwise
+        """
+        return False
+
+    def release(self):
+        """Release the source."""
+        raise NotImplementedError
+
+
+class CameraSource(FrameSource):
+    """Live camera via cv2.VideoCapture."""
+
+    is_live = True
+
+    def __init__(self, index=0):
+        """
+        Initialize the camera source.
+
+        Args:
+            index: Camera index passed to cv2.VideoCapture
+        """
+        super().__init__()
+        self.index = index
+        self.cap = None
+        self.default_resolution = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            return False
+        self.default_resolution = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                   int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        return True
+
+    def read(self):
+        # Timestamp right after grab() - closest to the exposure time
+        if not self.cap.grab():
+            return False, None, None
+        timestamp = time.monotonic()
+        ret, frame = self.cap.retrieve()
+        return ret, frame, timestamp
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def set_resolution(self, size):
+        if not self.isOpened():
+            return False
+        width, height = size or self.default_resolution
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Drivers pick the nearest supported mode
+        applied = (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                   int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        print(f"Camera resolution: {applied[0]}x{applied[1]}")
+        return True
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+
+class _ReplaySource(FrameSource):
+    """Shared timing logic for recorded sources."""
+
+    def __init__(self, realtime=True):
+        """
+        Initialize the replay timing.
+
+        Args:
+            realtime: If True, deliver frames at their recorded times;
+                      if False, run as fast as possible
+        """
+        super().__init__()
+        self.realtime = realtime
+        self._start_time = None
+
+    def _timestamp(self, media_time):
+        """
+        Map a recorded time (seconds since the first frame) to the monotonic clock.
+
+        In realtime mode this waits until the frame is due, so the original
+        frame spacing is preserved either way.
+        """
+        if self._start_time is None:
+            self._start_time = time.monotonic() - media_time
+
+        timestamp = self._start_time + media_time
+        if self.realtime:
+            delay = timestamp - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return timestamp
+
+
+class VideoFileSource(_ReplaySource):
+    """Replays a video file using its frame timestamps."""
+
+    def __init__(self, path, realtime=True, loop=False):
+        """
+        Initialize the video file source.
+
+        Args:
+            path: Path to the video file
+            realtime: If True, replay at recorded speed; else as fast as possible
+            loop: If True, restart at the end of the file
+        """
+        super().__init__(realtime)
+        self.path = path
+        self.loop = loop
+        self.cap = None
+        self._fps = 30.0
+        self._frame_index = 0
+        self._loop_offset = 0.0
+        self._last_media_time = 0.0
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            return False
+        self._fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        return True
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop and self._frame_index > 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._loop_offset = self._last_media_time + 1.0 / self._fps
+            ret, frame = self.cap.read()
+        if not ret:
+            self.is_finished = True
+            return False, None, None
+
+        # Prefer the container timestamp, fall back to frame index / fps
+        position_ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if position_ms > 0 or self._frame_index == 0:
+            media_time = position_ms / 1000.0
+        else:
+            media_time = self._frame_index / self._fps
+        media_time += self._loop_offset
+
+        self._frame_index += 1
+        self._last_media_time = media_time
+        return True, frame, self._timestamp(media_time)
+
+    def isOpened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+
+class ImageDirectorySource(_ReplaySource):
+    """
+    Replays a directory of images in file name order.
+
+    Frame times come from an optional 'timestamps.txt' in the directory
+    (one time in seconds per line, in file order), otherwise from fps.
+    """
+
+    def __init__(self, path, fps=30.0, realtime=True):
+        """
+        Initialize the image directory source.
+
+        Args:
+            path: Directory containing the images
+            fps: Frame rate used when there is no timestamps.txt
+            realtime: If True, replay at recorded speed; else as fast as possible
+        """
+        super().__init__(realtime)
+        self.path = path
+        self.fps = fps
+        self.files = []
+        self.timestamps = None
+        self._index = 0
+
+    def open(self):
+        if not os.path.isdir(self.path):
+            return False
+
+        self.files = sorted(
+            name for name in os.listdir(self.path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+
+        timestamps_path = os.path.join(self.path, 'timestamps.txt')
+        if os.path.exists(timestamps_path):
+            with open(timestamps_path) as f:
+                values = [float(line) for line in f if line.strip()]
+            if len(values) >= len(self.files):
+                self.timestamps = [t - values[0] for t in values]
+            else:
+                print("Warning: timestamps.txt is shorter than the image list; using fps")
+
+        return len(self.files) > 0
+
+    def read(self):
+        if self._index >= len(self.files):
+            self.is_finished = True
+            return False, None, None
+
+        frame = cv2.imread(os.path.join(self.path, self.files[self._index]))
+        if self.timestamps is not None:
+            media_time = self.timestamps[self._index]
+        else:
+            media_time = self._index / self.fps
+        self._index += 1
+
+        if frame is None:
+            return False, None, None
+        return True, frame, self._timestamp(media_time)
+
+    def isOpened(self):
+        return bool(self.files) and not self.is_finished
+
+    def release(self):
+        self._index = len(self.files)
+
+
+def open_frame_source(spec, realtime=True):
+    """
+    Create a frame source from a camera index, video file or image directory.
+
+    Args:
+        spec: Camera index (int or digit string), video file path or
+              image directory path; an existing FrameSource is returned as is
+        realtime: For recorded sources, replay at recorded speed (True)
+                  or as fast as possible (False)
+
+    Returns:
+        FrameSource: The (not yet opened) frame source
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, realtime=realtime)
+    return VideoFileSource(spec, realtime=realtime)
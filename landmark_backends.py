@@ -0,0 +1,367 @@
+"""
+Landmark Backends Module
+Interface between EyeTracker and whatever produces face landmarks.
+Every backend turns a frame into a LandmarkFrame, so nothing downstream
+depends on MediaPipe's landmark objects:
+
+    'solution' - MediaPipe FaceMesh in this process (default)
+    'process'  - FaceMesh in a worker process (see face_mesh_process)
+    'tasks'    - asynchronous Tasks FaceLandmarker (see face_landmarker_stream)
+    'scripted' - deterministic synthetic face for tests and load testing
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+from landmarks import (
+    LandmarkFrame, NUM_LANDMARKS, NUM_FACE_LANDMARKS, NOSE_TIP, EAR_INDICES, IRIS_INDICES,
+    UPPER_LID_INDICES, LOWER_LID_INDICES
+)
+from pipeline_profiler import PipelineProfiler
+
+
+class LandmarkBackend:
+    """
+    Base class for landmark backends.
+
+    process() returns a LandmarkFrame with coordinates normalized to the
+    frame (or crop) it was given, or None if there is no face.
+    """
+
+    # Backend can run on a crop around the last face (EyeTracker's ROI)
+    supports_roi = False
+
+    def __init__(self, settings, profiler=None):
+        """
+        Initialize the backend (resources are acquired by start()).
+
+        Args:
+            settings: Model settings (see EyeTracker.MODEL_PROFILES)
+            profiler: PipelineProfiler for backend-internal stages
+        """
+        self.settings = dict(settings)
+        self.profiler = profiler or PipelineProfiler()
+
+    def start(self):
+        """
+        Load the model.
+
+        Returns:
+            bool: True if the backend is ready, False otherwise
+        """
+        return True
+
+    def configure(self, settings):
+        """
+        Apply new model settings.
+
+        Args:
+            settings: Model settings (see EyeTracker.MODEL_PROFILES)
+        """
+        self.settings = dict(settings)
+
+    def process(self, frame, timestamp=None):
+        """
+        Find the face landmarks in a frame.
+
+        Args:
+            frame: OpenCV frame or crop (BGR format)
+            timestamp: Capture timestamp of the frame (seconds)
+
+        Returns:
+            LandmarkFrame: Landmarks or None. Asynchronous backends may return
+                           the result of an earlier frame (see its timestamp).
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release the backend's resources."""
+
+
+class SolutionBackend(LandmarkBackend):
+    """Synchronous MediaPipe FaceMesh (mp.solutions.face_mesh)."""
+
+    supports_roi = True
+
+    def __init__(self, settings, profiler=None):
+        super().__init__(settings, profiler)
+        # FaceMesh can be swapped at runtime, so inference holds this lock
+        self._lock = threading.Lock()
+        self.face_mesh = None
+
+    def start(self):
+        import mediapipe as mp
+        self.face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, **self.settings)
+        return True
+
+    def configure(self, settings):
+        """
+        Build the new model before swapping it in, so a running tracking
+        loop only waits for the swap itself.
+        """
+        import mediapipe as mp
+        face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, **settings)
+
+        with self._lock:
+            old_face_mesh = self.face_mesh
+            self.face_mesh = face_mesh
+            self.settings = dict(settings)
+
+        if old_face_mesh is not None:
+            old_face_mesh.close()
+
+    def process(self, frame, timestamp=None):
+        # Convert BGR to RGB
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.profiler.lap('cvtColor')
+
+        # Process frame
+        with self._lock:
+            results = self.face_mesh.process(rgb_frame)
+
+        if not results.multi_face_landmarks:
+            return None
+
+        # Convert the landmark list to a NumPy array once per frame
+        return LandmarkFrame.from_landmark_list(results.multi_face_landmarks[0], timestamp)
+
+    def close(self):
+        with self._lock:
+            if self.face_mesh is not None:
+                self.face_mesh.close()
+                self.face_mesh = None
+
+
+class ProcessBackend(LandmarkBackend):
+    """FaceMesh in a worker process, frames passed through shared memory."""
+
+    supports_roi = True
+
+    def __init__(self, settings, profiler=None):
+        from face_mesh_process import FaceMeshProcess
+        super().__init__(settings, profiler)
+        self.worker = FaceMeshProcess(settings)
+
+    def start(self):
+        return self.worker.start()
+
+    def configure(self, settings):
+        super().configure(settings)
+        self.worker.configure(settings)
+
+    def process(self, frame, timestamp=None):
+        # Color conversion and inference happen in the worker
+        result = self.worker.process(frame)
+        if result is None:
+            return None
+        points, count = result
+        return LandmarkFrame(points, count, timestamp)
+
+    def close(self):
+        self.worker.close()
+
+
+class TasksBackend(LandmarkBackend):
+    """
+    Asynchronous Tasks FaceLandmarker in live-stream mode.
+
+    process() submits the frame and returns the newest finished result, which
+    usually belongs to an earlier frame. Until a newer result arrives the
+    previous one is served again, so None always means the landmarker found
+    no face. The landmarker tracks the face itself, so ROI cropping is not
+    supported.
+    """
+
+    def __init__(self, settings, profiler=None, model_path=None):
+        from face_landmarker_stream import FaceLandmarkerStream, DEFAULT_MODEL_PATH, NO_RESULT
+        super().__init__(settings, profiler)
+        self.stream = FaceLandmarkerStream(settings, model_path or DEFAULT_MODEL_PATH)
+        self._no_result = NO_RESULT
+        self._last_result = None
+
+    def start(self):
+        return self.stream.start()
+
+    def configure(self, settings):
+        super().configure(settings)
+        self.stream.configure(settings)
+
+    def process(self, frame, timestamp=None):
+        self.stream.submit(frame, timestamp)
+        result = self.stream.take_result()
+        if result is not self._no_result:
+            self._last_result = result
+        return self._last_result
+
+    def close(self):
+        self.stream.close()
+
+
+class ScriptedBackend(LandmarkBackend):
+    """
+    Deterministic synthetic face, no model and no image needed.
+
+    The head sweeps in a figure eight, the irises follow the sweep inside the
+    eyes, both eyes close at the scripted blink times and the face can be
+    absent during scripted intervals. The same time always produces the same
+    landmarks, and a frame costs a few microseconds, so everything downstream
+    of inference can be driven at thousands of frames per second.
+    """
+
+    def __init__(self, settings=None, profiler=None, blinks=(), blink_duration=0.15,
+                 absent=(), sweep_period=4.0, sweep_amplitude=(0.12, 0.08), fps=30.0,
+                 iris=True, noise=0.0, seed=0):
+        """
+        Initialize the scripted face.
+
+        Args:
+            settings: Ignored (accepted for interface compatibility)
+            profiler: PipelineProfiler (unused)
+            blinks: Times (seconds from the first frame) at which a blink starts
+            blink_duration: Seconds the eyes stay closed per blink
+            absent: (start, end) intervals in which no face is reported
+            sweep_period: Seconds per head sweep cycle
+            sweep_amplitude: (x, y) sweep amplitude in normalized coordinates
+            fps: Frame rate assumed when process() gets no timestamp
+            iris: If True, emit the 10 iris landmarks (478 instead of 468)
+            noise: Std-dev of per-frame landmark jitter (deterministic per frame)
+            seed: Seed for the face template and the jitter
+        """
+        super().__init__(settings or {}, profiler)
+        self.blinks = sorted(blinks)
+        self.blink_duration = blink_duration
+        self.absent = list(absent)
+        self.sweep_period = sweep_period
+        self.sweep_amplitude = np.asarray(sweep_amplitude, dtype=np.float32)
+        self.fps = fps
+        self.iris = iris
+        self.noise = noise
+        self.seed = seed
+
+        self._start_time = None
+        self._frame_index = 0
+        self._template = self._build_template(np.random.default_rng(seed))
+
+    def configure(self, settings):
+        super().configure(settings)
+
+    def reset(self):
+        """Restart the script at t = 0."""
+        self._start_time = None
+        self._frame_index = 0
+
+    def process(self, frame=None, timestamp=None):
+        if timestamp is None:
+            timestamp = self._frame_index / self.fps
+        if self._start_time is None:
+            self._start_time = timestamp
+        self._frame_index += 1
+
+        return self.landmarks_at(timestamp - self._start_time, timestamp)
+
+    def landmarks_at(self, t, timestamp=None):
+        """
+        Get the scripted landmarks at a point in the script.
+
+        Args:
+            t: Seconds since the start of the script
+            timestamp: Timestamp to attach (defaults to t)
+
+        Returns:
+            LandmarkFrame: Landmarks or None while the face is absent
+        """
+        if any(start <= t < end for start, end in self.absent):
+            return None
+
+        phase = 2.0 * np.pi * t / self.sweep_period
+        sweep = np.array([np.sin(phase), np.sin(2.0 * phase)], dtype=np.float32)
+        offset = self.sweep_amplitude * sweep
+
+        points = self._template.copy()
+        points[:, :2] += offset
+        if self.noise:
+            rng = np.random.default_rng((self.seed, int(round(t * 1000))))
+            points[:, :2] += rng.normal(0.0, self.noise, (NUM_LANDMARKS, 2)).astype(np.float32)
+
+        if self.is_blinking(t):
+            for eye in range(2):
+                center = self._eye_centers[eye] + offset
+                self._place_eye(points, eye, center, 0.05)
+
+        # Irises look along the sweep direction
+        points[IRIS_INDICES, :2] += (0.4 * self._eye_half_size * sweep)[None, None, :]
+
+        count = NUM_LANDMARKS
+        if not self.iris:
+            points[NUM_FACE_LANDMARKS:] = np.nan
+            count = NUM_FACE_LANDMARKS
+        return LandmarkFrame(points, count, timestamp if timestamp is not None else t)
+
+    def is_blinking(self, t):
+        """
+        Check whether the script has the eyes closed at time t.
+
+        Args:
+            t: Seconds since the start of the script
+
+        Returns:
+            bool: True during a scripted blink
+        """
+        return any(start <= t < start + self.blink_duration for start in self.blinks)
+
+    def _build_template(self, rng):
+        """Create the neutral face: random points inside a face box plus eye geometry."""
+        points = np.empty((NUM_LANDMARKS, 3), dtype=np.float32)
+        points[:, :2] = rng.uniform(0.38, 0.62, (NUM_LANDMARKS, 2))
+        points[:, 2] = rng.normal(0.0, 0.02, NUM_LANDMARKS)
+        points[NOSE_TIP, :2] = (0.5, 0.55)
+
+        self._eye_half_size = np.array([0.03, 0.01], dtype=np.float32)
+        self._eye_centers = np.array([[0.44, 0.45], [0.56, 0.45]], dtype=np.float32)
+        for eye in range(2):
+            self._place_eye(points, eye, self._eye_centers[eye], 1.0)
+            points[IRIS_INDICES[eye], :2] = self._eye_centers[eye] + rng.normal(0.0, 0.001, (5, 2))
+        return points
+
+    def _place_eye(self, points, eye, center, openness):
+        """Write the lid and EAR contour points of one eye."""
+        half_width, half_height = self._eye_half_size
+        half_height *= openness
+        points[UPPER_LID_INDICES[eye], :2] = center + (0.0, -half_height)
+        points[LOWER_LID_INDICES[eye], :2] = center + (0.0, half_height)
+        # EAR points p1..p6: corner, upper, upper, corner, lower, lower
+        shape = np.array([
+            [-1.0, 0.0], [-0.4, -1.0], [0.4, -1.0],
+            [1.0, 0.0], [0.4, 1.0], [-0.4, 1.0],
+        ], dtype=np.float32) * (half_width, half_height)
+        points[EAR_INDICES[eye], :2] = center + shape
+
+
+BACKENDS = {
+    'solution': SolutionBackend,
+    'process': ProcessBackend,
+    'tasks': TasksBackend,
+    'scripted': ScriptedBackend,
+}
+
+
+def create_backend(spec, settings, profiler=None, **options):
+    """
+    Create a landmark backend.
+
+    Args:
+        spec: Backend name (see BACKENDS) or a LandmarkBackend instance
+        settings: Model settings (see EyeTracker.MODEL_PROFILES)
+        profiler: PipelineProfiler for backend-internal stages
+        **options: Backend-specific keyword arguments (e.g. model_path for 'tasks')
+
+    Returns:
+        LandmarkBackend: The (not yet started) backend
+    """
+    if isinstance(spec, LandmarkBackend):
+        return spec
+    if spec not in BACKENDS:
+        raise ValueError(f"Unknown landmark backend: {spec}")
+    return BACKENDS[spec](settings, profiler, **options)
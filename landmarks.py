@@ -0,0 +1,113 @@
+"""
+Landmark Frame Module
+Holds one frame of face landmarks as a single contiguous NumPy array.
+The MediaPipe landmark list is converted once per frame and then shared by
+gaze, head, blink and overlay code through vectorized fancy indexing.
+"""
+
+import numpy as np
+
+# FaceMesh produces 468 landmarks, 478 with iris refinement
+NUM_LANDMARKS = 478
+NUM_FACE_LANDMARKS = 468
+
+# Nose tip landmark for head tracking
+NOSE_TIP = 1
+
+# Eye contour points for EAR, ordered p1..p6: [[left eye], [right eye]]
+LEFT_EYE_INDICES = np.array([33, 160, 158, 133, 153, 144])
+RIGHT_EYE_INDICES = np.array([362, 385, 387, 263, 373, 380])
+EAR_INDICES = np.stack([LEFT_EYE_INDICES, RIGHT_EYE_INDICES])
+
+# Iris points: [[left iris], [right iris]]
+LEFT_IRIS_INDICES = np.array([468, 469, 470, 471, 472])
+RIGHT_IRIS_INDICES = np.array([473, 474, 475, 476, 477])
+IRIS_INDICES = np.stack([LEFT_IRIS_INDICES, RIGHT_IRIS_INDICES])
+
+# Eye boundaries used for gaze ratios: [[left eye], [right eye]]
+EYE_INNER_CORNER = np.array([133, 362])  # Closest to nose
+EYE_OUTER_CORNER = np.array([33, 263])   # Away from nose
+UPPER_LID_INDICES = np.array([[159, 160, 161], [386, 385, 387]])
+LOWER_LID_INDICES = np.array([[145, 144, 153], [374, 373, 380]])
+
+
+class LandmarkFrame:
+    """Face landmarks of one frame as a (478, 3) float32 array."""
+
+    __slots__ = ('points', 'count', 'timestamp', 'frame_shape')
+
+    def __init__(self, points, count=None, timestamp=None, frame_shape=None):
+        """
+        Initialize a landmark frame.
+
+        Args:
+            points: (478, 3) float32 array of normalized (x, y, z) landmarks
+            count: Number of valid landmarks (468 without iris refinement)
+            timestamp: Capture timestamp of the source frame (seconds)
+            frame_shape: Shape of the source frame (height, width, channels)
+        """
+        self.points = points
+        self.count = len(points) if count is None else count
+        self.timestamp = timestamp
+        self.frame_shape = frame_shape
+
+    @classmethod
+    def from_landmark_list(cls, face_landmarks, timestamp=None, frame_shape=None):
+        """
+        Convert a MediaPipe NormalizedLandmarkList in a single pass.
+
+        Args:
+            face_landmarks: MediaPipe face landmarks (or any object with a
+                            .landmark sequence of x/y/z attributes), or the
+                            plain landmark list of a Tasks FaceLandmarker result
+            timestamp: Capture timestamp of the source frame
+            frame_shape: Shape of the source frame
+
+        Returns:
+            LandmarkFrame: Frame with missing (iris) rows filled with NaN
+        """
+        landmark_list = getattr(face_landmarks, 'landmark', face_landmarks)
+        count = min(len(landmark_list), NUM_LANDMARKS)
+
+        points = np.full((NUM_LANDMARKS, 3), np.nan, dtype=np.float32)
+        points[:count] = np.fromiter(
+            (v for lm in landmark_list[:count] for v in (lm.x, lm.y, lm.z)),
+            dtype=np.float32, count=count * 3
+        ).reshape(count, 3)
+
+        return cls(points, count, timestamp, frame_shape)
+
+    @property
+    def has_iris(self):
+        """bool: True if the iris landmarks (468-477) are present."""
+        return self.count >= NUM_LANDMARKS
+
+    def pixel_points(self, indices, frame_shape=None):
+        """
+        Get (x, y) pixel coordinates for a set of landmark indices.
+
+        Args:
+            indices: Index array of any shape
+            frame_shape: Frame shape to scale by (defaults to the source frame)
+
+        Returns:
+            np.ndarray: Array of shape indices.shape + (2,)
+        """
+        h, w = (frame_shape or self.frame_shape)[:2]
+        return self.points[indices, :2] * np.array([w, h], dtype=np.float32)
+
+
+def as_landmark_frame(face_landmarks, frame_shape=None):
+    """
+    Return face_landmarks as a LandmarkFrame, converting it if necessary.
+
+    Args:
+        face_landmarks: LandmarkFrame or MediaPipe face landmarks
+        frame_shape: Shape of the source frame (used when converting)
+
+    Returns:
+        LandmarkFrame: The landmark frame or None if face_landmarks is None
+    """
+    if face_landmarks is None or isinstance(face_landmarks, LandmarkFrame):
+        return face_landmarks
+    return LandmarkFrame.from_landmark_list(face_landmarks, frame_shape=frame_shape)
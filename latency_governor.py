@@ -0,0 +1,124 @@
+"""
+Latency Governor Module
+Keeps the per-frame processing time under a latency budget.
+The governor walks a ladder of quality levels: when the smoothed frame time
+exceeds the target it steps down (lower preview rate, then inference on
+every Nth frame with optical flow in between, then a lower camera
+resolution), and when there is enough headroom it steps back up. A hold time
+between changes keeps it from oscillating.
+"""
+
+import time
+
+# Quality ladder, best first. None = the application's own setting.
+LEVELS = (
+    {'name': 'Full quality', 'preview_rate': None, 'flow_interval': 1, 'resolution': None},
+    {'name': 'Reduced preview', 'preview_rate': 5, 'flow_interval': 1, 'resolution': None},
+    {'name': 'Inference every 2nd frame', 'preview_rate': 5, 'flow_interval': 2, 'resolution': None},
+    {'name': 'Reduced resolution', 'preview_rate': 5, 'flow_interval': 2, 'resolution': (480, 360)},
+    {'name': 'Minimum', 'preview_rate': 2, 'flow_interval': 3, 'resolution': (320, 240)},
+)
+
+
+class LatencyGovernor:
+    """Chooses a quality level from the measured frame processing time."""
+
+    def __init__(self, target_ms=25.0, headroom=0.6, hold_time=2.0, smoothing=0.1, levels=LEVELS):
+        """
+        Initialize the governor.
+
+        Args:
+            target_ms: Per-frame processing time budget (milliseconds)
+            headroom: Step up only below target_ms * headroom
+            hold_time: Minimum seconds between level changes
+            smoothing: EMA weight of the newest frame time (0-1)
+            levels: Quality ladder, best level first
+        """
+        self.target_ms = target_ms
+        self.headroom = headroom
+        self.hold_time = hold_time
+        self.smoothing = smoothing
+        self.levels = levels
+        self.reset()
+
+    def reset(self, now=None):
+        """
+        Return to the best level (e.g. when tracking starts).
+
+        Args:
+            now: Current time (time.monotonic), defaults to now
+        """
+        self.level = 0
+        self.reason = "Starting at full quality"
+        self.frame_ms = None  # Smoothed processing time
+        self._last_change = time.monotonic() if now is None else now
+        self.level_changes = 0
+
+    def get_level(self):
+        """
+        Get the settings of the current level.
+
+        Returns:
+            dict: name, preview_rate, flow_interval and resolution
+        """
+        return self.levels[self.level]
+
+    def update(self, frame_time, now=None):
+        """
+        Feed the processing time of one frame.
+
+        Args:
+            frame_time: Seconds spent processing the frame
+            now: Current time (time.monotonic), defaults to now
+
+        Returns:
+            dict: The new level's settings if the level changed, else None
+        """
+        now = time.monotonic() if now is None else now
+        frame_ms = frame_time * 1000.0
+        if self.frame_ms is None:
+            self.frame_ms = frame_ms
+        else:
+            self.frame_ms += self.smoothing * (frame_ms - self.frame_ms)
+
+        if now - self._last_change < self.hold_time:
+            return None
+
+        if self.frame_ms > self.target_ms and self.level < len(self.levels) - 1:
+            self.level += 1
+            self.reason = f"Frame time {self.frame_ms:.1f} ms over the {self.target_ms:.0f} ms target"
+        elif self.frame_ms < self.target_ms * self.headroom and self.level > 0:
+            self.level -= 1
+            self.reason = f"Headroom: frame time {self.frame_ms:.1f} ms"
+        else:
+            return None
+
+        self._last_change = now
+        self.level_changes += 1
+        print(f"Latency governor: {self.levels[self.level]['name']} ({self.reason})")
+        return self.get_level()
+
+    def get_status(self):
+        """
+        Get the current level and why it was chosen.
+
+        Returns:
+            dict: level, name, reason, frame_ms, target_ms and level_changes
+        """
+        return {
+            'level': self.level,
+            'name': self.levels[self.level]['name'],
+            'reason': self.reason,
+            'frame_ms': self.frame_ms,
+            'target_ms': self.target_ms,
+            'level_changes': self.level_changes,
+        }
+
+    def format_status(self):
+        """
+        Format the status for the GUI.
+
+        Returns:
+            str: e.g. "Reduced preview (Frame time 31.2 ms over the 25 ms target)"
+        """
+        return f"{self.levels[self.level]['name']} ({self.reason})"
@@ -10,40 +10,116 @@ Now includes GAZE TRACKING with calibration for high-accuracy cursor control.
 import cv2
 import threading
 import time
+from camera_capture import ThreadedCapture
+from presence_scheduler import PresenceScheduler
+from latency_governor import LatencyGovernor
 from eye_tracker import EyeTracker
 from mouse_controller import MouseController
 from blink_detector import BlinkDetector
 from calibration import GazeCalibrator
+from pipeline_profiler import PipelineProfiler
+from preview import PreviewWindow
+from session_recorder import SessionRecorder
 from ui import EyeMouseGUI
-from voice_assistant import VoiceAssistant
 
 class EyeMouseApp:
     """Main application controller that integrates all modules."""
     
-    def __init__(self):
-        """Initialize all components of the application."""
+    def __init__(self, headless=False, preview_rate=10, source=0, realtime=True, record_path=None,
+                 profile=False, profile_path=None, profile_interval=10.0, profiler=None,
+                 mouse_controller=None, gui_factory=EyeMouseGUI, enable_voice=True,
+                 isolate_inference=False, landmark_backend='solution', task_model_path=None,
+                 motion_gate=False, flow_interval=1, idle_after=10.0, idle_rate=2.0,
+                 idle_scale=1.0, latency_target=None, cursor_backend='pyautogui', drop_frames=None):
+        """
+        Initialize all components of the application.
+        
+        Args:
+            headless: If True, skip all drawing and camera preview windows
+            preview_rate: Camera preview refresh rate (Hz) when not headless
+            source: Camera index, video file or image directory to read frames from
+            realtime: Replay recorded sources at their original speed
+                      (False = as fast as possible)
+            drop_frames: Skip frames the pipeline can't keep up with (default:
+                         only for live cameras; replays deliver every frame)
+            record_path: If set, record tracking sessions to this file
+            profile: If True, collect per-stage latency statistics
+            profile_path: Periodically export the statistics to this .json/.csv file
+            profile_interval: Seconds between exports to profile_path
+            profiler: Pre-built PipelineProfiler (overrides the profile* arguments)
+            mouse_controller: Pre-built MouseController (e.g. with a null output)
+            gui_factory: Called with the GUI callbacks to create the GUI
+            enable_voice: If False, don't start the voice assistant
+            isolate_inference: Run FaceMesh in a separate worker process
+            landmark_backend: Landmark backend name or instance (see landmark_backends)
+            task_model_path: face_landmarker.task model for the 'tasks' backend
+            motion_gate: Reuse landmarks instead of running inference on static frames
+            flow_interval: Run inference every N frames, optical flow in between
+            idle_after: Seconds without a face before dropping to the idle rate
+                        (None = never go idle)
+            idle_rate: Face detection checks per second while idle
+            idle_scale: Frame scale for detection while idle (1.0 = full resolution)
+            latency_target: Per-frame processing budget (ms); if set, preview rate,
+                            inference rate and camera resolution are lowered when
+                            the pipeline falls behind (None = fixed quality)
+            cursor_backend: Cursor output backend (see cursor_backends), used
+                            unless mouse_controller is given
+        """
+        # Per-stage latency instrumentation (near-free while disabled)
+        self.profiler = profiler or PipelineProfiler(enabled=profile, export_path=profile_path,
+                                                     export_interval=profile_interval)
+        
         # Initialize with HEAD TRACKING (more reliable, no NaN issues)
-        self.eye_tracker = EyeTracker(use_head_tracking=True)
-        self.mouse_controller = MouseController()
+        self.eye_tracker = EyeTracker(use_head_tracking=True, profiler=self.profiler,
+                                      isolate_inference=isolate_inference,
+                                      backend=landmark_backend, task_model_path=task_model_path,
+                                      motion_gate=motion_gate, flow_interval=flow_interval)
+        self.mouse_controller = mouse_controller or MouseController(backend=cursor_backend)
+        # Frame-in to cursor-command latency, measured by the cursor output thread
+        self.mouse_controller.set_latency_callback(
+            lambda latency: self.profiler.record('frame_to_cursor', latency))
         self.blink_detector = BlinkDetector()
         self.calibrator = GazeCalibrator(self.blink_detector)
         
         # Initialize voice assistant
-        try:
-            self.voice_assistant = VoiceAssistant()
-            voice_available = True
-            print("Voice Assistant: Initialized successfully")
-        except Exception as e:
-            self.voice_assistant = None
-            voice_available = False
-            print(f"Voice Assistant: Not available ({e})")
+        self.voice_assistant = None
+        voice_available = False
+        if enable_voice:
+            try:
+                from voice_assistant import VoiceAssistant
+                self.voice_assistant = VoiceAssistant()
+                voice_available = True
+                print("Voice Assistant: Initialized successfully")
+            except Exception as e:
+                print(f"Voice Assistant: Not available ({e})")
         
         self.is_tracking = False
-        self.cap = None
+        self.source = source
+        self.realtime = realtime
+        self.drop_frames = drop_frames
+        self.capture = None  # ThreadedCapture shared by calibration and tracking
         self.tracking_thread = None
         
+        # Low-power detection while nobody is in front of the camera
+        self.presence = PresenceScheduler(idle_after=idle_after or 0.0, idle_rate=idle_rate,
+                                          idle_scale=idle_scale, enabled=idle_after is not None)
+        
+        # Quality levels traded for latency (None = fixed quality)
+        self.governor = LatencyGovernor(target_ms=latency_target) if latency_target else None
+        self.flow_interval = flow_interval
+        self.preview_rate = preview_rate
+        self._resolution = None  # Resolution requested by the governor (None = camera default)
+        
+        # Camera preview runs on its own thread at a reduced rate
+        self.headless = headless
+        self.preview = None if headless else PreviewWindow(self.eye_tracker, rate=preview_rate,
+                                                           profiler=self.profiler)
+        
+        # Optional session recording (written on a background thread)
+        self.recorder = SessionRecorder(record_path) if record_path else None
+        
         # Create GUI and pass control methods
-        self.gui = EyeMouseGUI(
+        self.gui = gui_factory(
             start_callback=self.start_tracking,
             pause_callback=self.pause_tracking,
             exit_callback=self.exit_app,
@@ -60,15 +136,13 @@ class EyeMouseApp:
         print("="*60)
         
         # Initialize camera for calibration
-        if not self.cap or not self.cap.isOpened():
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                self.gui.update_status("Error: Camera not found!", "red")
-                self.gui.update_calibration_status(False)
-                return
+        if not self._open_camera():
+            self.gui.update_status("Error: Camera not found!", "red")
+            self.gui.update_calibration_status(False)
+            return
         
         # Run calibration
-        success = self.calibrator.start_calibration(self.cap, self.eye_tracker)
+        success = self.calibrator.start_calibration(self.capture, self.eye_tracker)
         
         if success:
             # Load calibration data into mouse controller
@@ -100,16 +174,25 @@ class EyeMouseApp:
             return
         
         # Initialize camera
-        if not self.cap or not self.cap.isOpened():
-            self.cap = cv2.VideoCapture(0)
-        
-        if not self.cap.isOpened():
+        if not self._open_camera():
             self.gui.update_status("Error: Camera not found!", "red")
             return
         
+        # Frames buffered during calibration/pause are stale now
+        self.capture.drop_stale()
+        
         self.is_tracking = True
+        self.presence.reset()
+        if self.governor:
+            self.governor.reset()
+            self._apply_quality_level(self.governor.get_level())
         self.gui.update_status("Tracking Active", "green")
         
+        if self.preview:
+            self.preview.start()
+        if self.recorder:
+            self.recorder.start()
+        
         # Start tracking in a separate thread
         self.tracking_thread = threading.Thread(target=self._tracking_loop, daemon=True)
         self.tracking_thread.start()
@@ -123,111 +206,267 @@ class EyeMouseApp:
         self.gui.update_status("Paused", "orange")
         
         # Release camera
-        if self.cap:
-            self.cap.release()
-            cv2.destroyAllWindows()
+        if self.capture:
+            self.capture.release()
+        if self.preview:
+            self.preview.stop()
+        if self.recorder:
+            self.recorder.stop()
+        self._report_pipeline_stats()
     
     def exit_app(self):
         """Exit the application."""
         self.is_tracking = False
-        if self.cap:
-            self.cap.release()
-        cv2.destroyAllWindows()
+        if self.capture:
+            self.capture.release()
+        if self.preview:
+            self.preview.stop()
+        if self.recorder:
+            self.recorder.stop()
+        self._report_pipeline_stats()
+        if not self.headless:
+            cv2.destroyAllWindows()
+        self.mouse_controller.shutdown()
+        self.eye_tracker.release()
         self.gui.destroy()
     
+    def _open_camera(self):
+        """
+        Start the shared capture thread if it is not already running.
+        
+        Returns:
+            bool: True if the camera is capturing, False otherwise
+        """
+        if self.capture and self.capture.isOpened():
+            return True
+        
+        self.capture = ThreadedCapture(self.source, realtime=self.realtime, drop_frames=self.drop_frames)
+        self._resolution = None
+        return self.capture.start()
+    
+    def _apply_quality_level(self, level):
+        """
+        Apply a latency governor level on top of the configured settings.
+        
+        Args:
+            level: Level settings (see latency_governor.LEVELS)
+        """
+        if self.preview:
+            rate = level['preview_rate']
+            self.preview.set_rate(self.preview_rate if rate is None else min(rate, self.preview_rate))
+        
+        flow_interval = max(self.flow_interval, level['flow_interval'])
+        if flow_interval != self.eye_tracker.flow_interval:
+            self.eye_tracker.set_flow_interval(flow_interval)
+        
+        # Replayed sources can't change resolution - only the other steps apply
+        if level['resolution'] != self._resolution and self.capture:
+            if self.capture.set_resolution(level['resolution']):
+                self._resolution = level['resolution']
+        
+        color = 'gray' if self.governor.level == 0 else 'orange'
+        self.gui.update_performance_status(f"Performance: {self.governor.format_status()}", color)
+    
+    def get_pipeline_stats(self):
+        """
+        Get the latency statistics of the tracking pipeline.
+        
+        Returns:
+            dict: Per-stage p50/p95/p99 (ms), FPS, dropped frames, capture and
+                  inference (inferred vs reused frames) counters and time spent
+                  active vs idle
+        """
+        stats = self.profiler.get_stats()
+        stats['inference'] = self.eye_tracker.get_inference_stats()
+        stats['presence'] = self.presence.get_stats()
+        stats['blink_threshold'] = self.blink_detector.get_threshold_estimate()
+        if self.governor:
+            stats['governor'] = self.governor.get_status()
+        if self.capture:
+            stats['capture'] = self.capture.get_stats()
+        return stats
+    
+    def set_profiling(self, enabled):
+        """
+        Turn per-stage latency collection on or off at runtime.
+        
+        Args:
+            enabled: True to collect statistics
+        """
+        self.profiler.set_enabled(enabled)
+    
+    def _report_pipeline_stats(self):
+        """Print (and export) the collected statistics, if profiling."""
+        presence = self.presence.get_stats()
+        if presence['idle_entries']:
+            print(f"Presence: active {presence['active_s']:.0f}s, idle {presence['idle_s']:.0f}s "
+                  f"({presence['idle_fraction']:.0%} in low-power mode)")
+        if not self.profiler.enabled or not self.profiler.frames:
+            return
+        print(self.profiler.format_summary())
+        if self.profiler.export_path:
+            self.profiler.export(self.profiler.export_path)
+    
     def _tracking_loop(self):
         """Main tracking loop that runs in a separate thread."""
+        last_sequence = None
+        profiler = self.profiler
+        presence = self.presence
+        governor = self.governor
+        frame_shape = None
+        
         try:
             while self.is_tracking:
-                ret, frame = self.cap.read()
-                if not ret:
-                    self.gui.update_status("Error: Cannot read from camera", "red")
-                    break
+                # Nobody there - wait for the next low-rate presence check
+                wait = presence.time_until_check()
+                if wait > 0:
+                    time.sleep(min(wait, 0.1))
+                    continue
+                
+                profiler.begin_frame()
+                
+                # Always take the newest frame; older ones are skipped
+                captured = self.capture.read(after_sequence=last_sequence)
+                if captured is None:
+                    if not self.capture.isOpened():
+                        if self.capture.is_finished():
+                            self.gui.update_status("Replay finished", "blue")
+                        elif self.is_tracking:
+                            self.gui.update_status("Error: Cannot read from camera", "red")
+                        break
+                    continue
+                # Frames skipped on purpose while idle don't count as dropped
+                dropped = 0
+                if last_sequence is not None and not presence.is_idle():
+                    dropped = captured.sequence - last_sequence - 1
+                last_sequence = captured.sequence
+                process_start = time.monotonic()
+                profiler.lap('capture_wait')
+                if profiler.enabled:
+                    profiler.record('frame_age', time.monotonic() - captured.arrival)
                 
                 # Flip frame horizontally for mirror effect
-                frame = cv2.flip(frame, 1)
+                frame = cv2.flip(captured.frame, 1)
+                profiler.lap('flip')
+                
+                # Process frame with eye tracker (landmarks is a LandmarkFrame).
+                # Drawing happens on the preview thread, never here.
+                idle = presence.is_idle()
+                frame = presence.prepare_frame(frame)
+                if frame.shape != frame_shape:
+                    # Resolution changed - drop the ROI/flow state of the old size
+                    if frame_shape is not None:
+                        self.eye_tracker.reset_tracking_state()
+                    frame_shape = frame.shape
+                frame, landmarks = self.eye_tracker.process_frame(frame, captured.timestamp, draw=False)
                 
-                # Process frame with eye tracker
-                frame, landmarks = self.eye_tracker.process_frame(frame)
+                if presence.update(landmarks is not None):
+                    if idle:
+                        self.gui.update_status("Tracking Active", "green")
+                    else:
+                        self.gui.update_status("Idle - no face detected", "blue")
+                if idle and presence.idle_scale < 1.0:
+                    # Downscaled presence check - track from the next full frame
+                    landmarks = None
+                
+                # Text for the preview overlay (None in headless mode)
+                overlay = [] if self.preview else None
+                gaze_ratio = None
+                blink_result = None
                 
                 if landmarks:
                     # Get gaze position (relative position within eye socket)
                     gaze_ratio = self.eye_tracker.get_eye_position(landmarks, frame.shape)
+                    profiler.lap('gaze')
                     
                     if gaze_ratio:
                         # Move mouse cursor using calibrated gaze tracking
-                        self.mouse_controller.move_cursor(gaze_ratio)
+                        self.mouse_controller.move_cursor(gaze_ratio, captured.arrival)
+                        profiler.lap('cursor')
                         
                         # Display gaze info on frame
-                        cv2.putText(frame, f"Gaze: ({gaze_ratio[0]:.2f}, {gaze_ratio[1]:.2f})", 
-                                    (10, frame.shape[0] - 40), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+                        if overlay is not None:
+                            overlay.append((f"Gaze: ({gaze_ratio[0]:.2f}, {gaze_ratio[1]:.2f})",
+                                            (10, frame.shape[0] - 40), 0.6, (255, 255, 0)))
                     
                     # Detect blink patterns and perform actions
+                    # Timed by the landmarks' own source frame (asynchronous backends lag)
                     blink_result = self.blink_detector.detect_blink(landmarks, frame.shape)
+                    profiler.lap('blink')
+                    action_label = None
                     
                     # Handle different actions based on blink patterns
                     if blink_result['left_click']:
                         self.mouse_controller.left_click()
-                        cv2.putText(frame, "3 BLINKS - LEFT CLICK", (30, 50), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                        action_label = ("3 BLINKS - LEFT CLICK", (0, 255, 0))
                     
                     elif blink_result['right_click']:
                         self.mouse_controller.right_click()
-                        cv2.putText(frame, "2 BLINKS - RIGHT CLICK", (30, 50), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                        action_label = ("2 BLINKS - RIGHT CLICK", (0, 0, 255))
                     
                     elif blink_result['drag_toggle']:
                         if self.mouse_controller.is_drag_active():
                             self.mouse_controller.end_drag()
-                            cv2.putText(frame, "4 BLINKS - DROP", (30, 50), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 165, 0), 2)
+                            action_label = ("4 BLINKS - DROP", (255, 165, 0))
                         else:
                             self.mouse_controller.start_drag()
-                            cv2.putText(frame, "4 BLINKS - START DRAG", (30, 50), 
-                                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 165, 0), 2)
+                            action_label = ("4 BLINKS - START DRAG", (255, 165, 0))
                     
                     elif blink_result['middle_click']:
                         self.mouse_controller.middle_click()
-                        cv2.putText(frame, "5 BLINKS - MIDDLE CLICK", (30, 50), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 255), 2)
+                        action_label = ("5 BLINKS - MIDDLE CLICK", (255, 0, 255))
                     
                     elif blink_result['scroll_up']:
                         self.mouse_controller.scroll_up()
-                        cv2.putText(frame, "SCROLL UP", (30, 50), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+                        action_label = ("SCROLL UP", (0, 255, 255))
                     
                     elif blink_result['scroll_down']:
                         self.mouse_controller.scroll_down()
-                        cv2.putText(frame, "SCROLL DOWN", (30, 50), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+                        action_label = ("SCROLL DOWN", (0, 255, 255))
                     
-                    # Show blink count and drag status
-                    blink_count = len(self.blink_detector.blink_sequence)
-                    if blink_count > 0:
-                        cv2.putText(frame, f"Blinks: {blink_count}", (30, 100), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 0), 2)
+                    profiler.lap('actions')
                     
-                    # Show drag status
-                    if self.mouse_controller.is_drag_active():
-                        cv2.putText(frame, "DRAGGING...", (30, 140), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 165, 0), 2)
+                    if overlay is not None:
+                        if action_label:
+                            overlay.append((action_label[0], (30, 50), 1, action_label[1]))
+                        
+                        # Show blink count and drag status
+                        blink_count = len(self.blink_detector.blink_sequence)
+                        if blink_count > 0:
+                            overlay.append((f"Blinks: {blink_count}", (30, 100), 0.7, (255, 255, 0)))
+                        
+                        # Show drag status
+                        if self.mouse_controller.is_drag_active():
+                            overlay.append(("DRAGGING...", (30, 140), 0.8, (255, 165, 0)))
+                
+                # Hand the frame to the preview thread (renders at preview_rate)
+                if self.preview:
+                    self.preview.submit(frame, landmarks, overlay)
+                    profiler.lap('preview_submit')
+                
+                if self.recorder:
+                    self.recorder.record(captured.timestamp, landmarks, gaze_ratio,
+                                         self.blink_detector.last_ear if landmarks else None,
+                                         blink_result)
+                    profiler.lap('record')
                 
-                # Display frame
-                cv2.imshow('Gaze Tracker - Press Q to hide window', frame)
+                # Trade quality for latency when the frame took too long
+                if governor and not idle:
+                    level = governor.update(time.monotonic() - process_start)
+                    if level is not None:
+                        self._apply_quality_level(level)
                 
-                # Break on 'q' key
-                if cv2.waitKey(1) & 0xFF == ord('q'):
-                    break
+                profiler.end_frame(dropped)
             
         except Exception as e:
             print(f"Error in tracking loop: {e}")
             self.gui.update_status(f"Error: {str(e)}", "red")
         
         finally:
-            if self.cap:
-                self.cap.release()
-            cv2.destroyAllWindows()
+            if self.capture:
+                self.capture.release()
+            if self.preview:
+                self.preview.stop()
     
     def toggle_voice_assistant(self):
         """
@@ -264,6 +503,54 @@ class EyeMouseApp:
 
 
 if __name__ == "__main__":
+    import argparse
+    from landmark_backends import BACKENDS
+    from cursor_backends import BACKENDS as CURSOR_BACKENDS
+    
+    parser = argparse.ArgumentParser(description="AI Head-Controlled Mouse")
+    parser.add_argument('--headless', action='store_true',
+                        help="Don't draw or show the camera preview (kiosk mode)")
+    parser.add_argument('--preview-rate', type=float, default=10,
+                        help="Camera preview refresh rate in Hz (default: 10)")
+    parser.add_argument('--source', default='0',
+                        help="Camera index, video file or image directory (default: 0)")
+    parser.add_argument('--fast-replay', action='store_true',
+                        help="Replay recorded sources as fast as possible")
+    parser.add_argument('--record', metavar='PATH',
+                        help="Record landmarks, gaze, EAR and actions to a session file")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='solution',
+                        help="Landmark backend (default: solution; 'scripted' = synthetic face)")
+    parser.add_argument('--cursor-backend', choices=sorted(CURSOR_BACKENDS), default='pyautogui',
+                        help="Cursor output (default: pyautogui; xtest/uinput = direct on Linux, "
+                             "null = record only)")
+    parser.add_argument('--task-model', metavar='PATH',
+                        help="face_landmarker.task model for --backend tasks")
+    parser.add_argument('--motion-gate', action='store_true',
+                        help="Reuse landmarks instead of running FaceMesh while the face is still")
+    parser.add_argument('--flow-interval', type=int, default=1, metavar='N',
+                        help="Run FaceMesh every N frames and track landmarks with "
+                             "optical flow in between (default: 1 = every frame)")
+    parser.add_argument('--idle-after', type=float, default=10.0, metavar='SECONDS',
+                        help="Seconds without a face before the low-power mode (default: 10)")
+    parser.add_argument('--idle-rate', type=float, default=2.0, metavar='HZ',
+                        help="Face detection rate in the low-power mode (default: 2)")
+    parser.add_argument('--idle-scale', type=float, default=1.0,
+                        help="Frame scale for detection in the low-power mode (default: 1.0)")
+    parser.add_argument('--no-idle', action='store_true',
+                        help="Always run detection at full rate")
+    parser.add_argument('--latency-target', type=float, metavar='MS',
+                        help="Per-frame processing budget; lowers preview rate, inference "
+                             "rate and camera resolution when exceeded")
+    parser.add_argument('--inference-process', action='store_true',
+                        help="Run FaceMesh in a separate process (frames via shared memory)")
+    parser.add_argument('--profile', action='store_true',
+                        help="Collect per-stage latency statistics (printed on pause/exit)")
+    parser.add_argument('--profile-export', metavar='PATH',
+                        help="Periodically export latency statistics to a .json or .csv file")
+    parser.add_argument('--profile-interval', type=float, default=10.0,
+                        help="Seconds between latency statistics exports (default: 10)")
+    args = parser.parse_args()
+    
     print("Starting AI Head-Controlled Mouse Application...")
     print("=" * 50)
     print("IMPORTANT: This is a HEAD TRACKER (not gaze tracker)")
@@ -273,7 +560,21 @@ if __name__ == "__main__":
     print("=" * 50)
     
     try:
-        app = EyeMouseApp()
+        app = EyeMouseApp(headless=args.headless, preview_rate=args.preview_rate,
+                          source=args.source, realtime=not args.fast_replay,
+                          record_path=args.record,
+                          profile=args.profile or bool(args.profile_export),
+                          profile_path=args.profile_export,
+                          profile_interval=args.profile_interval,
+                          isolate_inference=args.inference_process,
+                          landmark_backend=args.backend,
+                          task_model_path=args.task_model,
+                          motion_gate=args.motion_gate,
+                          flow_interval=args.flow_interval,
+                          idle_after=None if args.no_idle else args.idle_after,
+                          idle_rate=args.idle_rate, idle_scale=args.idle_scale,
+                          latency_target=args.latency_target,
+                          cursor_backend=args.cursor_backend)
         app.run()
     except Exception as e:
         print(f"Fatal error: {e}")
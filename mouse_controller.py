@@ -1,36 +1,54 @@
 """
 Mouse Controller Module
-Handles cursor movement and click actions using pyautogui.
+Handles cursor movement and click actions through a cursor backend
+(pyautogui by default, see cursor_backends).
 Converts eye coordinates to screen coordinates with smoothing.
 """
 
-import pyautogui
+import time
+
 import numpy as np
 from screeninfo import get_monitors
+from cursor_output import CursorOutputWorker
+from cursor_backends import create_cursor_backend
 
 class MouseController:
     """Controls mouse cursor movement and clicks."""
     
-    def __init__(self):
-        """Initialize mouse controller with screen dimensions and settings."""
+    def __init__(self, output_rate=180, screen_size=None, backend='pyautogui'):
+        """
+        Initialize mouse controller with screen dimensions and settings.
+        
+        Args:
+            output_rate: Cursor updates per second of the output thread (Hz)
+            screen_size: (width, height) in pixels; detected if None
+            backend: Cursor backend name or CursorBackend instance
+                     ('pyautogui', 'xtest', 'uinput', 'null')
+        
+        Raises:
+            RuntimeError: Cursor backend not available on this system
+        """
         # Get screen dimensions
-        try:
-            monitor = get_monitors()[0]
-            self.screen_width = monitor.width
-            self.screen_height = monitor.height
-        except:
-            # Fallback to pyautogui's screen size detection
-            self.screen_width, self.screen_height = pyautogui.size()
+        if not screen_size:
+            try:
+                monitor = get_monitors()[0]
+                screen_size = (monitor.width, monitor.height)
+            except:
+                screen_size = None
         
-        print(f"Screen resolution: {self.screen_width}x{self.screen_height}")
+        self.backend = create_cursor_backend(backend, screen_size)
+        print(f"Cursor backend: {type(self.backend).__name__}")
         
-        # PyAutoGUI settings
-        pyautogui.FAILSAFE = True  # Move mouse to corner to abort
-        pyautogui.PAUSE = 0.01  # Small pause between actions
+        # Fallback to the backend's screen size detection
+        screen_size = screen_size or self.backend.screen_size()
+        if not screen_size:
+            raise RuntimeError("Could not determine the screen size")
+        self.screen_width, self.screen_height = screen_size
+        
+        print(f"Screen resolution: {self.screen_width}x{self.screen_height}")
         
         # Movement settings for GAZE TRACKING
-        self.smoothing_factor = 0.5  # Balanced smoothing for responsive gaze tracking
-        self.prev_position = None
+        # (smoothing happens once, in EyeTracker's filter chain)
         
         # Calibration data (loaded from calibrator)
         self.calibration_data = None
@@ -52,6 +70,10 @@ class MouseController:
         
         # Scroll settings
         self.scroll_amount = 3  # Scroll units per action
+        
+        # Cursor motion runs on its own thread so move_cursor never blocks
+        self.output_worker = CursorOutputWorker(self.backend.move_to, output_rate=output_rate)
+        self.output_worker.start()
     
     def load_calibration(self, calibration_data):
         """
@@ -74,7 +96,7 @@ class MouseController:
             print("Warning: No calibration data loaded. Using defaults.")
             self.is_calibrated = False
     
-    def move_cursor(self, gaze_ratio):
+    def move_cursor(self, gaze_ratio, timestamp=None):
         """
         Move cursor based on calibrated gaze position (GAZE TRACKING MODE).
         
@@ -86,6 +108,8 @@ class MouseController:
         Args:
             gaze_ratio: Tuple of (gaze_x_ratio, gaze_y_ratio) from eye tracker
                         where ratios represent relative position within eye socket
+            timestamp: Arrival time (time.monotonic) of the frame, for output
+                       latency measurement (see CapturedFrame.arrival)
         """
         if not gaze_ratio:
             return
@@ -111,28 +135,16 @@ class MouseController:
         target_x = int(screen_x_normalized * self.screen_width)
         target_y = int(screen_y_normalized * self.screen_height)
         
-        # Apply smoothing to compensate for saccades (rapid eye movements)
-        if self.prev_position:
-            prev_x, prev_y = self.prev_position
-            target_x = int(self.smoothing_factor * prev_x + (1 - self.smoothing_factor) * target_x)
-            target_y = int(self.smoothing_factor * prev_y + (1 - self.smoothing_factor) * target_y)
-        
-        self.prev_position = (target_x, target_y)
-        
-        # Move cursor
-        try:
-            pyautogui.moveTo(target_x, target_y, duration=0.05)
-        except Exception as e:
-            print(f"Error moving cursor: {e}")
+        # Hand the target to the output thread (returns immediately)
+        self.output_worker.set_target(target_x, target_y, timestamp)
     
     def left_click(self):
         """Perform a left mouse click with debouncing."""
-        import time
         current_time = time.time()
         
         if current_time - self.last_click_time['left'] > self.click_cooldown:
             try:
-                pyautogui.click()
+                self.backend.click('left')
                 self.last_click_time['left'] = current_time
                 print("Left click performed")
             except Exception as e:
@@ -140,12 +152,11 @@ class MouseController:
     
     def right_click(self):
         """Perform a right mouse click with debouncing."""
-        import time
         current_time = time.time()
         
         if current_time - self.last_click_time['right'] > self.click_cooldown:
             try:
-                pyautogui.rightClick()
+                self.backend.click('right')
                 self.last_click_time['right'] = current_time
                 print("Right click performed")
             except Exception as e:
@@ -154,19 +165,18 @@ class MouseController:
     def double_click(self):
         """Perform a double click."""
         try:
-            pyautogui.doubleClick()
+            self.backend.click('left', clicks=2)
             print("Double click performed")
         except Exception as e:
             print(f"Error performing double click: {e}")
     
     def middle_click(self):
         """Perform a middle mouse click with debouncing."""
-        import time
         current_time = time.time()
         
         if current_time - self.last_click_time['middle'] > self.click_cooldown:
             try:
-                pyautogui.middleClick()
+                self.backend.click('middle')
                 self.last_click_time['middle'] = current_time
                 print("Middle click performed")
             except Exception as e:
@@ -181,7 +191,7 @@ class MouseController:
         """
         scroll_units = amount if amount else self.scroll_amount
         try:
-            pyautogui.scroll(scroll_units)
+            self.backend.scroll(scroll_units)
             print(f"Scrolled up {scroll_units} units")
         except Exception as e:
             print(f"Error scrolling up: {e}")
@@ -195,7 +205,7 @@ class MouseController:
         """
         scroll_units = amount if amount else self.scroll_amount
         try:
-            pyautogui.scroll(-scroll_units)
+            self.backend.scroll(-scroll_units)
             print(f"Scrolled down {scroll_units} units")
         except Exception as e:
             print(f"Error scrolling down: {e}")
@@ -206,9 +216,9 @@ class MouseController:
         """
         if not self.is_dragging:
             try:
-                current_pos = pyautogui.position()
+                current_pos = self.backend.position()
                 self.drag_start_pos = current_pos
-                pyautogui.mouseDown()
+                self.backend.mouse_down('left')
                 self.is_dragging = True
                 print(f"Drag started at {current_pos}")
             except Exception as e:
@@ -222,8 +232,8 @@ class MouseController:
         """
         if self.is_dragging:
             try:
-                current_pos = pyautogui.position()
-                pyautogui.mouseUp()
+                current_pos = self.backend.position()
+                self.backend.mouse_up('left')
                 print(f"Drag ended at {current_pos} (started at {self.drag_start_pos})")
                 self.is_dragging = False
                 self.drag_start_pos = None
@@ -243,16 +253,31 @@ class MouseController:
     
     def set_smoothing(self, smoothing_factor):
         """
-        Adjust cursor smoothing.
+        Deprecated: Smoothing now happens once, in EyeTracker's filter chain
+        (see EyeTracker.set_filter / set_smoothing_factor).
+        Kept for backward compatibility.
+        """
+        print("Note: cursor smoothing is configured on EyeTracker filters")
+    
+    def set_output_rate(self, output_rate):
+        """
+        Adjust how often the output thread updates the cursor.
         
-        For gaze tracking, higher smoothing (0.8-0.9) is recommended to compensate
-        for natural eye jitter and saccades.
+        Args:
+            output_rate: Cursor updates per second (Hz)
+        """
+        self.output_worker.set_output_rate(output_rate)
+        print(f"Cursor output rate updated: {self.output_worker.output_rate} Hz")
+    
+    def set_latency_callback(self, latency_fn):
+        """
+        Report the capture-to-cursor-command latency of every cursor move.
         
         Args:
-            smoothing_factor: Smoothing factor (0-1, higher = more smoothing)
+            latency_fn: Called from the output thread with the latency in
+                        seconds, or None to stop reporting
         """
-        self.smoothing_factor = np.clip(smoothing_factor, 0, 1)
-        print(f"Smoothing updated: {self.smoothing_factor}")
+        self.output_worker.latency_fn = latency_fn
     
     def get_calibration_status(self):
         """
@@ -262,3 +287,8 @@ class MouseController:
             bool: True if calibrated, False otherwise
         """
         return self.is_calibrated
+    
+    def shutdown(self):
+        """Stop the cursor output thread and release the backend."""
+        self.output_worker.stop()
+        self.backend.close()
@@ -0,0 +1,239 @@
+"""
+Pipeline Profiler Module
+Per-stage latency instrumentation for the tracking loop.
+Stage durations go into fixed-size rolling windows (p50/p95/p99 on query),
+together with FPS and dropped-frame counters. Stats can be queried at
+runtime and exported to JSON/CSV periodically. When disabled every call
+returns immediately, so the instrumentation can stay in the hot path.
+"""
+
+import csv
+import json
+import threading
+import time
+
+import numpy as np
+
+
+class _StageWindow:
+    """Rolling window of the most recent durations of one stage."""
+
+    __slots__ = ('samples', 'index', 'count', 'total_count')
+
+    def __init__(self, size):
+        self.samples = np.zeros(size)
+        self.index = 0
+        self.count = 0
+        self.total_count = 0
+
+    def add(self, duration):
+        self.samples[self.index] = duration
+        self.index += 1
+        if self.index == len(self.samples):
+            self.index = 0
+        if self.count < len(self.samples):
+            self.count += 1
+        self.total_count += 1
+
+    def summary(self):
+        values = self.samples[:self.count] * 1000.0
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {
+            'count': self.total_count,
+            'mean_ms': float(values.mean()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'max_ms': float(values.max()),
+        }
+
+
+class PipelineProfiler:
+    """Times the stages of each frame with a monotonic clock."""
+
+    def __init__(self, enabled=False, window=1024, export_path=None, export_interval=10.0):
+        """
+        Initialize the profiler.
+
+        Args:
+            enabled: Start collecting immediately
+            window: Number of recent samples kept per stage
+            export_path: Periodically write stats here (.json or .csv), or None
+            export_interval: Seconds between periodic exports
+        """
+        self.enabled = enabled
+        self.window = window
+        self.export_path = export_path
+        self.export_interval = export_interval
+
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._mark = 0.0
+        self._frame_start = 0.0
+        self._frame_ends = np.zeros(min(window, 120))
+        self._frame_end_index = 0
+
+        self.frames = 0
+        self.dropped_frames = 0
+        self._last_export = time.perf_counter()
+
+    def set_enabled(self, enabled):
+        """
+        Turn collection on or off.
+
+        Args:
+            enabled: True to collect stage timings
+        """
+        self.enabled = enabled
+        print(f"Pipeline profiling: {'enabled' if enabled else 'disabled'}")
+
+    def begin_frame(self):
+        """Mark the start of a frame (and of its first stage)."""
+        if not self.enabled:
+            return
+        self._frame_start = self._mark = time.perf_counter()
+
+    def lap(self, stage):
+        """
+        Close the current stage: record the time since the last mark.
+
+        Args:
+            stage: Stage name (e.g. 'flip', 'inference')
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.record(stage, now - self._mark)
+        self._mark = now
+
+    def record(self, stage, duration):
+        """
+        Record a duration measured elsewhere (e.g. on another thread).
+
+        Args:
+            stage: Stage name
+            duration: Duration in seconds
+        """
+        if not self.enabled:
+            return
+        window = self._stages.get(stage)
+        if window is None:
+            with self._lock:
+                window = self._stages.setdefault(stage, _StageWindow(self.window))
+        window.add(duration)
+
+    def end_frame(self, dropped=0):
+        """
+        Mark the end of a frame.
+
+        Args:
+            dropped: Frames skipped since the previous one (capture sequence gap)
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.record('total', now - self._frame_start)
+
+        self.frames += 1
+        self.dropped_frames += dropped
+        self._frame_ends[self._frame_end_index % len(self._frame_ends)] = now
+        self._frame_end_index += 1
+
+        if self.export_path and now - self._last_export >= self.export_interval:
+            self._last_export = now
+            stats = self.get_stats()
+            threading.Thread(target=self.export, args=(self.export_path, stats), daemon=True).start()
+
+    def get_fps(self):
+        """
+        Get the recent frame rate.
+
+        Returns:
+            float: Frames per second over the last frames (0 if unknown)
+        """
+        n = min(self._frame_end_index, len(self._frame_ends))
+        if n < 2:
+            return 0.0
+        ends = self._frame_ends[:n]
+        span = ends.max() - ends.min()
+        return (n - 1) / span if span > 0 else 0.0
+
+    def get_stats(self):
+        """
+        Get a snapshot of all stage statistics.
+
+        Returns:
+            dict: {'fps', 'frames', 'dropped_frames', 'stages': {name: summary}}
+        """
+        with self._lock:
+            stages = dict(self._stages)
+        return {
+            'fps': self.get_fps(),
+            'frames': self.frames,
+            'dropped_frames': self.dropped_frames,
+            'stages': {name: window.summary() for name, window in stages.items() if window.count},
+        }
+
+    def get_samples(self, stage):
+        """
+        Get the recorded durations of one stage.
+
+        Args:
+            stage: Stage name
+
+        Returns:
+            np.ndarray: Durations in milliseconds (empty if none recorded)
+        """
+        window = self._stages.get(stage)
+        if window is None:
+            return np.zeros(0)
+        return window.samples[:window.count] * 1000.0
+
+    def export(self, path, stats=None):
+        """
+        Write statistics to a JSON or CSV file (chosen by extension).
+
+        Args:
+            path: Output path ending in .json or .csv
+            stats: Snapshot from get_stats() (taken now if None)
+        """
+        stats = stats or self.get_stats()
+        try:
+            if path.endswith('.csv'):
+                with open(path, 'w', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['stage', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+                    for name, s in stats['stages'].items():
+                        writer.writerow([name, s['count'], s['mean_ms'], s['p50_ms'],
+                                         s['p95_ms'], s['p99_ms'], s['max_ms']])
+                    writer.writerow([])
+                    writer.writerow(['fps', stats['fps']])
+                    writer.writerow(['frames', stats['frames']])
+                    writer.writerow(['dropped_frames', stats['dropped_frames']])
+            else:
+                with open(path, 'w') as f:
+                    json.dump(stats, f, indent=2)
+        except OSError as e:
+            print(f"Error exporting pipeline stats: {e}")
+
+    def reset(self):
+        """Clear all collected statistics."""
+        with self._lock:
+            self._stages = {}
+        self.frames = 0
+        self.dropped_frames = 0
+        self._frame_end_index = 0
+
+    def format_summary(self):
+        """
+        Format the statistics as a text table.
+
+        Returns:
+            str: One line per stage with p50/p95/p99 in milliseconds
+        """
+        stats = self.get_stats()
+        lines = [f"FPS: {stats['fps']:.1f}  frames: {stats['frames']}  dropped: {stats['dropped_frames']}",
+                 f"{'stage':<14} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)"]
+        for name, s in stats['stages'].items():
+            lines.append(f"{name:<14} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} {s['p99_ms']:8.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,154 @@
+"""
+Presence Scheduler Module
+Decides how often the tracking loop runs face detection.
+While a face is present every frame is processed. After idle_after seconds
+without a face the scheduler goes idle: detection drops to idle_rate checks
+per second (optionally on a downscaled frame) and the loop sleeps in between.
+The first frame with a face switches back to full rate. Time spent in each
+state is accumulated so the CPU savings can be quantified.
+"""
+
+import time
+
+import cv2
+
+ACTIVE = 'active'
+IDLE = 'idle'
+
+
+class PresenceScheduler:
+    """Active/idle state machine driven by face presence."""
+
+    def __init__(self, idle_after=10.0, idle_rate=2.0, idle_scale=1.0, enabled=True):
+        """
+        Initialize the scheduler.
+
+        Args:
+            idle_after: Seconds without a face before going idle
+            idle_rate: Detection checks per second while idle
+            idle_scale: Frame scale for detection while idle (e.g. 0.5 = half
+                        resolution, 1.0 = full resolution)
+            enabled: If False, always stay active
+        """
+        self.idle_after = idle_after
+        self.idle_rate = idle_rate
+        self.idle_scale = idle_scale
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self, now=None):
+        """
+        Start over in the active state (e.g. when tracking starts).
+
+        Args:
+            now: Current time (time.monotonic), defaults to now
+        """
+        now = time.monotonic() if now is None else now
+        self.state = ACTIVE
+        self._state_since = now
+        self._last_face = now
+        self._next_check = now
+        self.time_in_state = {ACTIVE: 0.0, IDLE: 0.0}
+
+        # Statistics
+        self.idle_entries = 0
+        self.idle_checks = 0
+
+    def is_idle(self):
+        """
+        Check whether detection currently runs at the idle rate.
+
+        Returns:
+            bool: True while idle
+        """
+        return self.state == IDLE
+
+    def time_until_check(self, now=None):
+        """
+        Get how long the loop may sleep before the next detection.
+
+        Args:
+            now: Current time (time.monotonic), defaults to now
+
+        Returns:
+            float: Seconds to wait (0 while active or when a check is due)
+        """
+        if self.state != IDLE:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self._next_check - now)
+
+    def prepare_frame(self, frame):
+        """
+        Downscale a frame for an idle check.
+
+        Args:
+            frame: OpenCV frame (BGR format)
+
+        Returns:
+            np.ndarray: The frame to run detection on
+        """
+        if self.state != IDLE or self.idle_scale >= 1.0:
+            return frame
+        return cv2.resize(frame, None, fx=self.idle_scale, fy=self.idle_scale,
+                          interpolation=cv2.INTER_AREA)
+
+    def update(self, face_present, now=None):
+        """
+        Feed the result of a detection.
+
+        Args:
+            face_present: True if landmarks were found
+            now: Current time (time.monotonic), defaults to now
+
+        Returns:
+            bool: True if the state changed
+        """
+        now = time.monotonic() if now is None else now
+
+        if face_present:
+            self._last_face = now
+            if self.state == IDLE:
+                self._switch(ACTIVE, now)
+                return True
+            return False
+
+        if self.state == IDLE:
+            self.idle_checks += 1
+            self._next_check = now + 1.0 / self.idle_rate
+        elif self.enabled and now - self._last_face >= self.idle_after:
+            self._switch(IDLE, now)
+            self.idle_entries += 1
+            self._next_check = now + 1.0 / self.idle_rate
+            return True
+        return False
+
+    def get_stats(self, now=None):
+        """
+        Get the time spent in each state.
+
+        Args:
+            now: Current time (time.monotonic), defaults to now
+
+        Returns:
+            dict: state, seconds active/idle, idle fraction, idle entries and checks
+        """
+        now = time.monotonic() if now is None else now
+        times = dict(self.time_in_state)
+        times[self.state] += now - self._state_since
+        total = times[ACTIVE] + times[IDLE]
+        return {
+            'state': self.state,
+            'active_s': times[ACTIVE],
+            'idle_s': times[IDLE],
+            'idle_fraction': times[IDLE] / total if total > 0 else 0.0,
+            'idle_entries': self.idle_entries,
+            'idle_checks': self.idle_checks,
+        }
+
+    def _switch(self, state, now):
+        """Enter a new state and account for the time spent in the old one."""
+        self.time_in_state[self.state] += now - self._state_since
+        self.state = state
+        self._state_since = now
+        print(f"Presence: {'no face - low-power mode' if state == IDLE else 'face detected - full rate'}")
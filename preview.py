@@ -0,0 +1,136 @@
+"""
+Preview Module
+Renders the camera preview on its own thread at a reduced rate.
+The tracking loop only hands over its latest frame; drawing the face mesh,
+text and the HighGUI calls never run on the tracking thread.
+"""
+
+import threading
+import time
+
+import cv2
+
+
+class PreviewWindow:
+    """Decimated camera preview with the face mesh overlay."""
+
+    def __init__(self, eye_tracker, rate=10, window_name='Gaze Tracker - Press Q to hide window',
+                 profiler=None):
+        """
+        Initialize the preview window.
+
+        Args:
+            eye_tracker: EyeTracker used to draw the landmark overlay
+            rate: Preview refresh rate (Hz)
+            window_name: Title of the OpenCV window
+            profiler: PipelineProfiler receiving the 'preview_draw'/'imshow' timings
+        """
+        self.eye_tracker = eye_tracker
+        self.profiler = profiler
+        self.rate = rate
+        self.window_name = window_name
+
+        self._lock = threading.Lock()
+        self._latest = None  # (frame, landmarks, overlay_text)
+        self._version = 0
+
+        self.frames_rendered = 0
+        self.is_hidden = False
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the preview thread (no-op if already running)."""
+        if self._running:
+            return
+
+        self.is_hidden = False
+        self._running = True
+        self._thread = threading.Thread(target=self._render_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the preview thread and close the window."""
+        self._running = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+
+        with self._lock:
+            self._latest = None
+
+    def submit(self, frame, landmarks=None, overlay_text=None):
+        """
+        Offer the latest frame to the preview. Never blocks on rendering.
+
+        The preview works on a copy, so the caller may keep using the frame.
+
+        Args:
+            frame: Camera frame (BGR, not yet annotated)
+            landmarks: LandmarkFrame for the frame or None
+            overlay_text: List of (text, (x, y), scale, color) to draw
+        """
+        if not self._running or self.is_hidden:
+            return
+
+        with self._lock:
+            self._latest = (frame, landmarks, overlay_text or [])
+            self._version += 1
+
+    def set_rate(self, rate):
+        """
+        Set the preview refresh rate.
+
+        Args:
+            rate: Preview refresh rate (Hz)
+        """
+        self.rate = max(1, rate)
+
+    def _render_loop(self):
+        """Render the newest submitted frame at the preview rate."""
+        rendered_version = 0
+
+        try:
+            while self._running and not self.is_hidden:
+                tick = time.monotonic()
+
+                with self._lock:
+                    latest = self._latest
+                    version = self._version
+
+                if latest is not None and version != rendered_version:
+                    rendered_version = version
+                    frame, landmarks, overlay_text = latest
+
+                    start = time.perf_counter()
+                    image = frame.copy()
+                    if landmarks is not None:
+                        self.eye_tracker.draw_overlay(image, landmarks)
+                    for text, position, scale, color in overlay_text:
+                        cv2.putText(image, text, position, cv2.FONT_HERSHEY_SIMPLEX, scale, color, 2)
+                    drawn = time.perf_counter()
+
+                    cv2.imshow(self.window_name, image)
+                    self.frames_rendered += 1
+
+                    if self.profiler:
+                        self.profiler.record('preview_draw', drawn - start)
+                        self.profiler.record('imshow', time.perf_counter() - drawn)
+
+                # Hide on 'q' key (tracking keeps running)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    self.is_hidden = True
+                    print("Preview hidden")
+
+                delay = tick + 1.0 / self.rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        except Exception as e:
+            print(f"Error in preview: {e}")
+        finally:
+            self._running = False
+            try:
+                cv2.destroyWindow(self.window_name)
+            except cv2.error:
+                pass
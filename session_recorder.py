@@ -0,0 +1,372 @@
+"""
+Session Recorder Module
+Records tracking sessions to a compact append-only binary file.
+Each record holds the frame timestamp, all 478x3 landmarks, the gaze ratio,
+both eyes' EAR and the blink actions of that frame. The file is written
+through a memory map on a background thread, and read back as NumPy arrays
+without copying, so sessions can be replayed into BlinkDetector or the
+filters without rerunning FaceMesh.
+
+File layout:
+    [256-byte header: magic + JSON metadata][record 0][record 1]...
+"""
+
+import json
+import os
+import queue
+import threading
+
+import numpy as np
+
+from landmarks import LandmarkFrame, NUM_LANDMARKS, NUM_FACE_LANDMARKS, EAR_INDICES
+
+MAGIC = b'EYESESS1'
+HEADER_SIZE = 256
+FORMAT_VERSION = 1
+
+# Blink actions stored as bits of the 'actions' column
+ACTIONS = ('left_click', 'right_click', 'scroll_up', 'scroll_down', 'drag_toggle', 'middle_click')
+
+# Bits of the 'flags' column
+FLAG_FACE = 1  # Landmarks present
+FLAG_GAZE = 2  # Gaze ratio present
+
+
+def record_dtype(landmark_dtype='float16'):
+    """
+    Get the NumPy record layout of a session file.
+
+    Args:
+        landmark_dtype: 'float16' (compact) or 'float32' (exact, zero-copy replay)
+
+    Returns:
+        np.dtype: Structured record dtype
+    """
+    return np.dtype([
+        ('timestamp', '<f8'),
+        ('landmarks', np.dtype(landmark_dtype).newbyteorder('<'), (NUM_LANDMARKS, 3)),
+        ('gaze', '<f4', (2,)),
+        ('ear', '<f4', (2,)),
+        ('actions', '<u2'),
+        ('flags', '<u2'),
+    ])
+
+
+def encode_actions(blink_result):
+    """
+    Pack a BlinkDetector result dict into an action bitmask.
+
+    Args:
+        blink_result: Dict of action name -> bool (or None)
+
+    Returns:
+        int: Bitmask with bit i set for ACTIONS[i]
+    """
+    if not blink_result:
+        return 0
+    mask = 0
+    for bit, name in enumerate(ACTIONS):
+        if blink_result.get(name):
+            mask |= 1 << bit
+    return mask
+
+
+def decode_actions(mask):
+    """
+    Unpack an action bitmask.
+
+    Args:
+        mask: Bitmask from the 'actions' column
+
+    Returns:
+        list: Names of the actions that fired
+    """
+    return [name for bit, name in enumerate(ACTIONS) if mask & (1 << bit)]
+
+
+def _read_header(f):
+    """Read and validate the header of an open session file."""
+    f.seek(0)
+    header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+        raise ValueError("Not a session recording")
+    return json.loads(header[len(MAGIC):].decode('ascii').strip())
+
+
+def _write_header(f, metadata):
+    """Write the header of an open session file."""
+    payload = json.dumps(metadata).encode('ascii')
+    if len(MAGIC) + len(payload) > HEADER_SIZE:
+        raise ValueError("Session metadata too large for header")
+    f.seek(0)
+    f.write(MAGIC + payload.ljust(HEADER_SIZE - len(MAGIC)))
+    f.flush()
+
+
+class SessionRecorder:
+    """Appends per-frame tracking data to a session file from a background thread."""
+
+    def __init__(self, path, landmark_dtype='float16', chunk_records=1024, max_queue=256):
+        """
+        Initialize the recorder (the file is opened by start()).
+
+        Args:
+            path: Session file path (appended to if it already exists)
+            landmark_dtype: 'float16' or 'float32' landmark storage
+            chunk_records: The file grows by this many records at a time
+            max_queue: Records buffered for the writer before new ones are dropped
+        """
+        self.path = path
+        self.landmark_dtype = landmark_dtype
+        self.dtype = record_dtype(landmark_dtype)
+        self.chunk_records = chunk_records
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        # Guards _running so no record is queued behind stop()'s sentinel
+        self._lock = threading.Lock()
+        self._running = False
+        self._file = None
+        self._records = None
+        self._capacity = 0
+        self.count = 0
+        self.metadata = None
+
+        # Statistics
+        self.records_dropped = 0  # Queue full - writer fell behind
+
+        self._thread = None
+
+    def start(self):
+        """Open (or create) the file and start the writer thread."""
+        if self._thread:
+            return
+
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= HEADER_SIZE:
+            self._file = open(self.path, 'r+b')
+            self.metadata = _read_header(self._file)
+            if np.dtype(self.metadata['landmark_dtype']) != np.dtype(self.landmark_dtype):
+                self._file.close()
+                raise ValueError(f"{self.path} stores {self.metadata['landmark_dtype']} landmarks")
+            self.count = self.metadata['record_count']
+        else:
+            self._file = open(self.path, 'w+b')
+            self.metadata = {
+                'version': FORMAT_VERSION,
+                'num_landmarks': NUM_LANDMARKS,
+                'landmark_dtype': self.landmark_dtype,
+                'record_count': 0,
+                'frame_shape': None,
+                'actions': list(ACTIONS),
+            }
+            self.count = 0
+            _write_header(self._file, self.metadata)
+
+        self._map(self.count + self.chunk_records)
+
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+        with self._lock:
+            self._running = True
+        print(f"Recording session to {self.path}")
+
+    def stop(self):
+        """Write all queued records, trim the file and close it."""
+        if not self._thread:
+            return
+
+        with self._lock:
+            self._running = False
+            self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+        self._records.flush()
+        self._records = None
+        self._file.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+        self._write_metadata()
+        self._file.close()
+        self._file = None
+        print(f"Session saved: {self.count} records in {self.path}")
+
+    def record(self, timestamp, landmarks=None, gaze_ratio=None, ear=None, blink_result=None):
+        """
+        Queue one frame for writing. Never blocks the caller.
+
+        Args:
+            timestamp: Frame capture timestamp (seconds)
+            landmarks: LandmarkFrame or None if no face was found
+            gaze_ratio: (x, y) from EyeTracker.get_eye_position or None
+            ear: (left_ear, right_ear) or None
+            blink_result: BlinkDetector result dict or None
+        """
+        item = (timestamp, landmarks, gaze_ratio, ear, encode_actions(blink_result))
+        with self._lock:
+            if not self._running:
+                return
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                self.records_dropped += 1
+
+    def _map(self, capacity):
+        """(Re)map the file with room for capacity records."""
+        if self._records is not None:
+            self._records.flush()
+            self._records = None
+
+        self._file.truncate(HEADER_SIZE + capacity * self.dtype.itemsize)
+        self._records = np.memmap(self._file, dtype=self.dtype, mode='r+',
+                                  offset=HEADER_SIZE, shape=(capacity,))
+        self._capacity = capacity
+
+    def _write_metadata(self):
+        """Update the record count (and frame shape) in the header."""
+        self.metadata['record_count'] = self.count
+        _write_header(self._file, self.metadata)
+
+    def _write_loop(self):
+        """Writer thread: copy queued frames into the memory map."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            timestamp, landmarks, gaze_ratio, ear, actions = item
+
+            if self.count >= self._capacity:
+                self._map(self._capacity + self.chunk_records)
+
+            record = self._records[self.count]
+            record['timestamp'] = timestamp
+            record['actions'] = actions
+            flags = 0
+
+            if landmarks is not None:
+                record['landmarks'] = landmarks.points
+                flags |= FLAG_FACE
+                if self.metadata['frame_shape'] is None and landmarks.frame_shape is not None:
+                    self.metadata['frame_shape'] = list(landmarks.frame_shape[:2])
+            else:
+                record['landmarks'] = np.nan
+
+            if gaze_ratio is not None:
+                record['gaze'] = gaze_ratio
+                flags |= FLAG_GAZE
+            else:
+                record['gaze'] = np.nan
+
+            record['ear'] = ear if ear is not None else np.nan
+            record['flags'] = flags
+            self.count += 1
+
+            # Publish progress so a crash loses at most one chunk of records
+            if self.count % self.chunk_records == 0:
+                self._records.flush()
+                self._write_metadata()
+
+
+class SessionReader:
+    """Read-only, zero-copy view of a recorded session."""
+
+    def __init__(self, path):
+        """
+        Open a session file.
+
+        Args:
+            path: Session file path
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self.metadata = _read_header(f)
+
+        self.dtype = record_dtype(self.metadata['landmark_dtype'])
+        count = self.metadata['record_count']
+        frame_shape = self.metadata.get('frame_shape')
+        self.frame_shape = tuple(frame_shape) if frame_shape else None
+
+        if count:
+            self.records = np.memmap(path, dtype=self.dtype, mode='r',
+                                     offset=HEADER_SIZE, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def timestamps(self):
+        """np.ndarray: (N,) frame timestamps (view into the file)."""
+        return self.records['timestamp']
+
+    @property
+    def landmarks(self):
+        """np.ndarray: (N, 478, 3) landmarks, NaN where no face (view into the file)."""
+        return self.records['landmarks']
+
+    @property
+    def gaze(self):
+        """np.ndarray: (N, 2) gaze ratios, NaN where missing (view into the file)."""
+        return self.records['gaze']
+
+    @property
+    def ear(self):
+        """np.ndarray: (N, 2) left/right EAR, NaN where missing (view into the file)."""
+        return self.records['ear']
+
+    @property
+    def actions(self):
+        """np.ndarray: (N,) action bitmasks (see decode_actions)."""
+        return self.records['actions']
+
+    @property
+    def face_present(self):
+        """np.ndarray: (N,) bool, True where landmarks were recorded."""
+        return (self.records['flags'] & FLAG_FACE) != 0
+
+    def compute_ear(self, frame_shape=None):
+        """
+        Recompute both eyes' EAR from the recorded landmarks in one call.
+
+        Useful for offline threshold sweeps without replaying BlinkDetector
+        frame by frame.
+
+        Args:
+            frame_shape: Frame shape for pixel scaling (defaults to the recorded
+                         one; normalized coordinates if unknown)
+
+        Returns:
+            np.ndarray: (N, 2) left/right EAR, NaN where no face
+        """
+        from blink_detector import eye_aspect_ratios
+
+        frame_shape = frame_shape or self.frame_shape
+        h, w = frame_shape[:2] if frame_shape else (1, 1)
+        eyes = np.asarray(self.landmarks[:, EAR_INDICES, :2], dtype=np.float32)
+        return eye_aspect_ratios(eyes * np.array([w, h], dtype=np.float32))
+
+    def iter_landmark_frames(self, frame_shape=None):
+        """
+        Replay the recorded landmarks as LandmarkFrame objects.
+
+        float32 recordings are yielded as views; float16 ones are converted
+        one frame at a time.
+
+        Args:
+            frame_shape: Frame shape to attach (defaults to the recorded one)
+
+        Yields:
+            tuple: (timestamp, LandmarkFrame or None)
+        """
+        frame_shape = frame_shape or self.frame_shape
+        landmarks = self.landmarks
+        present = self.face_present
+        timestamps = self.timestamps
+
+        for i in range(len(self.records)):
+            timestamp = float(timestamps[i])
+            if not present[i]:
+                yield timestamp, None
+                continue
+            points = np.asarray(landmarks[i], dtype=np.float32)
+            count = NUM_LANDMARKS if np.isfinite(points[-1, 0]) else NUM_FACE_LANDMARKS
+            yield timestamp, LandmarkFrame(points, count, timestamp, frame_shape)
@@ -0,0 +1,79 @@
+"""
+Tests for the blink pattern decoder.
+Run with: python -m pytest test_blink_patterns.py
+"""
+
+from blink_patterns import BlinkPatternDecoder, BLINK, LONG_BLINK
+
+PATTERNS = {
+    '..': ('double', 500),
+    '...': ('triple', 500),
+    '-': ('hold', 500),
+}
+
+
+def actions(decoder, timestamp, frames=3):
+    """Call update() a few times at one timestamp and collect the actions."""
+    fired = [decoder.update(timestamp) for _ in range(frames)]
+    return [a for a in fired if a is not None]
+
+
+def test_leaf_fires_immediately():
+    decoder = BlinkPatternDecoder(PATTERNS)
+    decoder.add_blink(0.0)
+    decoder.add_blink(0.3)
+    decoder.add_blink(0.6)
+    assert actions(decoder, 0.6) == ['triple']
+
+
+def test_prefix_fires_after_wait():
+    decoder = BlinkPatternDecoder(PATTERNS)
+    decoder.add_blink(0.0)
+    decoder.add_blink(0.3)
+    assert actions(decoder, 0.5) == []
+    assert actions(decoder, 0.9) == ['double']
+
+
+def test_late_blink_completes_previous_pattern():
+    decoder = BlinkPatternDecoder(PATTERNS)
+    decoder.add_blink(0.0)
+    decoder.add_blink(0.3)
+    decoder.add_blink(1.0, LONG_BLINK)
+    assert actions(decoder, 1.0) == ['double', 'hold']
+
+
+def test_mismatching_blink_completes_previous_pattern():
+    decoder = BlinkPatternDecoder(PATTERNS)
+    decoder.add_blink(0.0)
+    decoder.add_blink(0.3)
+    # A long blink within the wait doesn't continue '..' - the double blink
+    # still fires, then the long blink starts its own pattern
+    decoder.add_blink(0.5, LONG_BLINK)
+    assert actions(decoder, 0.5) == ['double', 'hold']
+
+
+def test_mismatch_on_bare_prefix_fires_nothing():
+    decoder = BlinkPatternDecoder(PATTERNS)
+    decoder.add_blink(0.0, BLINK)
+    decoder.add_blink(0.2, LONG_BLINK)
+    assert actions(decoder, 0.2) == ['hold']
+
+
+def test_per_pattern_gap_limits():
+    decoder = BlinkPatternDecoder({'..': ('right_click', 200), '...': ('left_click', 1000)})
+    # 600 ms is too slow for the double blink, though '...' allows it
+    decoder.add_blink(0.0)
+    decoder.add_blink(0.6)
+    assert actions(decoder, 1.0) == []
+    assert actions(decoder, 1.7) == []
+
+    # Within the double blink's own limit it still fires
+    decoder.add_blink(3.0)
+    decoder.add_blink(3.1)
+    assert actions(decoder, 4.2) == ['right_click']
+
+    # The triple blink uses its own, longer limit
+    decoder.add_blink(6.0)
+    decoder.add_blink(6.6)
+    decoder.add_blink(7.2)
+    assert actions(decoder, 7.2) == ['left_click']
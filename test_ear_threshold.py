@@ -0,0 +1,103 @@
+"""
+Tests for the adaptive EAR threshold.
+Run with: python -m pytest test_ear_threshold.py
+"""
+
+import json
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from ear_threshold import AdaptiveEarThreshold
+
+FPS = 30.0
+
+
+def feed(estimator, ears, start=0.0):
+    """Feed EAR values at FPS and return the last threshold."""
+    threshold = estimator.threshold
+    for i, ear in enumerate(ears):
+        threshold = estimator.update(float(ear), start + i / FPS)
+    return threshold
+
+
+def blinking_user(seconds=60.0, open_ear=0.30, closed_ear=0.08, closed_share=0.05, seed=0):
+    """EAR stream of a user whose eyes are closed closed_share of the time."""
+    rng = np.random.default_rng(seed)
+    count = int(seconds * FPS)
+    closed = rng.random(count) < closed_share
+    ears = np.where(closed, closed_ear, open_ear) + rng.normal(0.0, 0.015, count)
+    return np.clip(ears, 0.0, 0.5)
+
+
+def test_initial_threshold_during_warmup():
+    estimator = AdaptiveEarThreshold(initial_threshold=0.20, warmup=90.0)
+    threshold = feed(estimator, np.full(80, 0.30))
+    assert threshold == 0.20
+    assert not estimator.get_estimate()['adapting']
+
+
+def test_threshold_between_closed_and_open_eyes():
+    estimator = AdaptiveEarThreshold()
+    threshold = feed(estimator, blinking_user())
+    estimate = estimator.get_estimate()
+    assert estimate['adapting']
+    assert estimate['closed_ear'] < 0.12
+    assert estimate['open_ear'] > 0.26
+    assert estimate['closed_ear'] < threshold < estimate['open_ear']
+    assert 0.15 < threshold < 0.25
+
+
+def test_open_eyes_only_falls_back_to_open_level():
+    estimator = AdaptiveEarThreshold()
+    threshold = feed(estimator, blinking_user(closed_share=0.0))
+    estimate = estimator.get_estimate()
+    assert estimate['closed_ear'] is None
+    assert abs(threshold - estimator.open_ratio * estimate['open_ear']) < 1e-9
+    assert 0.17 < threshold < 0.22
+
+
+def test_histogram_decays_with_half_life():
+    estimator = AdaptiveEarThreshold(half_life=120.0)
+    estimator.update(0.30, 0.0)
+    estimator.update(0.30, 120.0)
+    assert abs(estimator.weight - 1.5) < 1e-9
+
+
+def test_adapts_to_new_conditions():
+    estimator = AdaptiveEarThreshold(half_life=10.0)
+    feed(estimator, blinking_user(open_ear=0.30, closed_ear=0.08))
+    # Different lighting/user: everything shifts down, the old samples fade out
+    threshold = feed(estimator, blinking_user(open_ear=0.22, closed_ear=0.05, seed=1), start=60.0)
+    assert abs(estimator.get_estimate()['open_ear'] - 0.22) < 0.02
+    assert 0.10 <= threshold < 0.18
+
+
+def test_state_round_trip():
+    estimator = AdaptiveEarThreshold()
+    feed(estimator, blinking_user())
+    state = json.loads(json.dumps(estimator.get_state()))
+
+    restored = AdaptiveEarThreshold()
+    restored.load_state(state)
+    assert restored.threshold == estimator.threshold
+    assert restored.open_ear == estimator.open_ear
+    assert restored.closed_ear == estimator.closed_ear
+    assert np.allclose(restored.histogram, estimator.histogram)
+    assert restored.get_estimate()['adapting']
+
+    # Adapting continues from the restored histogram
+    threshold = feed(restored, blinking_user(seconds=5.0, seed=2), start=1000.0)
+    assert 0.15 < threshold < 0.25
+
+
+def test_mismatched_state_is_ignored():
+    estimator = AdaptiveEarThreshold()
+    feed(estimator, blinking_user())
+    state = estimator.get_state()
+
+    other = AdaptiveEarThreshold(bins=32, initial_threshold=0.21)
+    other.load_state(state)
+    assert other.threshold == 0.21
+    assert other.weight == 0.0
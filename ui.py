@@ -130,6 +130,17 @@ class EyeMouseGUI:
         )
         self.status_label.pack()
         
+        # Latency governor level (empty while the governor is off)
+        self.performance_label = tk.Label(
+            status_frame,
+            text="",
+            font=('Arial', 9),
+            fg='gray',
+            bg='#ECF0F1',
+            wraplength=380
+        )
+        self.performance_label.pack(pady=(0, 5))
+        
         # Instructions
         instructions_frame = tk.LabelFrame(
             content_frame,
@@ -356,6 +367,17 @@ class EyeMouseGUI:
         self.status_label.config(text=status_text, fg=color)
         self.root.update_idletasks()
     
+    def update_performance_status(self, status_text, color='gray'):
+        """
+        Update the latency governor display.
+        
+        Args:
+            status_text: Current quality level and the reason for it
+            color: Text color
+        """
+        self.performance_label.config(text=status_text, fg=color)
+        self.root.update_idletasks()
+    
     def speak(self, text):
         """
         Speak text using text-to-speech if available.